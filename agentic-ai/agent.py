@@ -2,11 +2,13 @@
 Core Agent Framework for Agentic AI System
 """
 
+import asyncio
 import json
 import time
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Dict, List, Any, Optional
+from agent_memory import MemoryStore
 
 @dataclass
 class Task:
@@ -15,30 +17,64 @@ class Task:
     priority: int = 1
     status: str = "pending"
     result: Optional[Any] = None
+    inputs: Dict[str, Any] = field(default_factory=dict)
+    started_at: Optional[float] = None
+    
+    def get_input(self, name: str, default: Any = None) -> Any:
+        """Named input from an upstream stage, or a legacy attribute of that name"""
+        if name in self.inputs:
+            return self.inputs[name]
+        return getattr(self, name, default)
 
 class Agent(ABC):
-    def __init__(self, name: str, capabilities: List[str]):
+    def __init__(self, name: str, capabilities: List[str], memory_capacity: int = 1000,
+                 memory_log_path: Optional[str] = None):
         self.name = name
         self.capabilities = capabilities
-        self.memory = []
-        self.tasks = []
+        self.memory = MemoryStore(memory_capacity, spill_path=memory_log_path)
+        self.active_task_count = 0
+        self.completed_task_count = 0
     
     @abstractmethod
     def execute_task(self, task: Task) -> Any:
         pass
     
+    def execute_batch(self, tasks: List[Task]) -> List[Any]:
+        """Execute several tasks routed to this agent in one call.
+        
+        Returns one entry per task, in order; an Exception instance marks a
+        task that failed. Agents that can vectorize their work override this.
+        """
+        results = []
+        for task in tasks:
+            try:
+                results.append(self.execute_task(task))
+            except Exception as e:
+                results.append(e)
+        return results
+    
+    async def execute_task_async(self, task: Task) -> Any:
+        """Async entry point; agents doing network or disk I/O override this.
+        
+        The default bridges the synchronous execute_task through the event
+        loop's executor so it never blocks the loop.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.execute_task, task)
+    
     def can_handle(self, task: Task) -> bool:
         return any(cap in task.description.lower() for cap in self.capabilities)
     
     def add_memory(self, info: str):
-        self.memory.append({"timestamp": time.time(), "info": info})
+        self.memory.append(info)
     
     def get_status(self) -> Dict:
         return {
             "name": self.name,
             "capabilities": self.capabilities,
-            "active_tasks": len([t for t in self.tasks if t.status == "running"]),
-            "completed_tasks": len([t for t in self.tasks if t.status == "completed"])
+            "active_tasks": self.active_task_count,
+            "memory_entries": len(self.memory),
+            "completed_tasks": self.completed_task_count
         }
 
 class DataAgent(Agent):
@@ -0,0 +1,96 @@
+"""
+Bounded Ring-Buffer Memory for Agents
+"""
+
+import json
+import time
+from array import array
+from typing import Dict, Iterator, List, Optional, Union
+
+class MemoryStore:
+    """Fixed-capacity agent memory.
+
+    Holds the most recent `capacity` entries in a ring buffer, with
+    timestamps packed into a float array. Entries pushed out of the
+    buffer are optionally appended to a JSONL log on disk. Reads return
+    the same {"timestamp", "info"} dicts the old list-based memory held.
+    """
+
+    def __init__(self, capacity: int = 1000, spill_path: Optional[str] = None):
+        if capacity < 1:
+            raise ValueError("Memory capacity must be at least 1")
+        self.capacity = capacity
+        self.spill_path = spill_path
+        self._timestamps = array('d', bytes(8 * capacity))
+        self._infos: List[Optional[str]] = [None] * capacity
+        self._start = 0
+        self._size = 0
+        self.total_added = 0
+        self._spill_file = None
+
+    def append(self, info: str, timestamp: Optional[float] = None):
+        """Record an entry, evicting the oldest one when full"""
+        if timestamp is None:
+            timestamp = time.time()
+        if self._size < self.capacity:
+            slot = (self._start + self._size) % self.capacity
+            self._size += 1
+        else:
+            slot = self._start
+            self._spill(self._timestamps[slot], self._infos[slot])
+            self._start = (self._start + 1) % self.capacity
+        self._timestamps[slot] = timestamp
+        self._infos[slot] = info
+        self.total_added += 1
+
+    def _spill(self, timestamp: float, info: str):
+        if not self.spill_path:
+            return
+        if self._spill_file is None:
+            self._spill_file = open(self.spill_path, 'a', encoding='utf-8')
+        self._spill_file.write(json.dumps({"timestamp": timestamp, "info": info}) + "\n")
+        self._spill_file.flush()
+
+    def _entry(self, position: int) -> Dict:
+        slot = (self._start + position) % self.capacity
+        return {"timestamp": self._timestamps[slot], "info": self._infos[slot]}
+
+    def recent(self, n: int = 1) -> List[Dict]:
+        """The last n entries, oldest first"""
+        n = max(0, min(n, self._size))
+        return [self._entry(position) for position in range(self._size - n, self._size)]
+
+    def clear(self):
+        self._start = 0
+        self._size = 0
+        self._infos = [None] * self.capacity
+
+    def close(self):
+        if self._spill_file is not None:
+            self._spill_file.close()
+            self._spill_file = None
+
+    def __getstate__(self):
+        # Open log handles don't pickle; the copy reopens the log on demand
+        state = self.__dict__.copy()
+        state['_spill_file'] = None
+        return state
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Dict, List[Dict]]:
+        if isinstance(index, slice):
+            return [self._entry(position) for position in range(*index.indices(self._size))]
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("memory index out of range")
+        return self._entry(index)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __bool__(self) -> bool:
+        return self._size > 0
+
+    def __iter__(self) -> Iterator[Dict]:
+        for position in range(self._size):
+            yield self._entry(position)
@@ -0,0 +1,132 @@
+"""
+Asyncio Agent Coordinator - Drives many in-flight tasks from one event loop
+"""
+
+import asyncio
+import threading
+import weakref
+from concurrent.futures import Future
+from typing import AsyncIterator, Dict, List, Optional
+from agent import Agent, Task
+from coordinator import AgentCoordinator
+
+class AsyncAgentCoordinator(AgentCoordinator):
+    """Coordinator whose tasks run as coroutines on a single event loop.
+
+    Agents are awaited through Agent.execute_task_async, so I/O-bound
+    agents overlap freely while sync agents are bridged to an executor.
+    The synchronous AgentCoordinator API keeps working unchanged.
+    Per-agent limits are kept per event loop, since asyncio primitives
+    belong to the loop they are used on.
+    """
+
+    def __init__(self, agents: Optional[List[Agent]] = None, max_concurrency: int = 1000,
+                 agent_limits: Optional[Dict[str, int]] = None, **coordinator_options):
+        super().__init__(agents, **coordinator_options)
+        self.max_concurrency = max_concurrency
+        self.agent_limits = agent_limits or {}
+        self._agent_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def _agent_semaphore(self, agent: Agent) -> Optional[asyncio.Semaphore]:
+        limit = self.agent_limits.get(agent.name)
+        if limit is None:
+            return None
+        with self._lock:
+            semaphores = self._agent_semaphores.setdefault(asyncio.get_running_loop(), {})
+            if agent.name not in semaphores:
+                semaphores[agent.name] = asyncio.Semaphore(limit)
+            return semaphores[agent.name]
+
+    async def _run_task_async(self, task: Task, agent: Agent) -> Dict:
+        semaphore = self._agent_semaphore(agent)
+        if semaphore:
+            # Semaphores wake waiters in FIFO order, preserving dispatch priority
+            try:
+                await semaphore.acquire()
+            except asyncio.CancelledError:
+                # Never started; put it back rather than lose it
+                self.queue_task(task)
+                raise
+        try:
+            self._start_task(task, agent)
+            try:
+                result = await agent.execute_task_async(task)
+            except asyncio.CancelledError as e:
+                self._fail_task(task, agent, e)
+                raise
+            except Exception as e:
+                return self._fail_task(task, agent, e)
+            return self._complete_task(task, agent, result)
+        finally:
+            if semaphore:
+                semaphore.release()
+
+    async def execute_next_task_async(self) -> Dict:
+        task = self._pop_task()
+        if task is None:
+            return {"status": "no_tasks", "message": "No pending tasks"}
+
+        return await self._run_task_async(task, self.find_best_agent(task))
+
+    async def iter_async_cycle(self, max_tasks: Optional[int] = None) -> AsyncIterator[Dict]:
+        """Run queued tasks concurrently, yielding results as they finish.
+
+        If the consumer stops early (aclose), tasks already running are
+        awaited and recorded, as in iter_concurrent_cycle; if the cycle is
+        cancelled they are cancelled and recorded as failed, and tasks
+        still waiting for an agent slot go back on the queue.
+        """
+        in_flight = set()
+        dispatched = 0
+
+        def dispatch():
+            nonlocal dispatched
+            while len(in_flight) < self.max_concurrency and (max_tasks is None or dispatched < max_tasks):
+                task = self._pop_task()
+                if task is None:
+                    return
+                in_flight.add(asyncio.ensure_future(self._run_task_async(task, self.find_best_agent(task))))
+                dispatched += 1
+
+        try:
+            dispatch()
+            while in_flight:
+                done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    in_flight.discard(future)
+                dispatch()
+                for future in done:
+                    yield future.result()
+        except asyncio.CancelledError:
+            for future in in_flight:
+                future.cancel()
+            raise
+        finally:
+            if in_flight:
+                # Each task records its own outcome once it finishes
+                await asyncio.gather(*in_flight, return_exceptions=True)
+
+    async def run_async_cycle(self, max_tasks: Optional[int] = None) -> List[Dict]:
+        return [result async for result in self.iter_async_cycle(max_tasks)]
+
+class BackgroundLoop:
+    """Event loop running in a daemon thread.
+
+    Lets threaded servers such as the Flask-SocketIO apps hand coroutines
+    to one shared loop instead of starting a thread per request.
+    """
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self._thread.start()
+
+    def submit(self, coro) -> Future:
+        """Schedule a coroutine on the loop from any thread"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def stop(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
@@ -0,0 +1,135 @@
+"""
+Token and Latency Budgets for LLM calls
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+from tokens import estimate_message_tokens, estimate_tokens, truncate_to_tokens
+
+class BudgetExceeded(Exception):
+    """Raised when a call would break a token or latency budget"""
+
+class DeadlineExceeded(BudgetExceeded):
+    """Raised when a call runs past its wall-clock deadline"""
+
+class BudgetEnforcer:
+    """Per-task and per-minute spend limits for one agent.
+
+    Before a call, prepare() estimates the prompt locally and either
+    trims it to the per-task token budget or rejects it, depending on
+    `policy`, and rejects calls once the last minute's token or latency
+    spend is used up. After the call, record() adds what it actually
+    cost. The per-task latency budget is a wall-clock deadline from the
+    start of the task (see deadline()), covering rate-limit waits,
+    retries and streaming. Any limit left as None is not enforced.
+    """
+
+    def __init__(self, task_tokens: Optional[int] = None, minute_tokens: Optional[int] = None,
+                 task_latency: Optional[float] = None, minute_latency: Optional[float] = None,
+                 policy: str = "trim", window: float = 60.0):
+        if policy not in ("trim", "reject"):
+            raise ValueError(f"Unknown budget policy: {policy}")
+        self.task_tokens = task_tokens
+        self.minute_tokens = minute_tokens
+        self.task_latency = task_latency
+        self.minute_latency = minute_latency
+        self.policy = policy
+        self.window = window
+        self._lock = threading.Lock()
+        self._recent: Deque[Tuple[float, int, float]] = deque()
+        self._window_tokens = 0
+        self._window_seconds = 0.0
+        self._reserved = 0
+        self.totals = {"calls": 0, "tokens": 0, "seconds": 0.0, "trimmed": 0, "rejected": 0}
+
+    def __getstate__(self):
+        # Locks don't pickle; the copy makes its own
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def prepare(self, messages: List[Dict], max_tokens: int) -> Tuple[List[Dict], int]:
+        """Messages that fit the budgets and the tokens reserved for them, or BudgetExceeded.
+
+        The reservation counts against the per-minute budget until the
+        matching record() call replaces it with the actual spend.
+        """
+        needed = estimate_message_tokens(messages) + max_tokens
+        if self.task_tokens is not None and needed > self.task_tokens:
+            if self.policy == "reject":
+                self._reject(f"Prompt needs about {needed} tokens; the per-task budget is {self.task_tokens}")
+            messages = self._trim(messages, self.task_tokens - max_tokens)
+            needed = estimate_message_tokens(messages) + max_tokens
+            with self._lock:
+                self.totals["trimmed"] += 1
+
+        with self._lock:
+            self._expire(time.monotonic())
+            if self.minute_tokens is not None and self._window_tokens + self._reserved + needed > self.minute_tokens:
+                self.totals["rejected"] += 1
+                raise BudgetExceeded(f"Token budget of {self.minute_tokens} per minute is used up")
+            if self.minute_latency is not None and self._window_seconds >= self.minute_latency:
+                self.totals["rejected"] += 1
+                raise BudgetExceeded(f"Latency budget of {self.minute_latency}s per minute is used up")
+            self._reserved += needed
+        return messages, needed
+
+    def deadline(self) -> Optional[float]:
+        """time.monotonic() by which a task starting now must finish, or None without a per-task latency budget"""
+        return time.monotonic() + self.task_latency if self.task_latency is not None else None
+
+    def record(self, tokens: int, seconds: float, reserved: int = 0):
+        now = time.monotonic()
+        with self._lock:
+            self._reserved -= reserved
+            self._recent.append((now, tokens, seconds))
+            self._window_tokens += tokens
+            self._window_seconds += seconds
+            self._expire(now)
+            self.totals["calls"] += 1
+            self.totals["tokens"] += tokens
+            self.totals["seconds"] += seconds
+
+    def stats(self) -> Dict:
+        with self._lock:
+            self._expire(time.monotonic())
+            return {
+                **self.totals,
+                "seconds": round(self.totals["seconds"], 3),
+                "last_minute_tokens": self._window_tokens,
+                "last_minute_seconds": round(self._window_seconds, 3)
+            }
+
+    def _expire(self, now: float):
+        while self._recent and now - self._recent[0][0] > self.window:
+            _, tokens, seconds = self._recent.popleft()
+            self._window_tokens -= tokens
+            self._window_seconds -= seconds
+
+    def _reject(self, message: str):
+        with self._lock:
+            self.totals["rejected"] += 1
+        raise BudgetExceeded(message)
+
+    def _trim(self, messages: List[Dict], prompt_budget: int) -> List[Dict]:
+        """Drop the oldest context messages, then shorten the final one"""
+        messages = list(messages)
+        # The first (system) and last (current request) messages are always kept
+        while len(messages) > 2 and estimate_message_tokens(messages) > prompt_budget:
+            del messages[1]
+
+        excess = estimate_message_tokens(messages) - prompt_budget
+        if excess > 0:
+            last = messages[-1]
+            content = last.get("content") or ""
+            keep = estimate_tokens(content) - excess
+            if keep <= 0:
+                self._reject(f"Prompt cannot be trimmed to {prompt_budget} tokens")
+            messages[-1] = {**last, "content": truncate_to_tokens(content, keep)}
+        return messages
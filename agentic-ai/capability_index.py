@@ -0,0 +1,108 @@
+"""
+Keyword Capability Index for fast task routing
+"""
+
+from collections import deque
+from typing import Any, Dict, Hashable, Iterable, List, Set, Tuple
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton over a set of keywords.
+
+    Each keyword carries one or more payloads; find() reports every
+    payload whose keyword occurs as a substring of the text in a single
+    left-to-right pass, regardless of how many keywords are indexed.
+    """
+
+    def __init__(self, keywords: Iterable[Tuple[str, Hashable]] = ()):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Set[Hashable]] = [set()]
+        self._built = False
+        for keyword, payload in keywords:
+            self.add(keyword, payload)
+
+    def add(self, keyword: str, payload: Hashable):
+        """Index a keyword; the automaton is rebuilt lazily on next lookup"""
+        if not keyword:
+            return
+        state = 0
+        for char in keyword:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(set())
+            state = next_state
+        self._output[state].add(payload)
+        self._built = False
+
+    def _build(self):
+        """Compute failure links breadth-first and merge their outputs"""
+        self._fail = [0] * len(self._goto)
+        self._merged = [set(out) for out in self._output]
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._merged[next_state] |= self._merged[self._fail[next_state]]
+        self._built = True
+
+    def iter_matches(self, text: str) -> Iterable[Hashable]:
+        """Yield the payload of every keyword occurrence in text"""
+        if not self._built:
+            self._build()
+        goto, fail, merged = self._goto, self._fail, self._merged
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if merged[state]:
+                yield from merged[state]
+
+    def find(self, text: str) -> Set[Hashable]:
+        """Distinct payloads whose keywords occur in text"""
+        return set(self.iter_matches(text))
+
+    def count(self, text: str) -> Dict[Hashable, int]:
+        """Number of keyword occurrences per payload"""
+        counts: Dict[Hashable, int] = {}
+        for payload in self.iter_matches(text):
+            counts[payload] = counts.get(payload, 0) + 1
+        return counts
+
+class CapabilityIndex:
+    """Maps task descriptions to the agents whose capabilities they mention"""
+
+    def __init__(self, agents: Iterable[Any] = ()):
+        self.agents: List[Any] = []
+        self._automaton = KeywordAutomaton()
+        for agent in agents:
+            self.add_agent(agent)
+
+    def add_agent(self, agent: Any):
+        position = len(self.agents)
+        self.agents.append(agent)
+        for capability in agent.capabilities:
+            self._automaton.add(capability.lower(), position)
+
+    def candidates(self, description: str) -> List[Any]:
+        """Capable agents, in registration order"""
+        positions = self._automaton.find(description.lower())
+        return [self.agents[position] for position in sorted(positions)]
+
+    def match_counts(self, description: str) -> Dict[Any, int]:
+        """Capability keyword hits per agent"""
+        counts = self._automaton.count(description.lower())
+        return {self.agents[position]: hits for position, hits in sorted(counts.items())}
+
+    def __len__(self) -> int:
+        return len(self.agents)
@@ -15,10 +15,37 @@ class LLMConfig:
     max_tokens: int = 150
     temperature: float = 0.7
     
+    # OpenAI Client (connection pool and rate limits)
+    openai_base_url: str = "https://api.openai.com/v1"
+    max_concurrent_requests: int = 8
+    requests_per_minute: int = 3500
+    tokens_per_minute: int = 90000
+    request_timeout: float = 30.0
+    
     # Local LLM Configuration (for future integration)
     local_model_path: Optional[str] = None
     use_local_model: bool = False
     
+    # Response Cache
+    response_cache_size: int = 1024
+    response_cache_ttl: Optional[float] = 3600
+    response_cache_path: Optional[str] = None
+    
+    # Spend Budgets per agent (None disables a limit)
+    task_token_budget: Optional[int] = 4096
+    minute_token_budget: Optional[int] = None
+    task_latency_budget: Optional[float] = None
+    minute_latency_budget: Optional[float] = None
+    budget_policy: str = "trim"  # "trim" or "reject" oversized prompts
+    
+    # Conversation Window
+    conversation_max_tokens: int = 1024
+    conversation_max_turns: int = 20
+    conversation_summary_tokens: int = 256
+    
+    # Sentiment Lexicon (binary file built with lexicon.py; None uses the built-in terms)
+    lexicon_path: Optional[str] = None
+    
     # Task Processing
     enable_smart_routing: bool = True
     enable_task_interpretation: bool = True
@@ -29,6 +56,8 @@ class LLMConfig:
         # Try to load API key from environment
         if not self.openai_api_key:
             self.openai_api_key = os.getenv("OPENAI_API_KEY")
+        self.openai_base_url = os.getenv("OPENAI_BASE_URL", self.openai_base_url)
+        self.lexicon_path = os.getenv("SENTIMENT_LEXICON", self.lexicon_path)
     
     def _load_env_file(self):
         """Load environment variables from .env file"""
@@ -0,0 +1,94 @@
+"""
+Token-budgeted Conversation Window for LLM agents
+"""
+
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional
+from summarizer import TextRankSummarizer, split_sentences
+from tokens import estimate_tokens
+
+class ConversationWindow:
+    """Sliding window of recent turns with a rolling summary of older ones.
+
+    Turns are kept while they fit in max_tokens (less the space reserved
+    for the summary) and max_turns. Evicted turns are folded into a
+    summary of at most summary_tokens, so prompt size and memory stay
+    bounded however long the conversation runs. The newest turn is always
+    kept. `summarize` can replace the default extractive summary with,
+    for example, an LLM call; it receives the previous summary and the
+    evicted turns.
+    """
+
+    def __init__(self, max_tokens: int = 1024, max_turns: int = 20, summary_tokens: int = 256,
+                 summarize: Optional[Callable[[str, List[Dict]], str]] = None):
+        if summary_tokens >= max_tokens:
+            raise ValueError("summary_tokens must be smaller than max_tokens")
+        self.max_tokens = max_tokens
+        self.max_turns = max_turns
+        self.summary_tokens = summary_tokens
+        self.summary = ""
+        self.total_turns = 0
+        self._summarize = summarize or self._extractive_summary
+        self._turns: Deque[Dict] = deque()
+        self._turn_tokens = 0
+        self._ranker = TextRankSummarizer()
+
+    def add(self, role: str, content: str):
+        tokens = estimate_tokens(content)
+        self._turns.append({"role": role, "content": content, "tokens": tokens})
+        self._turn_tokens += tokens
+        self.total_turns += 1
+        self._compact()
+
+    def add_exchange(self, user: str, assistant: str):
+        self.add("user", user)
+        self.add("assistant", assistant)
+
+    def messages(self) -> List[Dict]:
+        """Chat messages for the window: the summary as a system message, then recent turns"""
+        messages = []
+        if self.summary:
+            messages.append({"role": "system", "content": f"Summary of the earlier conversation: {self.summary}"})
+        messages.extend({"role": turn["role"], "content": turn["content"]} for turn in self._turns)
+        return messages
+
+    @property
+    def token_count(self) -> int:
+        return self._turn_tokens + (estimate_tokens(self.summary) if self.summary else 0)
+
+    def clear(self):
+        self._turns.clear()
+        self._turn_tokens = 0
+        self.summary = ""
+
+    def _compact(self):
+        budget = self.max_tokens - self.summary_tokens
+        evicted = []
+        while len(self._turns) > 1 and (self._turn_tokens > budget or len(self._turns) > self.max_turns):
+            turn = self._turns.popleft()
+            self._turn_tokens -= turn["tokens"]
+            evicted.append(turn)
+        if evicted:
+            self.summary = self._summarize(self.summary, evicted)
+
+    def _extractive_summary(self, summary: str, evicted: List[Dict]) -> str:
+        """Highest-ranked sentences of the old summary plus evicted turns that fit the budget"""
+        parts = [summary] if summary else []
+        for turn in evicted:
+            content = turn["content"].strip()
+            if content and content[-1] not in ".!?":
+                content += "."
+            parts.append(f"{turn['role']}: {content}")
+        sentences = split_sentences(" ".join(parts), min_length=1)
+        scores = self._ranker.rank(sentences) if len(sentences) > 1 else [1.0] * len(sentences)
+
+        chosen, used = [], 0
+        for position in sorted(range(len(sentences)), key=lambda position: (-scores[position], -position)):
+            cost = estimate_tokens(sentences[position])
+            if used + cost <= self.summary_tokens:
+                chosen.append(position)
+                used += cost
+        return " ".join(sentences[position] for position in sorted(chosen))
+
+    def __len__(self) -> int:
+        return len(self._turns)
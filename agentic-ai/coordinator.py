@@ -3,70 +3,224 @@ Agent Coordinator - Orchestrates multi-agent collaboration
 """
 
 from agent import Agent, Task, DataAgent, MLAgent, PlannerAgent
-from typing import List, Dict
+from capability_index import CapabilityIndex
+from metrics import MetricsRegistry, metrics as default_metrics, task_type_of
+from result_store import ResultStore, MemoryResultStore
+from task_queue import TaskQueue
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, List, Dict, Iterator, Optional, Tuple
+import itertools
+import threading
 import time
 
+def _execute_agent_task(agent: Agent, task: Task) -> Any:
+    """Pool entry point; module level so process pools can pickle it"""
+    return agent.execute_task(task)
+
 class AgentCoordinator:
-    def __init__(self):
-        self.agents = [
+    """Routes queued tasks to agents and tracks their progress.
+    
+    Queue pops, pushes and cancels, agent selection and task bookkeeping
+    all happen under one lock, so request threads, pool workers and an
+    event loop can drive the same coordinator at once.
+    """
+    
+    def __init__(self, agents: Optional[List[Agent]] = None, result_store: Optional[ResultStore] = None,
+                 metrics: Optional[MetricsRegistry] = None):
+        self.agents = []
+        self._lock = threading.RLock()
+        self._capability_index = CapabilityIndex()
+        self._status_version = 0
+        self._completed_count = 0
+        self.register_agents(agents if agents is not None else [
             DataAgent(),
             MLAgent(), 
             PlannerAgent()
-        ]
-        self.task_queue = []
-        self.completed_tasks = []
+        ])
+        self.task_queue = TaskQueue()
+        self.result_store = result_store if result_store is not None else MemoryResultStore()
+        self.metrics = metrics if metrics is not None else default_metrics
+        self._task_counter = itertools.count(1)
     
     def add_task(self, description: str, priority: int = 1) -> str:
-        task_id = f"task_{len(self.task_queue) + 1}_{int(time.time())}"
-        task = Task(id=task_id, description=description, priority=priority)
-        self.task_queue.append(task)
+        task_id = f"task_{next(self._task_counter)}_{int(time.time())}"
+        self.queue_task(Task(id=task_id, description=description, priority=priority))
         return task_id
     
+    def queue_task(self, task: Task):
+        with self._lock:
+            self.task_queue.push(task)
+    
+    def add_tasks(self, tasks: List[Tuple[str, int]]) -> List[str]:
+        """Queue several (description, priority) pairs in one heapify"""
+        new_tasks = [
+            Task(id=f"task_{next(self._task_counter)}_{int(time.time())}", description=description, priority=priority)
+            for description, priority in tasks
+        ]
+        with self._lock:
+            self.task_queue.push_many(new_tasks)
+        return [task.id for task in new_tasks]
+    
+    def pending_tasks(self) -> List[Task]:
+        """Snapshot of the queued tasks"""
+        with self._lock:
+            return list(self.task_queue)
+    
+    def _pop_task(self) -> Optional[Task]:
+        """Highest-priority queued task, or None; each task is handed out once"""
+        with self._lock:
+            return self.task_queue.pop() if self.task_queue else None
+    
+    def get_task_result(self, task_id: str) -> Optional[Dict]:
+        """Stored record of a completed task"""
+        return self.result_store.get(task_id)
+    
+    def cancel_task(self, task_id: str) -> Optional[Task]:
+        """Remove a pending task from the queue"""
+        with self._lock:
+            task = self.task_queue.cancel(task_id)
+            if task:
+                task.status = "cancelled"
+        return task
+    
+    def register_agent(self, agent: Agent):
+        """Add an agent and index its capabilities for routing"""
+        with self._lock:
+            self.agents.append(agent)
+            self._capability_index.add_agent(agent)
+            self._status_version += 1
+    
+    def register_agents(self, agents: List[Agent]):
+        for agent in agents:
+            self.register_agent(agent)
+    
     def find_best_agent(self, task: Task) -> Agent:
-        capable_agents = [agent for agent in self.agents if agent.can_handle(task)]
-        if not capable_agents:
-            return self.agents[0]  # Default to first agent
-        
-        # Select agent with least active tasks
-        return min(capable_agents, key=lambda a: len([t for t in a.tasks if t.status == "running"]))
+        with self._lock:
+            if len(self._capability_index) != len(self.agents):
+                # Agents were added to the list directly; re-index them
+                self._capability_index = CapabilityIndex(self.agents)
+            
+            capable_agents = self._capability_index.candidates(task.description)
+            if not capable_agents:
+                return self.agents[0]  # Default to first agent
+            
+            # Select agent with least active tasks
+            return min(capable_agents, key=lambda a: a.active_task_count)
     
     def execute_next_task(self) -> Dict:
-        if not self.task_queue:
+        dispatched_at = time.perf_counter()
+        task = self._pop_task()
+        if task is None:
             return {"status": "no_tasks", "message": "No pending tasks"}
         
-        # Sort by priority
-        self.task_queue.sort(key=lambda t: t.priority, reverse=True)
-        task = self.task_queue.pop(0)
-        
         # Find best agent
-        agent = self.find_best_agent(task)
-        
-        # Execute task
-        task.status = "running"
-        agent.tasks.append(task)
+        with self._lock:
+            agent = self.find_best_agent(task)
+            self._start_task(task, agent)
         
         try:
             result = agent.execute_task(task)
+        except Exception as e:
+            return self._fail_task(task, agent, e)
+        else:
+            return self._complete_task(task, agent, result)
+        finally:
+            self.metrics.observe_dispatch(time.perf_counter() - dispatched_at)
+    
+    def execute_batch(self, tasks: Optional[List[Task]] = None, max_tasks: Optional[int] = None) -> List[Dict]:
+        """Execute tasks grouped by target agent via Agent.execute_batch.
+        
+        With no tasks given, up to max_tasks are taken from the queue in
+        priority order; given tasks that are still queued are dequeued.
+        Results come back in the order the tasks were taken.
+        """
+        with self._lock:
+            if tasks is None:
+                tasks = []
+                while self.task_queue and (max_tasks is None or len(tasks) < max_tasks):
+                    tasks.append(self.task_queue.pop())
+            else:
+                for task in tasks:
+                    self.task_queue.cancel(task.id)
+            
+            groups: Dict[int, Tuple[Agent, List[Task]]] = {}
+            for task in tasks:
+                agent = self.find_best_agent(task)
+                groups.setdefault(id(agent), (agent, []))[1].append(task)
+        
+        results: Dict[str, Dict] = {}
+        for agent, agent_tasks in groups.values():
+            # Started only when their group runs, so waiting on earlier groups
+            # counts neither towards latency nor towards the agent's load
+            for task in agent_tasks:
+                self._start_task(task, agent)
+            try:
+                batch_results = agent.execute_batch(agent_tasks)
+                if len(batch_results) != len(agent_tasks):
+                    raise ValueError(f"{agent.name}.execute_batch returned {len(batch_results)} results for {len(agent_tasks)} tasks")
+            except Exception as e:
+                batch_results = [e] * len(agent_tasks)
+            
+            for task, result in zip(agent_tasks, batch_results):
+                if isinstance(result, Exception):
+                    results[task.id] = self._fail_task(task, agent, result)
+                else:
+                    results[task.id] = self._complete_task(task, agent, result)
+        
+        return [results[task.id] for task in tasks]
+    
+    def _start_task(self, task: Task, agent: Agent):
+        with self._lock:
+            task.status = "running"
+            task.started_at = time.perf_counter()
+            agent.active_task_count += 1
+            self._status_version += 1
+    
+    def _complete_task(self, task: Task, agent: Agent, result: Any) -> Dict:
+        with self._lock:
             task.result = result
             task.status = "completed"
-            self.completed_tasks.append(task)
-            
-            return {
-                "status": "success",
-                "task_id": task.id,
-                "agent": agent.name,
-                "result": result
-            }
-        except Exception as e:
+            self._record_timing(task, agent, failed=False)
+            agent.active_task_count -= 1
+            agent.completed_task_count += 1
+            self._completed_count += 1
+            self._status_version += 1
+            self.result_store.add(task, agent.name)
+        
+        return {
+            "status": "success",
+            "task_id": task.id,
+            "agent": agent.name,
+            "result": result
+        }
+    
+    def _record_timing(self, task: Task, agent: Agent, failed: bool):
+        if task.started_at is not None:
+            self.metrics.observe_task(agent.name, task_type_of(task), time.perf_counter() - task.started_at, failed)
+    
+    def _fail_task(self, task: Task, agent: Agent, error: Exception) -> Dict:
+        with self._lock:
             task.status = "failed"
-            return {
-                "status": "error",
-                "task_id": task.id,
-                "agent": agent.name,
-                "error": str(e)
-            }
+            self._record_timing(task, agent, failed=True)
+            agent.active_task_count -= 1
+            self._status_version += 1
+        return {
+            "status": "error",
+            "task_id": task.id,
+            "agent": agent.name,
+            "error": str(error)
+        }
     
-    def run_autonomous_cycle(self, max_tasks: int = 5) -> List[Dict]:
+    def run_autonomous_cycle(self, max_tasks: int = 5, parallel: bool = False, **pool_options) -> List[Dict]:
+        """Execute up to max_tasks queued tasks.
+        
+        With parallel=True the tasks run on a worker pool (see
+        iter_concurrent_cycle for pool_options) and results are listed in
+        completion order.
+        """
+        if parallel:
+            return list(self.iter_concurrent_cycle(max_tasks=max_tasks, **pool_options))
+        
         results = []
         executed = 0
         
@@ -78,10 +232,124 @@ class AgentCoordinator:
         
         return results
     
+    def iter_concurrent_cycle(self, max_tasks: Optional[int] = None, max_workers: int = 4,
+                              executor: str = "thread", agent_limits: Optional[Dict[str, int]] = None,
+                              default_agent_limit: Optional[int] = None) -> Iterator[Dict]:
+        """Execute queued tasks on a worker pool, yielding results as they finish.
+        
+        Tasks are dispatched in priority order. agent_limits maps agent
+        names to the maximum number of tasks that agent may run at once;
+        a task whose agent is saturated waits, without blocking tasks for
+        other agents. executor="process" runs tasks in worker processes,
+        so agents and tasks must be picklable and changes an agent makes
+        to its own state (such as memory) stay in the worker.
+        """
+        if executor == "thread":
+            pool = ThreadPoolExecutor(max_workers=max_workers)
+        elif executor == "process":
+            pool = ProcessPoolExecutor(max_workers=max_workers)
+        else:
+            raise ValueError(f"Unknown executor type: {executor}")
+        
+        agent_limits = agent_limits or {}
+        in_flight: Dict[str, int] = {}
+        running = {}
+        deferred = []
+        dispatched = 0
+        
+        def has_slot(agent: Agent) -> bool:
+            limit = agent_limits.get(agent.name, default_agent_limit)
+            return limit is None or in_flight.get(agent.name, 0) < limit
+        
+        def submit(task: Task, agent: Agent):
+            self._start_task(task, agent)
+            in_flight[agent.name] = in_flight.get(agent.name, 0) + 1
+            running[pool.submit(_execute_agent_task, agent, task)] = (task, agent)
+        
+        def dispatch():
+            nonlocal dispatched
+            # Tasks held back by agent limits were popped first, so they go first
+            for entry in list(deferred):
+                if len(running) >= max_workers:
+                    return
+                if has_slot(entry[1]):
+                    deferred.remove(entry)
+                    submit(*entry)
+            
+            while len(running) < max_workers and len(deferred) < max_workers and (max_tasks is None or dispatched < max_tasks):
+                task = self._pop_task()
+                if task is None:
+                    return
+                agent = self.find_best_agent(task)
+                dispatched += 1
+                if has_slot(agent):
+                    submit(task, agent)
+                else:
+                    deferred.append((task, agent))
+        
+        try:
+            dispatch()
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    task, agent = running.pop(future)
+                    in_flight[agent.name] -= 1
+                    result = self._record_future(future, task, agent)
+                    dispatch()
+                    yield result
+        finally:
+            try:
+                # Tasks that never started go back on the queue
+                for task, _ in deferred:
+                    self.queue_task(task)
+                # Tasks still running when the consumer stops early are finished
+                # and recorded, so no task or agent is left counted as busy
+                for future, (task, agent) in running.items():
+                    self._record_future(future, task, agent)
+            finally:
+                pool.shutdown(wait=True)
+    
+    def _record_future(self, future, task: Task, agent: Agent) -> Dict:
+        # Only the task's own failure marks it failed; bookkeeping errors propagate
+        try:
+            result = future.result()
+        except Exception as e:
+            return self._fail_task(task, agent, e)
+        return self._complete_task(task, agent, result)
+    
+    @property
+    def status_version(self) -> int:
+        """Increases whenever anything reported by get_system_status changes"""
+        with self._lock:
+            return self._status_version + self.task_queue.version
+    
     def get_system_status(self) -> Dict:
-        return {
-            "agents": [agent.get_status() for agent in self.agents],
-            "pending_tasks": len(self.task_queue),
-            "completed_tasks": len(self.completed_tasks),
-            "system_health": "operational"
-        }
\ No newline at end of file
+        with self._lock:
+            return {
+                "version": self.status_version,
+                "agents": [agent.get_status() for agent in self.agents],
+                "pending_tasks": len(self.task_queue),
+                "completed_tasks": self._completed_count,
+                "system_health": "operational"
+            }
+    
+    def get_status_delta(self, previous: Optional[Dict]) -> Dict:
+        """Fields of the current status that differ from a previous snapshot.
+        
+        Changed agents are keyed by name under "agents"; "version" is
+        always present so clients can tell which snapshot they hold.
+        """
+        current = self.get_system_status()
+        if previous is None:
+            return current
+        
+        delta = {"version": current["version"], "agents": {}}
+        for key, value in current.items():
+            if key not in ("version", "agents") and previous.get(key) != value:
+                delta[key] = value
+        
+        previous_agents = {agent["name"]: agent for agent in previous.get("agents", [])}
+        for agent in current["agents"]:
+            if previous_agents.get(agent["name"]) != agent:
+                delta["agents"][agent["name"]] = agent
+        return delta
@@ -0,0 +1,97 @@
+"""
+Trie-based Glossary for term-by-term translation
+"""
+
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+WORD_PATTERN = re.compile(r"\w+")
+
+class Glossary:
+    """Term table compiled into a word-level trie.
+
+    translate() walks the text once, left to right, replacing the longest
+    glossary term that starts at each word. Terms match whole words only,
+    case-insensitively, and multi-word terms match across whitespace.
+    """
+
+    _END = ""  # Trie key holding a node's translation; words are never empty
+
+    def __init__(self, entries: Optional[Dict[str, str]] = None):
+        self._root: Dict[str, dict] = {}
+        self._size = 0
+        if entries:
+            self.update(entries.items())
+
+    @classmethod
+    def from_tsv(cls, path: str, encoding: str = "utf-8") -> "Glossary":
+        """Load `term<TAB>translation` lines; blank lines and # comments are skipped"""
+        glossary = cls()
+        with open(path, encoding=encoding) as f:
+            glossary.update(
+                tuple(line.rstrip("\n").split("\t", 1))
+                for line in f
+                if line.strip() and not line.startswith("#") and "\t" in line
+            )
+        return glossary
+
+    def add(self, term: str, translation: str):
+        words = WORD_PATTERN.findall(term.lower())
+        if not words:
+            return
+        node = self._root
+        for word in words:
+            node = node.setdefault(word, {})
+        if self._END not in node:
+            self._size += 1
+        node[self._END] = translation
+
+    def update(self, entries: Iterable[Tuple[str, str]]):
+        for term, translation in entries:
+            self.add(term, translation)
+
+    def translate(self, text: str) -> str:
+        matches = [(match.start(), match.end(), match.group().lower()) for match in WORD_PATTERN.finditer(text)]
+        root, end_key = self._root, self._END
+        pieces: List[str] = []
+        copied = 0
+        i = 0
+        while i < len(matches):
+            node = root.get(matches[i][2])
+            best = None
+            j = i
+            while node is not None:
+                if end_key in node:
+                    best = (j, node[end_key])
+                j += 1
+                # Multi-word terms continue only across whitespace
+                if j == len(matches) or not text[matches[j - 1][1]:matches[j][0]].isspace():
+                    break
+                node = node.get(matches[j][2])
+
+            if best is None:
+                i += 1
+                continue
+            last, translation = best
+            pieces.append(text[copied:matches[i][0]])
+            pieces.append(translation)
+            copied = matches[last][1]
+            i = last + 1
+
+        pieces.append(text[copied:])
+        return "".join(pieces)
+
+    def translate_many(self, texts: Iterable[str]) -> List[str]:
+        translate = self.translate
+        return [translate(text) for text in texts]
+
+    def __contains__(self, term: str) -> bool:
+        node = self._root
+        for word in WORD_PATTERN.findall(term.lower()):
+            node = node.get(word)
+            if node is None:
+                return False
+        return node is not self._root and self._END in node
+
+    def __len__(self) -> int:
+        return self._size
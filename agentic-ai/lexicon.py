@@ -0,0 +1,240 @@
+"""
+Shared Weighted Sentiment Lexicon in a compact, memory-mapped binary file
+"""
+
+import argparse
+import mmap
+import os
+import struct
+import sys
+import threading
+from array import array
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from config import llm_config
+
+# Term kinds
+WORD, NEGATION, INTENSIFIER = 0, 1, 2
+KIND_NAMES = {"word": WORD, "negation": NEGATION, "intensifier": INTENSIFIER}
+
+# A negation flips words up to this many tokens after it
+NEGATION_WINDOW = 3
+NEGATION_FACTOR = -1.0
+
+# File layout, little-endian: header, (count + 1) uint32 term offsets into
+# the blob, count float32 weights, count uint8 kinds, then the UTF-8 terms,
+# sorted, back to back
+_MAGIC = b"LEX1"
+_HEADER = struct.Struct("<4sII")
+
+# Marks where one text ends inside a joined batch
+DOCUMENT_BREAK = "\x00"
+
+# Letters, digits and apostrophes form tokens; everything else separates them
+SEPARATORS = {code: " " for code in range(128) if not (chr(code).isalnum() or chr(code) in "'" + DOCUMENT_BREAK)}
+SEPARATORS.update({ord(c): " " for c in "\u00a0\u2013\u2014\u2026\u201c\u201d"})
+SEPARATORS.update({ord(c): "'" for c in "\u2018\u2019"})
+
+DEFAULT_TERMS: List[Tuple[str, float, int]] = [
+    *((word, 1.0, WORD) for word in (
+        "amazing", "excellent", "fantastic", "good", "great", "helpful", "incredible", "like", "love", "wonderful"
+    )),
+    *((word, -1.0, WORD) for word in (
+        "awful", "bad", "bugs", "confusing", "disappointed", "dislike", "hate", "horrible", "terrible", "worst", "wrong"
+    )),
+    *((word, 0.0, NEGATION) for word in (
+        "not", "no", "never", "neither", "nor", "without", "cannot", "can't", "don't", "doesn't", "didn't",
+        "isn't", "wasn't", "aren't", "weren't", "won't", "wouldn't", "shouldn't", "couldn't", "hardly"
+    )),
+    ("absolutely", 1.5, INTENSIFIER), ("extremely", 1.8, INTENSIFIER), ("incredibly", 1.8, INTENSIFIER),
+    ("really", 1.3, INTENSIFIER), ("so", 1.3, INTENSIFIER), ("super", 1.5, INTENSIFIER),
+    ("totally", 1.3, INTENSIFIER), ("very", 1.5, INTENSIFIER),
+    ("barely", 0.4, INTENSIFIER), ("slightly", 0.5, INTENSIFIER), ("somewhat", 0.7, INTENSIFIER),
+]
+
+def tokenize(text: str) -> List[str]:
+    return text.lower().translate(SEPARATORS).split()
+
+def tokenize_batch(texts: Sequence[str]) -> List[str]:
+    """Tokens of all texts in one pass, with a DOCUMENT_BREAK token between texts"""
+    joined = DOCUMENT_BREAK.join(texts)
+    if joined.count(DOCUMENT_BREAK) != len(texts) - 1:
+        joined = DOCUMENT_BREAK.join(text.replace(DOCUMENT_BREAK, " ") for text in texts)
+    return tokenize(joined.replace(DOCUMENT_BREAK, f" {DOCUMENT_BREAK} "))
+
+def encode_lexicon(terms: Iterable[Tuple[str, float, int]]) -> bytes:
+    """Binary lexicon for (term, weight, kind) entries; later duplicates win"""
+    entries = {term.lower(): (float(weight), int(kind)) for term, weight, kind in terms}
+    encoded = sorted((term.encode("utf-8"), weight, kind) for term, (weight, kind) in entries.items())
+
+    offsets, weights, kinds = array("I", [0]), array("f"), bytearray()
+    for term, weight, kind in encoded:
+        offsets.append(offsets[-1] + len(term))
+        weights.append(weight)
+        kinds.append(kind)
+    if sys.byteorder != "little":
+        offsets.byteswap()
+        weights.byteswap()
+    return b"".join((
+        _HEADER.pack(_MAGIC, len(encoded), offsets[-1]),
+        offsets.tobytes(), weights.tobytes(), bytes(kinds),
+        *(term for term, _, _ in encoded)
+    ))
+
+def write_lexicon(path: str, terms: Iterable[Tuple[str, float, int]]):
+    with open(path, "wb") as f:
+        f.write(encode_lexicon(terms))
+
+def read_tsv(path: str, encoding: str = "utf-8") -> List[Tuple[str, float, int]]:
+    """`term<TAB>weight[<TAB>kind]` lines; kind defaults to word, blank lines and # comments are skipped"""
+    terms = []
+    with open(path, encoding=encoding) as f:
+        for line in f:
+            if not line.strip() or line.startswith("#"):
+                continue
+            fields = line.rstrip("\n").split("\t")
+            kind = KIND_NAMES[fields[2].strip().lower()] if len(fields) > 2 else WORD
+            terms.append((fields[0].strip(), float(fields[1]), kind))
+    return terms
+
+class Lexicon:
+    """Read-only view over a binary lexicon.
+
+    Weights, kinds and term bytes are read in place from the buffer, so a
+    memory-mapped file is shared through the page cache by every process
+    that opens it, including forked workers. Only the term -> id dict
+    used for lookups is built per process, on first use. Pickling sends
+    the file path, not the buffer, and the receiving process reopens it.
+    """
+
+    def __init__(self, buffer, path: Optional[str] = None):
+        self._buffer = buffer
+        self.path = path
+        self.shared = False  # Returned by load_lexicon
+        view = memoryview(buffer)
+        magic, count, blob_size = _HEADER.unpack_from(view)
+        if magic != _MAGIC:
+            raise ValueError("Not a lexicon file")
+        start = _HEADER.size
+        sections = []
+        for size in (4 * (count + 1), 4 * count, count, blob_size):
+            sections.append(view[start:start + size])
+            start += size
+        if start > len(view):
+            raise ValueError("Truncated lexicon file")
+
+        self._offsets, self.weights, self.kinds, self._blob = sections
+        self._offsets, self.weights = self._offsets.cast("I"), self.weights.cast("f")
+        if sys.byteorder != "little":
+            self._offsets, self.weights = self._swapped(self._offsets, "I"), self._swapped(self.weights, "f")
+        self._index: Optional[Dict[str, int]] = None
+
+    @staticmethod
+    def _swapped(view: memoryview, typecode: str) -> array:
+        values = array(typecode, view.tobytes())
+        values.byteswap()
+        return values
+
+    @classmethod
+    def open(cls, path: str) -> "Lexicon":
+        with open(path, "rb") as f:
+            return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ), path)
+
+    @classmethod
+    def from_terms(cls, terms: Iterable[Tuple[str, float, int]]) -> "Lexicon":
+        return cls(encode_lexicon(terms))
+
+    @property
+    def buffer(self):
+        """The underlying bytes or mmap, for zero-copy array views"""
+        return self._buffer
+
+    @property
+    def index(self) -> Dict[str, int]:
+        if self._index is None:
+            offsets, blob = self._offsets, self._blob
+            self._index = {
+                bytes(blob[offsets[i]:offsets[i + 1]]).decode("utf-8"): i
+                for i in range(len(self.kinds))
+            }
+        return self._index
+
+    def term(self, term_id: int) -> str:
+        return bytes(self._blob[self._offsets[term_id]:self._offsets[term_id + 1]]).decode("utf-8")
+
+    def polarity(self, tokens: Sequence[str]) -> Tuple[float, float]:
+        """Positive and negative weight (as magnitudes) of lowercase tokens, after negation and intensifiers.
+
+        An intensifier scales the word right after it; a negation flips
+        the words in the next NEGATION_WINDOW tokens.
+        """
+        index, weights, kinds = self.index, self.weights, self.kinds
+        positive = negative = 0.0
+        negated_until, boost = -1, 1.0
+        for position, token in enumerate(tokens):
+            term_id = index.get(token)
+            kind = kinds[term_id] if term_id is not None else None
+            if kind == WORD:
+                value = weights[term_id] * boost
+                if position <= negated_until:
+                    value *= NEGATION_FACTOR
+                if value > 0:
+                    positive += value
+                else:
+                    negative -= value
+            elif kind == NEGATION:
+                negated_until = position + NEGATION_WINDOW
+            boost = weights[term_id] if kind == INTENSIFIER else 1.0
+        return positive, negative
+
+    def score(self, text: str) -> float:
+        positive, negative = self.polarity(tokenize(text))
+        return positive - negative
+
+    def __reduce__(self):
+        # Memoryviews cannot be pickled; reopen the source instead
+        if self.shared:
+            return _shared_lexicon, (self.path or "",)
+        if self.path is not None:
+            return Lexicon.open, (self.path,)
+        return Lexicon, (bytes(self._buffer),)
+
+    def __contains__(self, term: str) -> bool:
+        return term.lower() in self.index
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+_loaded: Dict[str, Lexicon] = {}
+_load_lock = threading.Lock()
+
+def load_lexicon(path: Optional[str] = None) -> Lexicon:
+    """The process-wide lexicon for path (default: llm_config.lexicon_path, else DEFAULT_TERMS).
+
+    Each file is opened once per process; load before forking workers
+    so they inherit the mapping instead of opening their own.
+    """
+    return _shared_lexicon(path or llm_config.lexicon_path or "")
+
+def _shared_lexicon(path: str) -> Lexicon:
+    """load_lexicon for a resolved path, "" meaning DEFAULT_TERMS"""
+    key = os.path.realpath(path) if path else ""
+    with _load_lock:
+        lexicon = _loaded.get(key)
+        if lexicon is None:
+            lexicon = Lexicon.open(path) if path else Lexicon.from_terms(DEFAULT_TERMS)
+            lexicon.shared = True
+            _loaded[key] = lexicon
+    return lexicon
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a binary sentiment lexicon")
+    parser.add_argument("output", help="lexicon file to write")
+    parser.add_argument("sources", nargs="*", help="term<TAB>weight[<TAB>kind] files (default: built-in terms)")
+    args = parser.parse_args()
+
+    terms = list(DEFAULT_TERMS) if not args.sources else [t for source in args.sources for t in read_tsv(source)]
+    write_lexicon(args.output, terms)
+    print(f"Wrote {len(Lexicon.open(args.output)):,} terms to {args.output}")
+
+if __name__ == "__main__":
+    main()
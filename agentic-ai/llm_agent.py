@@ -2,84 +2,128 @@
 LLM-powered Agent for Natural Language Processing
 """
 
+import itertools
 import json
 import re
 from agent import Agent, Task
-from typing import Dict, List, Any, Optional
+from config import llm_config
+from conversation import ConversationWindow
+from glossary import Glossary
+from lexicon import Lexicon, load_lexicon
+from sentiment_engine import SentimentEngine
+from summarizer import TextRankSummarizer
+from typing import Callable, Dict, Iterable, Iterator, List, Any, Optional, Tuple, Union
 
 class LLMAgent(Agent):
-    def __init__(self, model_type="local"):
+    DEFAULT_TRANSLATIONS = {
+        "hello": "hola",
+        "goodbye": "adiós",
+        "thank you": "gracias",
+        "please": "por favor"
+    }
+    
+    def __init__(self, model_type="local", glossary: Optional[Glossary] = None, lexicon: Optional[Lexicon] = None):
         super().__init__("LLMAgent", ["nlp", "text", "language", "chat", "analyze", "summarize"])
         self.model_type = model_type
-        self.conversation_history = []
+        self.conversation = ConversationWindow(
+            max_tokens=llm_config.conversation_max_tokens,
+            max_turns=llm_config.conversation_max_turns,
+            summary_tokens=llm_config.conversation_summary_tokens
+        )
+        self.summarizer = TextRankSummarizer()
+        self.glossary = glossary if glossary is not None else Glossary(self.DEFAULT_TRANSLATIONS)
+        self.lexicon = lexicon if lexicon is not None else load_lexicon()
+        self.sentiment_engine = SentimentEngine(self.lexicon)
     
     def execute_task(self, task: Task) -> Any:
         self.add_memory(f"Processing NLP task: {task.description}")
+        return self._select_handler(task.description)(task.description)
+    
+    def execute_batch(self, tasks: List[Task]) -> List[Any]:
+        """Process a batch, handling all sentiment and translation tasks in one pass each"""
+        self.add_memory(f"Processing NLP batch of {len(tasks)} tasks")
+        
+        batch_handlers = {
+            self._analyze_sentiment: self._analyze_sentiment_batch,
+            self._translate_text: self._translate_batch
+        }
+        results: List[Any] = [None] * len(tasks)
+        grouped: Dict[Callable, List[int]] = {}
+        for position, task in enumerate(tasks):
+            handler = self._select_handler(task.description)
+            if handler in batch_handlers:
+                grouped.setdefault(handler, []).append(position)
+                continue
+            try:
+                results[position] = handler(task.description)
+            except Exception as e:
+                results[position] = e
+        
+        for handler, positions in grouped.items():
+            texts = [tasks[position].description for position in positions]
+            for position, result in zip(positions, batch_handlers[handler](texts)):
+                results[position] = result
         
+        return results
+    
+    def _select_handler(self, description: str) -> Callable[[str], Dict]:
         # Route to appropriate NLP function
-        if "summarize" in task.description.lower():
-            return self._summarize_text(task.description)
-        elif "sentiment" in task.description.lower():
-            return self._analyze_sentiment(task.description)
-        elif "extract" in task.description.lower():
-            return self._extract_entities(task.description)
-        elif "translate" in task.description.lower():
-            return self._translate_text(task.description)
-        elif "chat" in task.description.lower() or "respond" in task.description.lower():
-            return self._chat_response(task.description)
+        description = description.lower()
+        if "summarize" in description:
+            return self._summarize_text
+        elif "sentiment" in description:
+            return self._analyze_sentiment
+        elif "extract" in description:
+            return self._extract_entities
+        elif "translate" in description:
+            return self._translate_text
+        elif "chat" in description or "respond" in description:
+            return self._chat_response
         else:
-            return self._general_nlp_processing(task.description)
+            return self._general_nlp_processing
     
     def _summarize_text(self, text: str) -> Dict:
-        # Simple extractive summarization
-        sentences = text.split('.')
-        key_sentences = [s.strip() for s in sentences if len(s.strip()) > 20][:3]
+        # Extractive summarization: TextRank over TF-IDF sentence similarity
+        summary = " ".join(self.summarizer.summarize(text))
         
         return {
-            "summary": ". ".join(key_sentences),
+            "summary": summary,
             "original_length": len(text),
-            "summary_length": len(". ".join(key_sentences)),
-            "compression_ratio": round(len(". ".join(key_sentences)) / len(text), 2)
+            "summary_length": len(summary),
+            "compression_ratio": round(len(summary) / len(text), 2) if text else 0.0
         }
     
     def _analyze_sentiment(self, text: str) -> Dict:
-        # Simple rule-based sentiment analysis
-        positive_words = ["good", "great", "excellent", "amazing", "wonderful", "fantastic", "love", "like"]
-        negative_words = ["bad", "terrible", "awful", "hate", "dislike", "horrible", "worst"]
-        
-        text_lower = text.lower()
-        pos_count = sum(1 for word in positive_words if word in text_lower)
-        neg_count = sum(1 for word in negative_words if word in text_lower)
-        
-        if pos_count > neg_count:
-            sentiment = "positive"
-            confidence = min(0.9, 0.5 + (pos_count - neg_count) * 0.1)
-        elif neg_count > pos_count:
-            sentiment = "negative"
-            confidence = min(0.9, 0.5 + (neg_count - pos_count) * 0.1)
-        else:
-            sentiment = "neutral"
-            confidence = 0.5
-        
-        return {
-            "sentiment": sentiment,
-            "confidence": confidence,
-            "positive_indicators": pos_count,
-            "negative_indicators": neg_count
-        }
+        return self._analyze_sentiment_batch([text])[0]
+    
+    def _analyze_sentiment_batch(self, texts: List[str]) -> List[Dict]:
+        # Weighted lexicon scoring with negation and intensifiers, one sparse pass for the batch
+        results = []
+        for pos_count, neg_count in self.sentiment_engine.polarities(texts):
+            
+            if pos_count > neg_count:
+                sentiment = "positive"
+                confidence = round(min(0.9, 0.5 + (pos_count - neg_count) * 0.1), 2)
+            elif neg_count > pos_count:
+                sentiment = "negative"
+                confidence = round(min(0.9, 0.5 + (neg_count - pos_count) * 0.1), 2)
+            else:
+                sentiment = "neutral"
+                confidence = 0.5
+            
+            results.append({
+                "sentiment": sentiment,
+                "confidence": confidence,
+                "positive_indicators": round(pos_count, 2),
+                "negative_indicators": round(neg_count, 2)
+            })
+        return results
     
     def _extract_entities(self, text: str) -> Dict:
         # Simple entity extraction using regex
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        phone_pattern = r'\b\d{3}-\d{3}-\d{4}\b|\b\(\d{3}\)\s*\d{3}-\d{4}\b'
-        date_pattern = r'\b\d{1,2}/\d{1,2}/\d{4}\b|\b\d{4}-\d{2}-\d{2}\b'
-        
-        entities = {
-            "emails": re.findall(email_pattern, text),
-            "phones": re.findall(phone_pattern, text),
-            "dates": re.findall(date_pattern, text),
-            "numbers": re.findall(r'\b\d+\.?\d*\b', text)
-        }
+        entities = {key: [] for key in ENTITY_KEYS.values()}
+        for kind, value in self.iter_entities(text):
+            entities[ENTITY_KEYS[kind]].append(value)
         
         return {
             "entities": entities,
@@ -87,26 +131,39 @@ class LLMAgent(Agent):
             "text_length": len(text)
         }
     
-    def _translate_text(self, text: str) -> Dict:
-        # Mock translation (in real implementation, use translation API)
-        translations = {
-            "hello": "hola",
-            "goodbye": "adiós",
-            "thank you": "gracias",
-            "please": "por favor"
-        }
+    def iter_entities(self, source: Union[str, Iterable[str]], chunk_size: int = 1 << 20) -> Iterator[Tuple[str, str]]:
+        """Yield (kind, value) for each entity in a string or a stream of text chunks.
         
-        translated = text.lower()
-        for eng, spa in translations.items():
-            translated = translated.replace(eng, spa)
+        An open text file can be passed directly; memory use is bounded by
+        the chunk size rather than the document size.
+        """
+        for match in _iter_entity_matches(source, chunk_size):
+            yield match.lastgroup, match.group()
+    
+    def count_entities(self, source: Union[str, Iterable[str]], chunk_size: int = 1 << 20) -> Dict[str, int]:
+        """Entity counts by kind without keeping the matched text"""
+        counts = dict.fromkeys(ENTITY_KEYS.values(), 0)
+        for match in _iter_entity_matches(source, chunk_size):
+            counts[ENTITY_KEYS[match.lastgroup]] += 1
+        return counts
+    
+    def _translate_text(self, text: str) -> Dict:
+        return self._translate_batch([text])[0]
+    
+    def _translate_batch(self, texts: List[str]) -> List[Dict]:
+        # Glossary translation (in real implementation, use translation API)
+        translated = self.glossary.translate_many(text.lower() for text in texts)
         
-        return {
-            "original": text,
-            "translated": translated,
-            "source_language": "en",
-            "target_language": "es",
-            "confidence": 0.8
-        }
+        return [
+            {
+                "original": text,
+                "translated": result,
+                "source_language": "en",
+                "target_language": "es",
+                "confidence": 0.8
+            }
+            for text, result in zip(texts, translated)
+        ]
     
     def _chat_response(self, message: str) -> Dict:
         # Simple chatbot responses
@@ -126,11 +183,11 @@ class LLMAgent(Agent):
                 response = resp
                 break
         
-        self.conversation_history.append({"user": message, "assistant": response})
+        self.conversation.add_exchange(message, response)
         
         return {
             "response": response,
-            "conversation_turn": len(self.conversation_history),
+            "conversation_turn": self.conversation.total_turns // 2,
             "context_maintained": True
         }
     
@@ -147,56 +204,155 @@ class LLMAgent(Agent):
             "language_detected": "en"
         }
 
+# One pass finds every entity kind; a span belongs to the first alternative that matches it
+ENTITY_PATTERN = re.compile(
+    r'(?P<email>\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b)'
+    r'|(?P<phone>\b\d{3}-\d{3}-\d{4}\b|\b\(\d{3}\)\s*\d{3}-\d{4}\b)'
+    r'|(?P<date>\b\d{1,2}/\d{1,2}/\d{4}\b|\b\d{4}-\d{2}-\d{2}\b)'
+    r'|(?P<number>\b\d+\.?\d*\b)'
+)
+ENTITY_KEYS = {"email": "emails", "phone": "phones", "date": "dates", "number": "numbers"}
+
+# Entities are assumed shorter than this, so a match starting this far from
+# the end of the buffered text sees all of its characters, and is the same
+# match a scan of the whole text would find there
+ENTITY_OVERLAP = 256
+
+def _iter_entity_matches(source: Union[str, Iterable[str]], chunk_size: int) -> Iterator[re.Match]:
+    chunks = source
+    if isinstance(source, str):
+        chunks = (source[i:i + chunk_size] for i in range(0, len(source), chunk_size))
+    
+    buffer, pos = "", 0
+    pending, pending_size = [], 0
+    for chunk in chunks:
+        # Small pieces such as file lines are gathered into one chunk first
+        pending.append(chunk)
+        pending_size += len(chunk)
+        if pending_size < chunk_size:
+            continue
+        buffer += "".join(pending)
+        pending, pending_size = [], 0
+        limit = len(buffer) - ENTITY_OVERLAP
+        for match in ENTITY_PATTERN.finditer(buffer, pos):
+            if match.start() >= limit:
+                # Could be cut short, or be a shorter alternative of an entity
+                # that continues into the next chunk
+                break
+            yield match
+            pos = match.end()
+        # Everything from limit on is rescanned once more text has arrived
+        cut = max(pos, limit)
+        # Keep one character before the cut so \b sees what precedes it
+        keep = 1 if cut > 0 else 0
+        buffer, pos = buffer[cut - keep:], keep
+    
+    yield from ENTITY_PATTERN.finditer(buffer + "".join(pending), pos)
+
 class TaskInterpreter:
-    """Interprets natural language task descriptions"""
+    """Interprets natural language task descriptions.
+    
+    Task patterns and priority words are compiled into a single regex
+    when the interpreter is created, so each description is classified
+    in one scan however many patterns there are.
+    """
     
-    def __init__(self):
-        self.task_patterns = {
+    def __init__(self, task_patterns: Optional[Dict[str, List[str]]] = None,
+                 priority_words: Optional[Dict[int, List[str]]] = None):
+        self.task_patterns = task_patterns or {
             "data": ["analyze data", "process data", "clean data", "load data"],
             "ml": ["train model", "predict", "machine learning", "classification"],
             "nlp": ["summarize", "translate", "sentiment", "text analysis"],
             "plan": ["create plan", "schedule", "organize", "coordinate"]
         }
+        self.priority_words = priority_words or {
+            3: ["urgent", "asap", "critical", "important"],
+            2: ["soon", "priority", "needed"]
+        }
+        self._compile()
     
-    def interpret_task(self, description: str) -> Dict:
-        """Convert natural language to structured task"""
-        desc_lower = description.lower()
+    def _compile(self):
+        # Earlier categories win, so each phrase maps to (category rank, priority)
+        self._categories = list(self.task_patterns) + ["general"]
+        no_match = len(self._categories) - 1
+        phrases: Dict[str, List[int]] = {}
+        for rank, patterns in enumerate(self.task_patterns.values()):
+            for pattern in patterns:
+                entry = phrases.setdefault(pattern.lower(), [no_match, 1])
+                entry[0] = min(entry[0], rank)
+        for priority, words in self.priority_words.items():
+            for word in words:
+                entry = phrases.setdefault(word.lower(), [no_match, 1])
+                entry[1] = max(entry[1], priority)
         
-        # Determine task type
-        task_type = "general"
-        confidence = 0.5
+        # The matcher reports the longest phrase at each position, which
+        # also implies every shorter phrase starting there
+        self._lookup = {}
+        for phrase in phrases:
+            prefixes = [phrases[other] for other in phrases if other and phrase.startswith(other)]
+            self._lookup[phrase] = (min(rank for rank, _ in prefixes), max(priority for _, priority in prefixes))
         
-        for category, patterns in self.task_patterns.items():
-            for pattern in patterns:
-                if pattern in desc_lower:
-                    task_type = category
-                    confidence = 0.9
-                    break
-            if confidence > 0.8:
-                break
+        phrase_list = [phrase for phrase in phrases if phrase]
+        self._matcher = re.compile(f"(?=({_trie_pattern(phrase_list)}))") if phrase_list else None
+    
+    def interpret_task(self, description: str) -> Dict:
+        """Convert natural language to structured task"""
+        no_match = len(self._categories) - 1
+        rank, priority = no_match, 1
         
-        # Extract priority indicators
-        priority = 1
-        if any(word in desc_lower for word in ["urgent", "asap", "critical", "important"]):
-            priority = 3
-        elif any(word in desc_lower for word in ["soon", "priority", "needed"]):
-            priority = 2
+        if self._matcher is not None:
+            lookup = self._lookup
+            for phrase in self._matcher.findall(description.lower()):
+                phrase_rank, phrase_priority = lookup[phrase]
+                if phrase_rank < rank:
+                    rank = phrase_rank
+                if phrase_priority > priority:
+                    priority = phrase_priority
         
         return {
-            "task_type": task_type,
+            "task_type": self._categories[rank],
             "priority": priority,
-            "confidence": confidence,
+            "confidence": 0.9 if rank != no_match else 0.5,
             "original_description": description,
             "processed_description": description.strip()
         }
+    
+    def interpret_tasks(self, descriptions: Iterable[str]) -> List[Dict]:
+        """Interpret many descriptions for bulk ingestion"""
+        interpret = self.interpret_task
+        return [interpret(description) for description in descriptions]
+
+def _trie_pattern(phrases: List[str]) -> str:
+    """Regex alternation of phrases factored by common prefix, longest match first"""
+    root: Dict[str, Dict] = {}
+    for phrase in phrases:
+        node = root
+        for char in phrase:
+            node = node.setdefault(char, {})
+        node[""] = {}
+    
+    def emit(node: Dict[str, Dict]) -> str:
+        branches = [re.escape(char) + emit(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" in node:
+            # A phrase ends here; trying the longer branches first keeps the match greedy
+            body = ("(?:" + body + ")" if len(body) > 1 and len(branches) == 1 else body) + "?"
+        return body
+    
+    return emit(root)
+
+_interpreter = TaskInterpreter()
+
+_intelligent_task_ids = itertools.count(1)
 
 def create_intelligent_task(description: str) -> Task:
     """Create a task with LLM interpretation"""
-    interpreter = TaskInterpreter()
-    interpretation = interpreter.interpret_task(description)
+    interpretation = _interpreter.interpret_task(description)
     
     task = Task(
-        id=f"llm_task_{hash(description) % 10000}",
+        id=f"llm_task_{hash(description) % 10000}_{next(_intelligent_task_ids)}",
         description=interpretation["processed_description"],
         priority=interpretation["priority"]
     )
@@ -0,0 +1,182 @@
+"""
+Per-Agent Latency and Throughput Metrics
+Exposed in Prometheus text format
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+from agent import Task
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class Histogram:
+    """Cumulative-bucket latency histogram"""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        total, rows = 0, []
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            rows.append((_format_bound(bound), total))
+        rows.append(("+Inf", total + self.counts[-1]))
+        return rows
+
+class RateWindow:
+    """Events per second over a sliding window of one-second slots"""
+
+    def __init__(self, seconds: int = 60):
+        self.seconds = seconds
+        self._slots = [0] * seconds
+        self._slot_times = [0] * seconds
+        self.created_at = time.time()
+
+    def add(self, now: float):
+        second = int(now)
+        slot = second % self.seconds
+        if self._slot_times[slot] != second:
+            self._slot_times[slot] = second
+            self._slots[slot] = 0
+        self._slots[slot] += 1
+
+    def rate(self, now: float) -> float:
+        oldest = int(now) - self.seconds
+        events = sum(count for count, second in zip(self._slots, self._slot_times) if second > oldest)
+        # A young window divides by the time it has actually been open
+        return events / max(1.0, min(self.seconds, now - self.created_at))
+
+class MetricsRegistry:
+    """Thread-safe store of task latency, throughput and error metrics"""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS, rate_window: int = 60):
+        self.buckets = buckets
+        self.rate_window = rate_window
+        self._lock = threading.Lock()
+        self._latency: Dict[Tuple[str, str], Histogram] = {}
+        self._outcomes: Dict[Tuple[str, str, str], int] = {}
+        self._rates: Dict[str, RateWindow] = {}
+        self._dispatch = Histogram(buckets)
+        self.started_at = time.time()
+
+    def observe_task(self, agent: str, task_type: str, seconds: float, failed: bool = False):
+        now = time.time()
+        with self._lock:
+            key = (agent, task_type)
+            histogram = self._latency.get(key)
+            if histogram is None:
+                histogram = self._latency[key] = Histogram(self.buckets)
+            histogram.observe(seconds)
+            outcome = (agent, task_type, "failed" if failed else "completed")
+            self._outcomes[outcome] = self._outcomes.get(outcome, 0) + 1
+            if agent not in self._rates:
+                self._rates[agent] = RateWindow(self.rate_window)
+            self._rates[agent].add(now)
+
+    def observe_dispatch(self, seconds: float):
+        with self._lock:
+            self._dispatch.observe(seconds)
+
+    @contextmanager
+    def time_task(self, agent: str, task_type: str = "general"):
+        """Time a block of agent work; an exception counts as a failure"""
+        started = time.perf_counter()
+        failed = False
+        try:
+            yield
+        except Exception:
+            failed = True
+            raise
+        finally:
+            self.observe_task(agent, task_type, time.perf_counter() - started, failed)
+
+    def snapshot(self) -> Dict:
+        now = time.time()
+        with self._lock:
+            agents: Dict[str, Dict] = {}
+            for (agent, task_type), histogram in self._latency.items():
+                entry = agents.setdefault(agent, {"task_types": {}, "throughput_per_second": self._rates[agent].rate(now)})
+                entry["task_types"][task_type] = {
+                    "count": histogram.count,
+                    "errors": self._outcomes.get((agent, task_type, "failed"), 0),
+                    "mean_seconds": histogram.sum / histogram.count if histogram.count else 0.0
+                }
+            return {"uptime_seconds": now - self.started_at, "agents": agents}
+
+    def render_prometheus(self) -> str:
+        now = time.time()
+        lines = []
+        with self._lock:
+            lines.append("# HELP agent_task_duration_seconds Time agents spend executing tasks")
+            lines.append("# TYPE agent_task_duration_seconds histogram")
+            for (agent, task_type), histogram in sorted(self._latency.items()):
+                labels = f'agent="{_escape(agent)}",task_type="{_escape(task_type)}"'
+                for bound, count in histogram.cumulative():
+                    lines.append(f'agent_task_duration_seconds_bucket{{{labels},le="{bound}"}} {count}')
+                lines.append(f"agent_task_duration_seconds_sum{{{labels}}} {histogram.sum}")
+                lines.append(f"agent_task_duration_seconds_count{{{labels}}} {histogram.count}")
+
+            lines.append("# HELP agent_tasks_total Tasks finished by agent, task type and outcome")
+            lines.append("# TYPE agent_tasks_total counter")
+            for (agent, task_type, status), count in sorted(self._outcomes.items()):
+                lines.append(
+                    f'agent_tasks_total{{agent="{_escape(agent)}",task_type="{_escape(task_type)}",status="{status}"}} {count}'
+                )
+
+            lines.append("# HELP agent_task_errors_total Tasks that raised an error")
+            lines.append("# TYPE agent_task_errors_total counter")
+            for (agent, task_type, status), count in sorted(self._outcomes.items()):
+                if status == "failed":
+                    lines.append(f'agent_task_errors_total{{agent="{_escape(agent)}",task_type="{_escape(task_type)}"}} {count}')
+
+            lines.append(f"# HELP agent_throughput_tasks_per_second Tasks finished per second over the last {self.rate_window}s")
+            lines.append("# TYPE agent_throughput_tasks_per_second gauge")
+            for agent, window in sorted(self._rates.items()):
+                lines.append(f'agent_throughput_tasks_per_second{{agent="{_escape(agent)}"}} {window.rate(now)}')
+
+            lines.append("# HELP coordinator_dispatch_duration_seconds Time from dequeue to result in execute_next_task")
+            lines.append("# TYPE coordinator_dispatch_duration_seconds histogram")
+            for bound, count in self._dispatch.cumulative():
+                lines.append(f'coordinator_dispatch_duration_seconds_bucket{{le="{bound}"}} {count}')
+            lines.append(f"coordinator_dispatch_duration_seconds_sum {self._dispatch.sum}")
+            lines.append(f"coordinator_dispatch_duration_seconds_count {self._dispatch.count}")
+
+        lines.append("# HELP process_uptime_seconds Seconds since metrics collection started")
+        lines.append("# TYPE process_uptime_seconds gauge")
+        lines.append(f"process_uptime_seconds {now - self.started_at}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self._latency.clear()
+            self._outcomes.clear()
+            self._rates.clear()
+            self._dispatch = Histogram(self.buckets)
+            self.started_at = time.time()
+
+def task_type_of(task: Optional[Task]) -> str:
+    """Task type from LLM interpretation metadata, else "general\""""
+    metadata = getattr(task, "metadata", None) or {}
+    return metadata.get("task_type", "general")
+
+def _format_bound(bound: float) -> str:
+    return repr(float(bound))
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+# Global registry shared by coordinators and web servers
+metrics = MetricsRegistry()
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
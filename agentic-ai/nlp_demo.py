@@ -13,7 +13,7 @@ def main():
     
     # Create enhanced system with LLM agents
     coordinator = AgentCoordinator()
-    coordinator.agents.extend([
+    coordinator.register_agents([
         LLMAgent(),
         OpenAIAgent()
     ])
@@ -44,7 +44,7 @@ def main():
         
         # Create and execute task
         task = create_intelligent_task(task_desc)
-        coordinator.task_queue.append(task)
+        coordinator.queue_task(task)
         
         # Execute the task
         result = coordinator.execute_next_task()
@@ -71,7 +71,7 @@ def interactive_mode():
     print("\n🎯 Interactive LLM Mode (type 'quit' to exit)")
     
     coordinator = AgentCoordinator()
-    coordinator.agents.extend([LLMAgent(), OpenAIAgent()])
+    coordinator.register_agents([LLMAgent(), OpenAIAgent()])
     
     while True:
         user_input = input("\n💬 Enter a task: ").strip()
@@ -84,7 +84,7 @@ def interactive_mode():
         
         # Process the natural language input
         task = create_intelligent_task(user_input)
-        coordinator.task_queue.append(task)
+        coordinator.queue_task(task)
         
         result = coordinator.execute_next_task()
         
@@ -0,0 +1,344 @@
+"""
+Pooled, Rate-Limited HTTP Client for the OpenAI Chat Completions API
+"""
+
+import asyncio
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from budget import DeadlineExceeded
+
+try:
+    import aiohttp
+except ImportError:  # OpenAIAgent falls back to running the blocking client in an executor
+    aiohttp = None
+from tokens import estimate_message_tokens
+
+class OpenAIAPIError(Exception):
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+def _remaining(deadline: Optional[float]) -> Optional[float]:
+    """Seconds left until a time.monotonic() deadline, or DeadlineExceeded once it has passed"""
+    if deadline is None:
+        return None
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise DeadlineExceeded("Deadline passed before the call finished")
+    return remaining
+
+def _backoff(attempt: int, retry_after: Optional[str]) -> float:
+    if retry_after:
+        try:
+            return float(retry_after)
+        except ValueError:
+            pass
+    # Exponential backoff with jitter, capped at 30 seconds
+    return min(30.0, (2 ** attempt) * 0.5) * (0.5 + random.random() / 2)
+
+def _error_message(status_code: int, text: str) -> str:
+    try:
+        body = json.loads(text)
+    except ValueError:
+        body = None
+    error = body.get("error") if isinstance(body, dict) else None
+    if isinstance(error, dict) and error.get("message"):
+        return error["message"]
+    return f"HTTP {status_code}: {text[:200]}"
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at capacity per period"""
+
+    def __init__(self, capacity: float, period: float = 60.0):
+        self.capacity = capacity
+        self.rate = capacity / period
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, amount: float) -> float:
+        """Take amount from the bucket; returns how long to wait before using it"""
+        amount = min(amount, self.capacity)
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens -= amount
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def refund(self, amount: float):
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self.capacity, self._tokens + amount)
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute limits, plus a shared 429 pause"""
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: int, deadline: Optional[float] = None):
+        wait = self.reserve(tokens, deadline)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens: int, deadline: Optional[float] = None):
+        """acquire for coroutines: waits on the event loop instead of blocking it"""
+        wait = self.reserve(tokens, deadline)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def reserve(self, tokens: int, deadline: Optional[float] = None) -> float:
+        """Take one request and tokens from the budgets; returns how long to wait before sending"""
+        wait = max(self.requests.reserve(1), self.tokens.reserve(tokens))
+        with self._lock:
+            wait = max(wait, self._paused_until - time.monotonic())
+        if deadline is not None and time.monotonic() + wait > deadline:
+            # Give the capacity back for callers that can still use it
+            self.requests.refund(1)
+            self.tokens.refund(tokens)
+            raise DeadlineExceeded("Rate limits would delay the call past its deadline")
+        return max(wait, 0.0)
+
+    def pause(self, seconds: float):
+        """Hold every caller back after the server says we are rate limited"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+class OpenAIClient:
+    """Chat completions over a pooled keep-alive session.
+
+    At most max_concurrency requests are in flight; request and token
+    budgets are enforced client-side, and 429/5xx responses are retried
+    with backoff that honours Retry-After. A `deadline` (a
+    time.monotonic() value) bounds a whole call, including rate-limit
+    waits, retries and every chunk of a stream, with DeadlineExceeded.
+    base_url can point at a local mock server for testing.
+    """
+
+    def __init__(self, api_key: str, base_url: str = "https://api.openai.com/v1", max_concurrency: int = 8,
+                 requests_per_minute: int = 3500, tokens_per_minute: int = 90000, max_retries: int = 5,
+                 timeout: float = 30.0):
+        self.base_url = base_url.rstrip("/")
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json"
+        })
+
+    def chat_completion(self, messages: List[Dict], model: str = "gpt-3.5-turbo", max_tokens: int = 150,
+                        temperature: float = 0.7, timeout: Optional[float] = None, deadline: Optional[float] = None,
+                        **params) -> Dict[str, Any]:
+        """POST /chat/completions and return the decoded JSON response"""
+        payload = {"model": model, "messages": messages, "max_tokens": max_tokens, "temperature": temperature, **params}
+        reserved = estimate_message_tokens(messages) + max_tokens
+        self.limiter.acquire(reserved, deadline)
+
+        data = self._post("/chat/completions", payload, timeout=timeout, deadline=deadline)
+        used = data.get("usage", {}).get("total_tokens")
+        if used is not None and used < reserved:
+            self.limiter.tokens.refund(reserved - used)
+        return data
+
+    def stream_chat_completion(self, messages: List[Dict], model: str = "gpt-3.5-turbo", max_tokens: int = 150,
+                               temperature: float = 0.7, timeout: Optional[float] = None,
+                               deadline: Optional[float] = None, **params) -> Iterator[str]:
+        """POST /chat/completions with stream=True, yielding content deltas as they arrive.
+
+        The concurrency slot is held until the stream is exhausted or closed.
+        """
+        payload = {"model": model, "messages": messages, "max_tokens": max_tokens, "temperature": temperature,
+                   "stream": True, **params}
+        self.limiter.acquire(estimate_message_tokens(messages) + max_tokens, deadline)
+
+        with self._slot(deadline):
+            response = self._post("/chat/completions", payload, stream=True, timeout=timeout, deadline=deadline)
+            try:
+                for line in response.iter_lines(decode_unicode=True):
+                    # A server that keeps sending must still stop at the deadline
+                    _remaining(deadline)
+                    if not line or not line.startswith("data:"):
+                        continue
+                    data = line[5:].strip()
+                    if data == "[DONE]":
+                        break
+                    choices = json.loads(data).get("choices") or []
+                    content = choices[0].get("delta", {}).get("content") if choices else None
+                    if content:
+                        yield content
+            finally:
+                response.close()
+
+    def chat_completions(self, batch: List[List[Dict]], start_deadline: Optional[Callable[[], Optional[float]]] = None,
+                         **kwargs) -> List[Any]:
+        """Run many conversations concurrently; failures come back as exceptions.
+
+        start_deadline, if given, is called as each conversation's call
+        starts, so every call gets its own deadline rather than sharing one
+        for the whole batch.
+        """
+        def run(messages):
+            try:
+                if start_deadline is not None:
+                    return self.chat_completion(messages, deadline=start_deadline(), **kwargs)
+                return self.chat_completion(messages, **kwargs)
+            except Exception as e:
+                return e
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as pool:
+            return list(pool.map(run, batch))
+
+    @contextmanager
+    def _slot(self, deadline: Optional[float]):
+        """Hold one of the max_concurrency request slots, waiting no later than deadline"""
+        if not self._slots.acquire(timeout=_remaining(deadline)):
+            raise DeadlineExceeded("No request slot came free before the deadline")
+        try:
+            yield
+        finally:
+            self._slots.release()
+
+    def _post(self, path: str, payload: Dict, stream: bool = False, timeout: Optional[float] = None,
+              deadline: Optional[float] = None) -> Any:
+        # Streaming callers hold a slot themselves until the body is consumed
+        url = self.base_url + path
+        for attempt in range(self.max_retries + 1):
+            with nullcontext() if stream else self._slot(deadline):
+                # Socket timeouts apply per read, so cap them at the time left
+                remaining = _remaining(deadline)
+                request_timeout = timeout or self.timeout
+                if remaining is not None:
+                    request_timeout = min(request_timeout, remaining)
+                try:
+                    response = self.session.post(url, data=json.dumps(payload), timeout=request_timeout,
+                                                 stream=stream)
+                except requests.RequestException as e:
+                    if attempt == self.max_retries:
+                        raise OpenAIAPIError(f"Request failed: {e}")
+                    response = None
+
+            error = "request failed"
+            if response is not None:
+                if response.status_code < 400:
+                    return response if stream else response.json()
+                error = _error_message(response.status_code, response.text)
+                # An unread streamed body would keep its pooled connection checked out
+                response.close()
+                if (response.status_code != 429 and response.status_code < 500) or attempt == self.max_retries:
+                    raise OpenAIAPIError(error, response.status_code)
+
+            delay = _backoff(attempt, response.headers.get("Retry-After") if response is not None else None)
+            if response is not None and response.status_code == 429:
+                self.limiter.pause(delay)
+            if deadline is not None and time.monotonic() + delay >= deadline:
+                raise DeadlineExceeded(f"Retrying would run past the deadline (last error: {error})")
+            time.sleep(delay)
+
+    def close(self):
+        self.session.close()
+
+class AsyncOpenAIClient:
+    """Chat completions awaited on the event loop through an aiohttp session.
+
+    Shares a RateLimiter with the blocking client when given one, so both
+    transports draw on the same request and token budgets; connections
+    are capped at max_concurrency per event loop. Retries, Retry-After
+    and deadlines behave as in OpenAIClient.
+    """
+
+    def __init__(self, api_key: str, base_url: str = "https://api.openai.com/v1", max_concurrency: int = 8,
+                 requests_per_minute: int = 3500, tokens_per_minute: int = 90000, max_retries: int = 5,
+                 timeout: float = 30.0, limiter: Optional[RateLimiter] = None):
+        if aiohttp is None:
+            raise ImportError("aiohttp library not installed. Run: pip install aiohttp")
+        self.base_url = base_url.rstrip("/")
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.limiter = limiter if limiter is not None else RateLimiter(requests_per_minute, tokens_per_minute)
+        self.headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
+        self._session = None
+        self._session_loop = None
+
+    def _get_session(self) -> "aiohttp.ClientSession":
+        # Sessions belong to the loop that created them
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session_loop is not loop:
+            self._session = aiohttp.ClientSession(
+                headers=self.headers, connector=aiohttp.TCPConnector(limit=self.max_concurrency)
+            )
+            self._session_loop = loop
+        return self._session
+
+    async def chat_completion(self, messages: List[Dict], model: str = "gpt-3.5-turbo", max_tokens: int = 150,
+                              temperature: float = 0.7, timeout: Optional[float] = None,
+                              deadline: Optional[float] = None, **params) -> Dict[str, Any]:
+        """POST /chat/completions and return the decoded JSON response"""
+        payload = {"model": model, "messages": messages, "max_tokens": max_tokens, "temperature": temperature, **params}
+        reserved = estimate_message_tokens(messages) + max_tokens
+        await self.limiter.acquire_async(reserved, deadline)
+
+        data = await self._post("/chat/completions", payload, timeout=timeout, deadline=deadline)
+        used = data.get("usage", {}).get("total_tokens")
+        if used is not None and used < reserved:
+            self.limiter.tokens.refund(reserved - used)
+        return data
+
+    async def _post(self, path: str, payload: Dict, timeout: Optional[float] = None,
+                    deadline: Optional[float] = None) -> Dict:
+        url = self.base_url + path
+        session = self._get_session()
+        for attempt in range(self.max_retries + 1):
+            # The total timeout includes waiting for a free connection
+            remaining = _remaining(deadline)
+            request_timeout = timeout or self.timeout
+            if remaining is not None:
+                request_timeout = min(request_timeout, remaining)
+            status, error, retry_after = None, "request failed", None
+            try:
+                async with session.post(url, data=json.dumps(payload),
+                                        timeout=aiohttp.ClientTimeout(total=request_timeout)) as response:
+                    if response.status < 400:
+                        return await response.json(content_type=None)
+                    status, retry_after = response.status, response.headers.get("Retry-After")
+                    error = _error_message(status, await response.text())
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if attempt == self.max_retries:
+                    raise OpenAIAPIError(f"Request failed: {e}")
+
+            if status is not None and ((status != 429 and status < 500) or attempt == self.max_retries):
+                raise OpenAIAPIError(error, status)
+
+            delay = _backoff(attempt, retry_after)
+            if status == 429:
+                self.limiter.pause(delay)
+            if deadline is not None and time.monotonic() + delay >= deadline:
+                raise DeadlineExceeded(f"Retrying would run past the deadline (last error: {error})")
+            await asyncio.sleep(delay)
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
@@ -2,17 +2,85 @@
 OpenAI API Integration for Advanced LLM Capabilities
 """
 
+import asyncio
 import json
 import os
-from typing import Dict, List, Any, Optional
+import re
+import time
+from collections import OrderedDict
+from typing import Dict, Generator, List, Any, Optional
 from agent import Agent, Task
+from budget import BudgetEnforcer, BudgetExceeded, DeadlineExceeded
+from capability_index import CapabilityIndex
+from config import llm_config
+from conversation import ConversationWindow
+from response_cache import ResponseCache
+from tokens import estimate_message_tokens
 
 class OpenAIAgent(Agent):
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, cache: Optional[ResponseCache] = None):
         super().__init__("OpenAIAgent", ["gpt", "openai", "advanced_nlp", "reasoning", "creative"])
         self.api_key = api_key or os.getenv("OPENAI_API_KEY")
         self.model = "gpt-3.5-turbo"
-        self.conversation_history = []
+        self.max_tokens = llm_config.max_tokens
+        self.temperature = llm_config.temperature
+        self.conversation = ConversationWindow(
+            max_tokens=llm_config.conversation_max_tokens,
+            max_turns=llm_config.conversation_max_turns,
+            summary_tokens=llm_config.conversation_summary_tokens
+        )
+        self.response_cache = cache if cache is not None else ResponseCache(
+            max_entries=llm_config.response_cache_size,
+            ttl=llm_config.response_cache_ttl,
+            db_path=llm_config.response_cache_path
+        )
+        self.budget = BudgetEnforcer(
+            task_tokens=llm_config.task_token_budget,
+            minute_tokens=llm_config.minute_token_budget,
+            task_latency=llm_config.task_latency_budget,
+            minute_latency=llm_config.minute_latency_budget,
+            policy=llm_config.budget_policy
+        )
+        self._client = None
+        self._async_client = None
+    
+    def _get_client(self):
+        """Shared pooled client, created on first API call"""
+        if self._client is None:
+            from openai_client import OpenAIClient
+            self._client = OpenAIClient(
+                self.api_key,
+                base_url=llm_config.openai_base_url,
+                max_concurrency=llm_config.max_concurrent_requests,
+                requests_per_minute=llm_config.requests_per_minute,
+                tokens_per_minute=llm_config.tokens_per_minute,
+                timeout=llm_config.request_timeout
+            )
+        return self._client
+    
+    def _get_async_client(self):
+        """aiohttp client sharing the pooled client's rate limits, or None without aiohttp"""
+        if self._async_client is None:
+            try:
+                from openai_client import AsyncOpenAIClient
+                client = self._get_client()
+                self._async_client = AsyncOpenAIClient(
+                    self.api_key,
+                    base_url=client.base_url,
+                    max_concurrency=client.max_concurrency,
+                    timeout=client.timeout,
+                    limiter=client.limiter
+                )
+            except ImportError:
+                return None
+        return self._async_client
+    
+    def __getstate__(self):
+        # Sessions and locks don't pickle; a copy builds its own clients
+        state = self.__dict__.copy()
+        state['_client'] = None
+        state['_async_client'] = None
+        return state
     
     def execute_task(self, task: Task) -> Any:
         if not self.api_key:
@@ -24,6 +92,151 @@ class OpenAIAgent(Agent):
             self.add_memory(f"OpenAI API error: {str(e)}")
             return self._mock_openai_response(task.description)
     
+    def chat(self, message: str) -> Dict:
+        """Reply using the conversation window as context, then record the exchange"""
+        if not self.api_key:
+            result = self._mock_openai_response(message)
+        else:
+            try:
+                result = self._call_openai_api(message, context=self.conversation.messages())
+            except Exception as e:
+                self.add_memory(f"OpenAI API error: {str(e)}")
+                result = self._mock_openai_response(message)
+        
+        if "response" in result:
+            self.conversation.add_exchange(message, result["response"])
+            result = {**result, "conversation_turn": self.conversation.total_turns // 2}
+        return result
+    
+    async def execute_task_async(self, task: Task) -> Any:
+        if not self.api_key:
+            return self._mock_openai_response(task.description)
+        
+        try:
+            return await self._call_openai_api_async(task.description)
+        except Exception as e:
+            self.add_memory(f"OpenAI API error: {str(e)}")
+            return self._mock_openai_response(task.description)
+    
+    def stream_task(self, task: Task) -> Generator[str, None, Dict]:
+        """Yield response text as it is generated; returns the full result.
+        
+        Cached responses arrive as a single chunk. Without an API key the
+        mock response is streamed word by word.
+        """
+        if not self.api_key:
+            return (yield from self._stream_mock_response(task.description))
+        
+        messages = self._build_messages(task.description)
+        key = self._cache_key(messages)
+        cached = self._cached_response(key)
+        if cached:
+            yield cached["response"]
+            return cached
+        
+        deadline = self.budget.deadline()
+        try:
+            messages, reserved = self.budget.prepare(messages, self.max_tokens)
+        except BudgetExceeded as e:
+            return self._budget_error(e)
+        
+        chunks = []
+        started = time.perf_counter()
+        try:
+            for chunk in self._get_client().stream_chat_completion(
+                messages,
+                model=self.model,
+                max_tokens=self.max_tokens,
+                temperature=self.temperature,
+                deadline=deadline
+            ):
+                chunks.append(chunk)
+                yield chunk
+        except GeneratorExit:
+            # The consumer stopped reading; count what was generated so far
+            self.budget.record(estimate_message_tokens(messages) + len(chunks), time.perf_counter() - started, reserved)
+            raise
+        except DeadlineExceeded as e:
+            self.budget.record(estimate_message_tokens(messages) + len(chunks), time.perf_counter() - started, reserved)
+            return {**self._budget_error(e), "response": "".join(chunks), "model": self.model}
+        except Exception as e:
+            self.add_memory(f"OpenAI API error: {str(e)}")
+            if not chunks:
+                self.budget.record(0, time.perf_counter() - started, reserved)
+                return (yield from self._stream_mock_response(task.description))
+            self.budget.record(estimate_message_tokens(messages) + len(chunks), time.perf_counter() - started, reserved)
+            return {"response": "".join(chunks), "model": self.model, "error": f"OpenAI API error: {str(e)}"}
+        
+        self.budget.record(estimate_message_tokens(messages) + len(chunks), time.perf_counter() - started, reserved)
+        result = {
+            "response": "".join(chunks),
+            "model": self.model,
+            "tokens_used": len(chunks),  # Streams carry no usage totals; each delta is about one token
+            "confidence": 0.95
+        }
+        self.response_cache.set(key, result)
+        return result
+    
+    def _stream_mock_response(self, prompt: str) -> Generator[str, None, Dict]:
+        result = self._mock_openai_response(prompt)
+        words = result["response"].split(" ")
+        for position, word in enumerate(words):
+            yield word if position == len(words) - 1 else word + " "
+        return result
+    
+    def execute_batch(self, tasks: List[Task]) -> List[Any]:
+        """Send every prompt through the pooled client concurrently"""
+        if not self.api_key:
+            return [self._mock_openai_response(task.description) for task in tasks]
+        
+        results: List[Any] = [None] * len(tasks)
+        pending = []
+        for position, task in enumerate(tasks):
+            messages = self._build_messages(task.description)
+            key = self._cache_key(messages)
+            cached = self._cached_response(key)
+            if cached:
+                results[position] = cached
+                continue
+            try:
+                pending.append((position, *self.budget.prepare(messages, self.max_tokens), key))
+            except BudgetExceeded as e:
+                results[position] = self._budget_error(e)
+        
+        if pending:
+            started = time.perf_counter()
+            try:
+                responses = self._get_client().chat_completions(
+                    [messages for _, messages, _, _ in pending],
+                    model=self.model, max_tokens=self.max_tokens, temperature=self.temperature,
+                    start_deadline=self.budget.deadline
+                )
+            except ImportError:
+                responses = [ImportError("requests library not installed. Run: pip install requests")] * len(pending)
+            # Calls overlap, so the batch's wall time is shared between them
+            seconds = (time.perf_counter() - started) / len(pending)
+            
+            for (position, messages, reserved, key), response in zip(pending, responses):
+                if isinstance(response, DeadlineExceeded):
+                    self.budget.record(0, seconds, reserved)
+                    results[position] = self._budget_error(response)
+                elif isinstance(response, Exception):
+                    self.budget.record(0, seconds, reserved)
+                    self.add_memory(f"OpenAI API error: {str(response)}")
+                    results[position] = {"error": f"OpenAI API error: {str(response)}"}
+                else:
+                    results[position] = self._format_response(response)
+                    self.budget.record(results[position]["tokens_used"] or estimate_message_tokens(messages), seconds, reserved)
+                    self.response_cache.set(key, results[position])
+        
+        return results
+    
+    def get_status(self) -> Dict:
+        status = super().get_status()
+        status["response_cache"] = self.response_cache.stats()
+        status["spend"] = self.budget.stats()
+        return status
+    
     def _mock_openai_response(self, prompt: str) -> Dict:
         """Mock OpenAI response for demo purposes"""
         self.add_memory(f"Mock OpenAI processing: {prompt[:50]}...")
@@ -61,44 +274,184 @@ class OpenAIAgent(Agent):
                 "confidence": 0.80
             }
     
-    def _call_openai_api(self, prompt: str) -> Dict:
+    def _build_messages(self, prompt: str, context: Optional[List[Dict]] = None) -> List[Dict]:
+        return [
+            {"role": "system", "content": "You are a helpful AI assistant integrated into an agentic AI system."},
+            *(context or []),
+            {"role": "user", "content": prompt}
+        ]
+    
+    def _format_response(self, response: Dict) -> Dict:
+        return {
+            "response": response["choices"][0]["message"]["content"],
+            "model": self.model,
+            "tokens_used": response.get("usage", {}).get("total_tokens", 0),
+            "confidence": 0.95
+        }
+    
+    def _cache_key(self, messages: List[Dict]) -> str:
+        return ResponseCache.make_key(self.model, messages, self.max_tokens, self.temperature)
+    
+    def _cached_response(self, key: str) -> Optional[Dict]:
+        cached = self.response_cache.get(key)
+        if cached is None:
+            return None
+        return {**cached, "cached": True, "tokens_used": 0}
+    
+    def _budget_error(self, error: BudgetExceeded) -> Dict:
+        self.add_memory(f"Budget exceeded: {str(error)}")
+        return {"error": f"Budget exceeded: {str(error)}", "budget_exceeded": True}
+    
+    def _call_openai_api(self, prompt: str, context: Optional[List[Dict]] = None) -> Dict:
         """Actual OpenAI API call (requires API key)"""
+        call = self._start_call(prompt, context)
+        if isinstance(call, dict):
+            return call
+        
+        messages, key, reserved, deadline = call
+        started = time.perf_counter()
         try:
-            import openai
-            openai.api_key = self.api_key
-            
-            response = openai.ChatCompletion.create(
+            response = self._get_client().chat_completion(
+                messages,
                 model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are a helpful AI assistant integrated into an agentic AI system."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=150,
-                temperature=0.7
+                max_tokens=self.max_tokens,
+                temperature=self.temperature,
+                deadline=deadline
             )
-            
-            return {
-                "response": response.choices[0].message.content,
-                "model": self.model,
-                "tokens_used": response.usage.total_tokens,
-                "confidence": 0.95
-            }
-        except ImportError:
-            return {"error": "OpenAI library not installed. Run: pip install openai"}
         except Exception as e:
-            return {"error": f"OpenAI API error: {str(e)}"}
+            return self._finish_call(call, started, error=e)
+        return self._finish_call(call, started, response=response)
+    
+    async def _call_openai_api_async(self, prompt: str) -> Dict:
+        """Non-blocking OpenAI API call for use on an event loop.
+        
+        The request is awaited on the loop through aiohttp, drawing on the
+        same rate limits as the blocking client. Without aiohttp the
+        blocking call runs in the loop's executor instead.
+        """
+        client = self._get_async_client()
+        if client is None:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, self._call_openai_api, prompt)
+        
+        call = self._start_call(prompt)
+        if isinstance(call, dict):
+            return call
+        
+        messages, key, reserved, deadline = call
+        started = time.perf_counter()
+        try:
+            response = await client.chat_completion(
+                messages,
+                model=self.model,
+                max_tokens=self.max_tokens,
+                temperature=self.temperature,
+                deadline=deadline
+            )
+        except Exception as e:
+            return self._finish_call(call, started, error=e)
+        return self._finish_call(call, started, response=response)
+    
+    def _start_call(self, prompt: str, context: Optional[List[Dict]] = None):
+        """A cached result or budget error, or (messages, cache key, reserved tokens, deadline) for a live call"""
+        messages = self._build_messages(prompt, context)
+        key = self._cache_key(messages)
+        cached = self._cached_response(key)
+        if cached:
+            return cached
+        
+        deadline = self.budget.deadline()
+        try:
+            messages, reserved = self.budget.prepare(messages, self.max_tokens)
+        except BudgetExceeded as e:
+            return self._budget_error(e)
+        return messages, key, reserved, deadline
+    
+    def _finish_call(self, call, started: float, response: Optional[Dict] = None,
+                     error: Optional[Exception] = None) -> Dict:
+        """Record spend for a call from _start_call and turn its response or error into a result"""
+        messages, key, reserved, _ = call
+        if isinstance(error, ImportError):
+            self.budget.record(0, 0.0, reserved)
+            return {"error": "requests library not installed. Run: pip install requests"}
+        if isinstance(error, DeadlineExceeded):
+            self.budget.record(0, time.perf_counter() - started, reserved)
+            return self._budget_error(error)
+        if error is not None:
+            self.budget.record(0, time.perf_counter() - started, reserved)
+            return {"error": f"OpenAI API error: {str(error)}"}
+        
+        result = self._format_response(response)
+        self.budget.record(result["tokens_used"] or estimate_message_tokens(messages), time.perf_counter() - started,
+                           reserved)
+        self.response_cache.set(key, result)
+        return result
+
+# Words that carry no routing signal and are dropped from task signatures
+STOP_WORDS = frozenset("""
+a about an and are as at be by can could do for from how i in into is it me my of on or our please
+should so that the their them then these this those to up us was we what when which will with would you your
+""".split())
 
 class SmartTaskRouter:
-    """Routes tasks to appropriate agents based on LLM analysis"""
+    """Routes tasks to appropriate agents based on LLM analysis.
     
-    def __init__(self, agents: List[Agent]):
+    Decisions are memoized by task signature. Tasks whose capability
+    keywords clearly favour one agent are routed from the keyword index;
+    only ambiguous ones are sent to the LLM.
+    """
+    
+    def __init__(self, agents: List[Agent], cache_size: int = 1024, confidence_threshold: float = 0.6):
         self.agents = agents
         self.llm_agent = next((a for a in agents if isinstance(a, OpenAIAgent)), None)
+        self.cache_size = cache_size
+        self.confidence_threshold = confidence_threshold
+        self._index = CapabilityIndex(agents)
+        self._routes: "OrderedDict[str, Agent]" = OrderedDict()
+        self.stats = {"cache_hits": 0, "keyword_routes": 0, "llm_routes": 0}
+    
+    @staticmethod
+    def task_signature(description: str) -> str:
+        """Lowercased keywords without stop words, sorted and de-duplicated"""
+        words = re.findall(r"[a-z0-9_]+", description.lower())
+        return " ".join(sorted({word for word in words if word not in STOP_WORDS}))
     
     def route_task(self, task: Task) -> Agent:
         """Use LLM to determine best agent for task"""
+        if len(self._index) != len(self.agents):
+            # Agents were added since the index was built
+            self._index = CapabilityIndex(self.agents)
+            self._routes.clear()
+        
+        signature = self.task_signature(task.description)
+        agent = self._routes.get(signature)
+        if agent is not None:
+            self._routes.move_to_end(signature)
+            self.stats["cache_hits"] += 1
+            return agent
+        
+        agent, confidence = self._keyword_route(task.description)
+        if agent is not None and confidence >= self.confidence_threshold:
+            self.stats["keyword_routes"] += 1
+        else:
+            agent = self._llm_route(task) or agent or self._fallback_routing(task)
+        
+        self._routes[signature] = agent
+        if len(self._routes) > self.cache_size:
+            self._routes.popitem(last=False)
+        return agent
+    
+    def _keyword_route(self, description: str):
+        """Agent with the most capability hits and its share of all hits"""
+        counts = self._index.match_counts(description)
+        if not counts:
+            return None, 0.0
+        agent, hits = max(counts.items(), key=lambda item: item[1])
+        return agent, hits / sum(counts.values())
+    
+    def _llm_route(self, task: Task) -> Optional[Agent]:
         if not self.llm_agent:
-            return self._fallback_routing(task)
+            return None
         
         # Ask LLM to analyze task and suggest best agent
         analysis_prompt = f"""
@@ -111,6 +464,7 @@ class SmartTaskRouter:
         Format: AgentName,confidence
         """
         
+        self.stats["llm_routes"] += 1
         try:
             result = self.llm_agent._mock_openai_response(analysis_prompt)
             response = result.get("response", "")
@@ -122,7 +476,7 @@ class SmartTaskRouter:
         except:
             pass
         
-        return self._fallback_routing(task)
+        return None
     
     def _fallback_routing(self, task: Task) -> Agent:
         """Fallback routing logic"""
@@ -0,0 +1,259 @@
+"""
+DAG Pipeline Scheduler for multi-stage agent workflows
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from agent import Agent, Task
+
+class PipelineError(Exception):
+    """Raised for invalid pipeline definitions and stage type mismatches"""
+
+@dataclass
+class Stage:
+    """One node of a pipeline.
+
+    A stage runs either an agent (which receives a Task whose `inputs`
+    hold the named upstream outputs) or a plain callable (which receives
+    them as keyword arguments). `inputs` maps input names to the type
+    each must be, and `output` names what the stage produces.
+    """
+    name: str
+    output: str
+    agent: Optional[Agent] = None
+    func: Optional[Callable[..., Any]] = None
+    inputs: Dict[str, type] = field(default_factory=dict)
+    output_type: type = object
+    description: str = ""
+    priority: int = 1
+
+    def __post_init__(self):
+        if (self.agent is None) == (self.func is None):
+            raise PipelineError(f"Stage {self.name} needs exactly one of agent or func")
+
+@dataclass
+class StageTiming:
+    stage: str
+    started_at: float
+    finished_at: float
+    status: str
+
+    @property
+    def duration(self) -> float:
+        return self.finished_at - self.started_at
+
+class Pipeline:
+    """Declarative DAG of stages linked by their named inputs and outputs"""
+
+    def __init__(self, stages: Optional[List[Stage]] = None, external_inputs: Optional[Dict[str, type]] = None):
+        self.stages: Dict[str, Stage] = {}
+        self.external_inputs = external_inputs or {}
+        self._producers: Dict[str, Stage] = {}
+        for stage in stages or []:
+            self.add_stage(stage)
+
+    def add_stage(self, stage: Stage) -> "Pipeline":
+        if stage.name in self.stages:
+            raise PipelineError(f"Duplicate stage name: {stage.name}")
+        if stage.output in self._producers or stage.output in self.external_inputs:
+            raise PipelineError(f"Output {stage.output} is produced more than once")
+        self.stages[stage.name] = stage
+        self._producers[stage.output] = stage
+        return self
+
+    def dependencies(self, stage: Stage) -> List[Stage]:
+        return [self._producers[name] for name in stage.inputs if name in self._producers]
+
+    def validate(self) -> List[Stage]:
+        """Check wiring and types; returns the stages in topological order"""
+        for stage in self.stages.values():
+            for name, expected in stage.inputs.items():
+                if name in self._producers:
+                    produced = self._producers[name].output_type
+                elif name in self.external_inputs:
+                    produced = self.external_inputs[name]
+                else:
+                    raise PipelineError(f"Stage {stage.name} needs {name}, which nothing produces")
+                if not issubclass(produced, expected):
+                    raise PipelineError(
+                        f"Stage {stage.name} expects {name} as {expected.__name__}, "
+                        f"but it is produced as {produced.__name__}"
+                    )
+
+        order, state = [], {}
+
+        def visit(stage: Stage):
+            if state.get(stage.name) == "done":
+                return
+            if state.get(stage.name) == "visiting":
+                raise PipelineError(f"Pipeline has a cycle through {stage.name}")
+            state[stage.name] = "visiting"
+            for dependency in self.dependencies(stage):
+                visit(dependency)
+            state[stage.name] = "done"
+            order.append(stage)
+
+        for stage in self.stages.values():
+            visit(stage)
+        return order
+
+@dataclass
+class PipelineRun:
+    status: str
+    outputs: Dict[str, Any]
+    timings: Dict[str, StageTiming]
+    critical_path: List[str]
+    wall_time: float
+    errors: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def critical_path_time(self) -> float:
+        return sum(self.timings[name].duration for name in self.critical_path)
+
+    def timing_report(self) -> Dict:
+        return {
+            "wall_time": round(self.wall_time, 4),
+            "critical_path": self.critical_path,
+            "critical_path_time": round(self.critical_path_time, 4),
+            "stages": {
+                name: {"duration": round(timing.duration, 4), "status": timing.status}
+                for name, timing in self.timings.items()
+            }
+        }
+
+class PipelineScheduler:
+    """Runs a pipeline on a thread pool.
+
+    Each stage starts as soon as all of its inputs exist, so independent
+    branches run in parallel. When a coordinator is given, agent stages
+    are counted in its status and result store like any other task.
+    """
+
+    def __init__(self, max_workers: int = 4, coordinator=None):
+        self.max_workers = max_workers
+        self.coordinator = coordinator
+        self._run_counter = 0
+
+    def iter_run(self, pipeline: Pipeline, inputs: Optional[Dict[str, Any]] = None) -> Iterator[Tuple[str, Any]]:
+        """Yield (stage name, output) as each stage finishes; returns the PipelineRun"""
+        pipeline.validate()
+        self._run_counter += 1
+        run_id = f"run{self._run_counter}_{int(time.time())}"
+        values: Dict[str, Any] = dict(inputs or {})
+        for name, expected in pipeline.external_inputs.items():
+            if name not in values:
+                raise PipelineError(f"Missing pipeline input: {name}")
+
+        remaining = {name: {dep.name for dep in pipeline.dependencies(stage)} for name, stage in pipeline.stages.items()}
+        dependents: Dict[str, List[str]] = {name: [] for name in pipeline.stages}
+        for name, deps in remaining.items():
+            for dep in deps:
+                dependents[dep].append(name)
+
+        timings: Dict[str, StageTiming] = {}
+        errors: Dict[str, str] = {}
+        running = {}
+        run_started = time.time()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            def launch(name: str):
+                stage = pipeline.stages[name]
+                stage_inputs = {key: values[key] for key in stage.inputs}
+                task = None
+                if stage.agent is not None:
+                    task = Task(id=f"{run_id}_{name}", description=stage.description or name,
+                                priority=stage.priority, inputs=stage_inputs)
+                    if self.coordinator is not None:
+                        self.coordinator._start_task(task, stage.agent)
+                    future = pool.submit(_timed_call, stage.agent.execute_task, task)
+                else:
+                    future = pool.submit(_timed_call, stage.func, **stage_inputs)
+                running[future] = (stage, task)
+
+            def skip_downstream(name: str):
+                for dependent in dependents[name]:
+                    if dependent not in errors:
+                        errors[dependent] = f"Skipped: upstream stage {name} failed"
+                        skip_downstream(dependent)
+
+            for name, deps in remaining.items():
+                if not deps:
+                    launch(name)
+
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage, task = running.pop(future)
+                    started_at, finished_at, output, error = future.result()
+                    if error is None and not isinstance(output, stage.output_type):
+                        error = PipelineError(
+                            f"Stage {stage.name} produced {type(output).__name__}, "
+                            f"expected {stage.output_type.__name__}"
+                        )
+
+                    if task is not None and self.coordinator is not None:
+                        if error is None:
+                            self.coordinator._complete_task(task, stage.agent, output)
+                        else:
+                            self.coordinator._fail_task(task, stage.agent, error)
+
+                    if error is not None:
+                        timings[stage.name] = StageTiming(stage.name, started_at, finished_at, "failed")
+                        errors[stage.name] = str(error)
+                        skip_downstream(stage.name)
+                        continue
+
+                    timings[stage.name] = StageTiming(stage.name, started_at, finished_at, "completed")
+                    values[stage.output] = output
+                    # Hand the output straight to every stage now ready for it
+                    for dependent in dependents[stage.name]:
+                        remaining[dependent].discard(stage.name)
+                        if not remaining[dependent] and dependent not in errors:
+                            launch(dependent)
+                    yield stage.name, output
+
+        return PipelineRun(
+            status="success" if not errors else "error",
+            outputs={stage.output: values[stage.output] for stage in pipeline.stages.values() if stage.output in values},
+            timings=timings,
+            critical_path=self._critical_path(pipeline, timings),
+            wall_time=time.time() - run_started,
+            errors=errors
+        )
+
+    def run(self, pipeline: Pipeline, inputs: Optional[Dict[str, Any]] = None,
+            on_stage_complete: Optional[Callable[[str, Any], None]] = None) -> PipelineRun:
+        stream = self.iter_run(pipeline, inputs)
+        while True:
+            try:
+                name, output = next(stream)
+            except StopIteration as finished:
+                return finished.value
+            if on_stage_complete:
+                on_stage_complete(name, output)
+
+    @staticmethod
+    def _critical_path(pipeline: Pipeline, timings: Dict[str, StageTiming]) -> List[str]:
+        """Chain of stages that determined when the run finished"""
+        if not timings:
+            return []
+        current = max(timings.values(), key=lambda t: t.finished_at).stage
+        path = [current]
+        while True:
+            finished_deps = [dep.name for dep in pipeline.dependencies(pipeline.stages[current]) if dep.name in timings]
+            if not finished_deps:
+                break
+            # The dependency that finished last is the one this stage waited on
+            current = max(finished_deps, key=lambda name: timings[name].finished_at)
+            path.append(current)
+        return list(reversed(path))
+
+def _timed_call(func: Callable[..., Any], *args, **kwargs) -> Tuple[float, float, Any, Optional[Exception]]:
+    started_at = time.time()
+    try:
+        output, error = func(*args, **kwargs), None
+    except Exception as e:
+        output, error = None, e
+    return started_at, time.time(), output, error
@@ -0,0 +1,131 @@
+"""
+LRU/TTL Response Cache for LLM API calls
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+class ResponseCache:
+    """In-memory LRU cache with expiry, optionally backed by SQLite.
+
+    With db_path set, entries are also written to disk so they survive
+    restarts; memory misses fall through to the database and are
+    promoted back into the LRU on hit.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: Optional[float] = 3600, db_path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.db_path = db_path
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._conn = None
+        self._connect()
+
+    def _connect(self):
+        if self.db_path:
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS response_cache (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )
+            ''')
+            self._conn.commit()
+
+    def __getstate__(self):
+        # Locks and connections don't pickle; the copy makes its own
+        state = self.__dict__.copy()
+        del state['_lock']
+        state['_conn'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+        self._connect()
+
+    @staticmethod
+    def make_key(model: str, messages: List[Dict], max_tokens: int, temperature: float) -> str:
+        payload = json.dumps([model, messages, max_tokens, temperature], sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return self.ttl is not None and now - created_at > self.ttl
+
+    def get(self, key: str) -> Optional[Dict]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, created_at = entry
+                if not self._expired(created_at, now):
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+
+            if self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT value, created_at FROM response_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row and not self._expired(row[1], now):
+                    value = json.loads(row[0])
+                    self._remember(key, value, row[1])
+                    self.hits += 1
+                    return value
+
+            self.misses += 1
+            return None
+
+    def set(self, key: str, value: Dict):
+        now = time.time()
+        with self._lock:
+            self._remember(key, value, now)
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO response_cache VALUES (?, ?, ?)",
+                    (key, json.dumps(value, default=str), now)
+                )
+                self._writes += 1
+                if self.ttl is not None and self._writes % 100 == 0:
+                    self._conn.execute("DELETE FROM response_cache WHERE created_at < ?", (now - self.ttl,))
+                self._conn.commit()
+
+    def _remember(self, key: str, value: Dict, created_at: float):
+        self._entries[key] = (value, created_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM response_cache")
+                self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "entries": len(self._entries),
+            "persistent": self._conn is not None
+        }
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
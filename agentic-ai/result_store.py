@@ -0,0 +1,322 @@
+"""
+Completed Task Result Stores
+Pluggable backends that keep finished task results out of process memory
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, Iterator, Optional
+from agent import Task
+
+def task_record(task: Task, agent_name: str, completed_at: Optional[float] = None) -> Dict:
+    """Flatten a finished task into a storable record"""
+    return {
+        "task_id": task.id,
+        "description": task.description,
+        "priority": task.priority,
+        "status": task.status,
+        "agent": agent_name,
+        "result": task.result,
+        "completed_at": completed_at if completed_at is not None else time.time()
+    }
+
+class ResultStore(ABC):
+    """Storage for completed task results.
+
+    max_results keeps only the newest N records and max_age (seconds)
+    drops records older than that; either may be None for no limit.
+    """
+
+    def __init__(self, max_results: Optional[int] = None, max_age: Optional[float] = None):
+        self.max_results = max_results
+        self.max_age = max_age
+
+    def add(self, task: Task, agent_name: str):
+        self.add_record(task_record(task, agent_name))
+
+    @abstractmethod
+    def add_record(self, record: Dict):
+        pass
+
+    @abstractmethod
+    def get(self, task_id: str) -> Optional[Dict]:
+        """Look up a stored record by task id"""
+
+    @abstractmethod
+    def iter_window(self, start: Optional[float] = None, end: Optional[float] = None) -> Iterator[Dict]:
+        """Records completed in [start, end), oldest first"""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        pass
+
+    def close(self):
+        pass
+
+class MemoryResultStore(ResultStore):
+    """Bounded in-process store; the default when nothing is configured"""
+
+    def __init__(self, max_results: Optional[int] = 1000, max_age: Optional[float] = None):
+        super().__init__(max_results, max_age)
+        self._records: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add_record(self, record: Dict):
+        with self._lock:
+            self._records.pop(record["task_id"], None)
+            self._records[record["task_id"]] = record
+            self._apply_retention()
+
+    def _apply_retention(self):
+        if self.max_results is not None:
+            while len(self._records) > self.max_results:
+                self._records.popitem(last=False)
+        if self.max_age is not None:
+            cutoff = time.time() - self.max_age
+            while self._records and next(iter(self._records.values()))["completed_at"] < cutoff:
+                self._records.popitem(last=False)
+
+    def get(self, task_id: str) -> Optional[Dict]:
+        with self._lock:
+            self._apply_retention()
+            return self._records.get(task_id)
+
+    def iter_window(self, start: Optional[float] = None, end: Optional[float] = None) -> Iterator[Dict]:
+        with self._lock:
+            self._apply_retention()
+            records = list(self._records.values())
+        for record in records:
+            if (start is None or record["completed_at"] >= start) and (end is None or record["completed_at"] < end):
+                yield record
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._apply_retention()
+            return len(self._records)
+
+class SQLiteResultStore(ResultStore):
+    """Results persisted in a SQLite table indexed by completion time.
+
+    Expired rows are deleted in batches, but reads always filter on
+    max_age, so a row past it is never returned while awaiting a prune.
+    """
+
+    def __init__(self, db_path: str = "task_results.db", max_results: Optional[int] = None,
+                 max_age: Optional[float] = None, prune_every: int = 100):
+        super().__init__(max_results, max_age)
+        self.db_path = db_path
+        self.prune_every = prune_every
+        self._inserts = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS task_results (
+                task_id TEXT PRIMARY KEY,
+                description TEXT,
+                priority INTEGER,
+                status TEXT,
+                agent TEXT,
+                result TEXT,
+                completed_at REAL NOT NULL
+            )
+        ''')
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_task_results_completed ON task_results (completed_at)")
+        self._conn.commit()
+
+    def add_record(self, record: Dict):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO task_results VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (record["task_id"], record["description"], record["priority"], record["status"],
+                 record["agent"], json.dumps(record["result"], default=str), record["completed_at"])
+            )
+            self._inserts += 1
+            # Retention runs in batches so inserts stay cheap
+            if self._inserts % self.prune_every == 0:
+                self._prune()
+            self._conn.commit()
+
+    def _prune(self):
+        if self.max_age is not None:
+            self._conn.execute("DELETE FROM task_results WHERE completed_at < ?", (time.time() - self.max_age,))
+        if self.max_results is not None:
+            self._conn.execute('''
+                DELETE FROM task_results WHERE completed_at < (
+                    SELECT completed_at FROM task_results ORDER BY completed_at DESC LIMIT 1 OFFSET ?
+                )
+            ''', (self.max_results - 1,))
+
+    def _cutoff(self) -> float:
+        """Oldest completed_at still within max_age"""
+        return time.time() - self.max_age if self.max_age is not None else float("-inf")
+
+    def prune(self):
+        """Apply retention immediately"""
+        with self._lock:
+            self._prune()
+            self._conn.commit()
+
+    @staticmethod
+    def _row_to_record(row) -> Dict:
+        return {
+            "task_id": row[0],
+            "description": row[1],
+            "priority": row[2],
+            "status": row[3],
+            "agent": row[4],
+            "result": json.loads(row[5]),
+            "completed_at": row[6]
+        }
+
+    def get(self, task_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM task_results WHERE task_id = ? AND completed_at >= ?", (task_id, self._cutoff())
+            ).fetchone()
+        return self._row_to_record(row) if row else None
+
+    def iter_window(self, start: Optional[float] = None, end: Optional[float] = None,
+                    batch_size: int = 500) -> Iterator[Dict]:
+        # Page through by completion time so huge windows stream in batches
+        last_time, last_id = max(start if start is not None else float("-inf"), self._cutoff()), ""
+        inclusive = True
+        while True:
+            with self._lock:
+                rows = self._conn.execute('''
+                    SELECT * FROM task_results
+                    WHERE (completed_at > ? OR (completed_at = ? AND (? OR task_id > ?)))
+                      AND completed_at < ?
+                    ORDER BY completed_at, task_id LIMIT ?
+                ''', (last_time, last_time, inclusive, last_id,
+                      end if end is not None else float("inf"), batch_size)).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield self._row_to_record(row)
+            last_time, last_id = rows[-1][6], rows[-1][0]
+            inclusive = False
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM task_results WHERE completed_at >= ?", (self._cutoff(),)
+            ).fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+class JSONLResultStore(ResultStore):
+    """Append-only JSON Lines log of results.
+
+    Only a task id -> file offset index is kept in memory; it is bounded
+    by the retention policy, and the log is compacted once expired lines
+    outnumber live ones. max_results defaults to 100,000 so the index and
+    log stay bounded; pass None to keep every record.
+    """
+
+    def __init__(self, path: str = "task_results.jsonl", max_results: Optional[int] = 100_000,
+                 max_age: Optional[float] = None):
+        super().__init__(max_results, max_age)
+        self.path = path
+        self._lock = threading.Lock()
+        self._index: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lines = 0
+        self._generation = 0
+        self._load_index()
+        self._file = open(path, 'a+b')
+
+    def _load_index(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'rb') as f:
+            offset = 0
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    self._index.pop(record["task_id"], None)
+                    self._index[record["task_id"]] = (offset, record["completed_at"])
+                    self._lines += 1
+                offset += len(line)
+        self._apply_retention()
+
+    def add_record(self, record: Dict):
+        line = (json.dumps(record, default=str) + "\n").encode('utf-8')
+        with self._lock:
+            self._file.seek(0, os.SEEK_END)
+            offset = self._file.tell()
+            self._file.write(line)
+            self._file.flush()
+            self._index.pop(record["task_id"], None)
+            self._index[record["task_id"]] = (offset, record["completed_at"])
+            self._lines += 1
+            self._apply_retention()
+            if self._lines > 2 * max(len(self._index), 1000):
+                self._compact()
+
+    def _apply_retention(self):
+        if self.max_results is not None:
+            while len(self._index) > self.max_results:
+                self._index.popitem(last=False)
+        if self.max_age is not None:
+            cutoff = time.time() - self.max_age
+            while self._index and next(iter(self._index.values()))[1] < cutoff:
+                self._index.popitem(last=False)
+
+    def _compact(self):
+        """Rewrite the log with only the records still in the index"""
+        tmp_path = self.path + ".tmp"
+        new_index = OrderedDict()
+        with open(tmp_path, 'wb') as out:
+            for task_id, (offset, completed_at) in self._index.items():
+                self._file.seek(offset)
+                line = self._file.readline()
+                new_index[task_id] = (out.tell(), completed_at)
+                out.write(line)
+        self._file.close()
+        os.replace(tmp_path, self.path)
+        self._file = open(self.path, 'a+b')
+        self._index = new_index
+        self._lines = len(new_index)
+        self._generation += 1
+
+    def _read(self, offset: int) -> Dict:
+        self._file.seek(offset)
+        return json.loads(self._file.readline())
+
+    def get(self, task_id: str) -> Optional[Dict]:
+        with self._lock:
+            self._apply_retention()
+            entry = self._index.get(task_id)
+            return self._read(entry[0]) if entry else None
+
+    def iter_window(self, start: Optional[float] = None, end: Optional[float] = None) -> Iterator[Dict]:
+        with self._lock:
+            self._apply_retention()
+            generation = self._generation
+            entries = [(task_id, offset) for task_id, (offset, completed_at) in self._index.items()
+                       if (start is None or completed_at >= start) and (end is None or completed_at < end)]
+        for task_id, offset in entries:
+            with self._lock:
+                if self._generation != generation:
+                    # The log was compacted underneath us; offsets moved
+                    entry = self._index.get(task_id)
+                    if entry is None:
+                        continue
+                    offset = entry[0]
+                record = self._read(offset)
+            yield record
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._apply_retention()
+            return len(self._index)
+
+    def close(self):
+        with self._lock:
+            self._file.close()
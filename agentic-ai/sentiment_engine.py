@@ -0,0 +1,108 @@
+"""
+Vectorized Lexicon Sentiment Engine for batches of texts
+"""
+
+import itertools
+from typing import Dict, List, Optional, Sequence, Tuple
+from lexicon import (
+    DOCUMENT_BREAK, INTENSIFIER, NEGATION, NEGATION_FACTOR, NEGATION_WINDOW, WORD,
+    Lexicon, load_lexicon, tokenize, tokenize_batch
+)
+
+try:
+    import numpy as np
+    from scipy.sparse import csr_matrix
+except ImportError:  # Scored in pure Python instead
+    np = None
+
+class SentimentEngine:
+    """Scores many texts at once against the shared weighted lexicon.
+
+    Texts are lowercased and tokenized in one pass over the whole batch;
+    tokens are mapped to lexicon ids, negation and intensifier rules turn
+    each word occurrence into a multiplier, and the batch is scored as a
+    sparse document-term matrix of those multipliers (one row per text,
+    one column per lexicon term) times the lexicon's weight vector. Words
+    match whole tokens only, so "good" does not match "goodbye".
+    """
+
+    def __init__(self, lexicon: Optional[Lexicon] = None):
+        self.lexicon = lexicon if lexicon is not None else load_lexicon()
+        # Token ids: lexicon terms >= 0, document breaks -1, anything else -2
+        self._lookup = {**self.lexicon.index, DOCUMENT_BREAK: -1}
+        if np is not None:
+            # Zero-copy views of the (possibly memory-mapped) lexicon arrays
+            self._weights = np.frombuffer(self.lexicon.weights, dtype=np.float32)
+            kinds = np.frombuffer(self.lexicon.kinds, dtype=np.uint8)
+            self.weights = np.where(kinds == WORD, self._weights, 0.0)
+            # Ids -2 and -1 index the two trailing "no kind" entries
+            self._kinds = np.concatenate((kinds, np.array([255, 255], dtype=np.uint8)))
+
+    def __reduce__(self):
+        # The arrays are views over the lexicon buffer; rebuild them from the unpickled lexicon
+        return SentimentEngine, (self.lexicon,)
+
+    def _word_multipliers(self, texts: Sequence[str]):
+        """Document, lexicon id and negation/intensifier multiplier of every lexicon word in the batch"""
+        tokens = tokenize_batch(texts)
+        ids = np.fromiter(map(self._lookup.get, tokens, itertools.repeat(-2)), dtype=np.int64, count=len(tokens))
+        documents = np.cumsum(ids == -1)
+        kinds = self._kinds[ids]
+        words = np.flatnonzero(kinds == WORD)
+
+        multipliers = np.ones(len(words))
+        before = words - 1
+        boosted = (before >= 0) & (kinds[before] == INTENSIFIER)
+        multipliers[boosted] = self._weights[ids[before[boosted]]]
+        negated = np.zeros(len(words), dtype=bool)
+        for distance in range(1, NEGATION_WINDOW + 1):
+            before = np.maximum(words - distance, 0)
+            negated |= (words >= distance) & (kinds[before] == NEGATION) & (documents[before] == documents[words])
+        multipliers[negated] *= NEGATION_FACTOR
+        return documents[words], ids[words], multipliers
+
+    def scores(self, texts: Sequence[str]) -> Sequence[float]:
+        """Weighted positive minus negative lexicon words, per text"""
+        if not texts:
+            return []
+        if np is None:
+            return [self.lexicon.score(text) for text in texts]
+
+        documents, ids, multipliers = self._word_multipliers(texts)
+        matrix = csr_matrix((multipliers, (documents, ids)), shape=(len(texts), len(self.weights)))
+        return matrix @ self.weights
+
+    def polarities(self, texts: Sequence[str]) -> List[Tuple[float, float]]:
+        """Lexicon.polarity for each text: positive and negative weight, as magnitudes"""
+        if not texts:
+            return []
+        if np is None:
+            return [self.lexicon.polarity(tokenize(text)) for text in texts]
+
+        # Split each occurrence by the sign of its weighted value before
+        # summing, so "good ... not good" counts on both sides
+        documents, ids, multipliers = self._word_multipliers(texts)
+        values = multipliers * self._weights[ids]
+        matrix = csr_matrix((np.abs(values), (documents, (values < 0).astype(np.int64))), shape=(len(texts), 2))
+        return [tuple(row) for row in matrix.toarray().tolist()]
+
+    def analyze(self, texts: Sequence[str]) -> List[Dict]:
+        """sentiment, confidence and text_preview for each text"""
+        results = []
+        for text, score in zip(texts, self.scores(texts)):
+            score = round(float(score), 2)
+            if score > 0:
+                sentiment = "positive"
+                confidence = round(min(0.9, 0.6 + score * 0.1), 2)
+            elif score < 0:
+                sentiment = "negative"
+                confidence = round(min(0.9, 0.6 + -score * 0.1), 2)
+            else:
+                sentiment = "neutral"
+                confidence = 0.5
+            results.append({
+                "sentiment": sentiment,
+                "confidence": confidence,
+                "text_preview": text[:100] + "..." if len(text) > 100 else text
+            })
+        return results
@@ -0,0 +1,133 @@
+"""
+Extractive TextRank Summarizer with sparse TF-IDF sentence similarity
+"""
+
+import heapq
+import math
+import re
+from collections import Counter
+from typing import Dict, List, Tuple
+
+SENTENCE_PATTERN = re.compile(r'[^.!?]+(?:[.!?]+|$)')
+WORD_PATTERN = re.compile(r"[a-z0-9']+")
+
+def split_sentences(text: str, min_length: int = 20) -> List[str]:
+    """Sentences of at least min_length characters, in document order"""
+    sentences = (match.group().strip() for match in SENTENCE_PATTERN.finditer(text))
+    return [sentence for sentence in sentences if len(sentence) >= min_length]
+
+class TextRankSummarizer:
+    """Ranks sentences by PageRank over a TF-IDF cosine similarity graph.
+
+    Sentence vectors are sparse dicts and similarities are accumulated
+    through an inverted index, so only sentence pairs sharing a term are
+    ever compared, and each sentence keeps at most max_neighbors edges.
+    Documents longer than chunk_size sentences are summarized
+    hierarchically: each chunk is ranked on its own, its best sentences
+    go forward to the next round, and the final round picks the summary.
+    Memory is therefore bounded by the chunk size, not the document.
+    """
+
+    def __init__(self, max_sentences: int = 3, chunk_size: int = 1000, max_neighbors: int = 20,
+                 min_similarity: float = 0.05, max_df: float = 0.25, damping: float = 0.85,
+                 iterations: int = 50, tolerance: float = 1e-6):
+        if chunk_size < 2:
+            raise ValueError("chunk_size must be at least 2")
+        self.max_sentences = max_sentences
+        self.chunk_size = chunk_size
+        self.max_neighbors = max_neighbors
+        self.min_similarity = min_similarity
+        self.max_df = max_df
+        self.damping = damping
+        self.iterations = iterations
+        self.tolerance = tolerance
+
+    def summarize(self, text: str) -> List[str]:
+        return self.summarize_sentences(split_sentences(text))
+
+    def summarize_sentences(self, sentences: List[str]) -> List[str]:
+        """Top sentences in document order"""
+        candidates = list(range(len(sentences)))
+        # Each round shrinks the pool at least by half, usually tenfold
+        keep_per_chunk = min(max(self.max_sentences, self.chunk_size // 10), self.chunk_size // 2)
+        while len(candidates) > self.chunk_size:
+            survivors = []
+            for start in range(0, len(candidates), self.chunk_size):
+                chunk = candidates[start:start + self.chunk_size]
+                survivors.extend(self._top(chunk, sentences, keep_per_chunk))
+            candidates = sorted(survivors)
+
+        return [sentences[i] for i in sorted(self._top(candidates, sentences, self.max_sentences))]
+
+    def _top(self, indexes: List[int], sentences: List[str], count: int) -> List[int]:
+        if len(indexes) <= count:
+            return indexes
+        scores = self.rank([sentences[i] for i in indexes])
+        best = heapq.nlargest(count, range(len(indexes)), key=lambda position: (scores[position], -position))
+        return [indexes[position] for position in best]
+
+    def rank(self, sentences: List[str]) -> List[float]:
+        """TextRank score for each sentence"""
+        vectors = self._tfidf_vectors(sentences)
+        graph = self._similarity_graph(vectors)
+        return self._pagerank(graph, len(sentences))
+
+    def _tfidf_vectors(self, sentences: List[str]) -> List[Dict[str, float]]:
+        term_counts = [Counter(WORD_PATTERN.findall(sentence.lower())) for sentence in sentences]
+        document_frequency: Counter = Counter()
+        for counts in term_counts:
+            document_frequency.update(counts.keys())
+
+        total = len(sentences)
+        # Terms in a large share of sentences act as stop words: they carry little
+        # signal and would make the inverted index quadratic (small inputs keep all)
+        max_df = max(50, int(self.max_df * total))
+        idf = {term: math.log(total / df) + 1.0 for term, df in document_frequency.items() if df <= max_df}
+
+        vectors = []
+        for counts in term_counts:
+            vector = {term: count * idf[term] for term, count in counts.items() if term in idf}
+            norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+            vectors.append({term: weight / norm for term, weight in vector.items()} if norm else {})
+        return vectors
+
+    def _similarity_graph(self, vectors: List[Dict[str, float]]) -> List[List[Tuple[int, float]]]:
+        """Sparse weighted adjacency lists, keeping each sentence's strongest edges"""
+        postings: Dict[str, List[Tuple[int, float]]] = {}
+        for i, vector in enumerate(vectors):
+            for term, weight in vector.items():
+                postings.setdefault(term, []).append((i, weight))
+
+        graph: List[List[Tuple[int, float]]] = []
+        for i, vector in enumerate(vectors):
+            dots: Dict[int, float] = {}
+            for term, weight in vector.items():
+                for j, other in postings[term]:
+                    if j != i:
+                        dots[j] = dots.get(j, 0.0) + weight * other
+            edges = [(j, similarity) for j, similarity in dots.items() if similarity >= self.min_similarity]
+            if len(edges) > self.max_neighbors:
+                edges = heapq.nlargest(self.max_neighbors, edges, key=lambda edge: edge[1])
+            graph.append(edges)
+        return graph
+
+    def _pagerank(self, graph: List[List[Tuple[int, float]]], size: int) -> List[float]:
+        if size == 0:
+            return []
+        out_weight = [sum(similarity for _, similarity in edges) for edges in graph]
+        scores = [1.0 / size] * size
+        base = (1.0 - self.damping) / size
+        for _ in range(self.iterations):
+            # Sentences with no edges spread their score evenly
+            dangling = sum(scores[i] for i in range(size) if not out_weight[i]) / size
+            updated = [base + self.damping * dangling] * size
+            for i, edges in enumerate(graph):
+                if out_weight[i]:
+                    share = self.damping * scores[i] / out_weight[i]
+                    for j, similarity in edges:
+                        updated[j] += share * similarity
+            delta = sum(abs(a - b) for a, b in zip(updated, scores))
+            scores = updated
+            if delta < self.tolerance:
+                break
+        return scores
@@ -0,0 +1,90 @@
+"""
+Priority Task Queue for the Agent Coordinator
+"""
+
+import heapq
+import itertools
+from typing import Dict, Iterable, Iterator, List, Optional
+from agent import Task
+
+class TaskQueue:
+    """Binary-heap priority queue of tasks.
+
+    Higher priority tasks come out first; tasks with equal priority come
+    out in the order they were added. Cancelled tasks are removed lazily.
+    `version` increases on every change so observers can detect updates.
+    """
+
+    def __init__(self, tasks: Optional[Iterable[Task]] = None):
+        self._heap = []
+        self._entries: Dict[str, list] = {}
+        self._counter = itertools.count()
+        self.version = 0
+        if tasks:
+            self.push_many(tasks)
+
+    def push(self, task: Task):
+        """Add a task in O(log n)"""
+        if task.id in self._entries:
+            raise ValueError(f"Task {task.id} is already queued")
+        entry = [-task.priority, next(self._counter), task]
+        self._entries[task.id] = entry
+        heapq.heappush(self._heap, entry)
+        self.version += 1
+
+    def push_many(self, tasks: Iterable[Task]):
+        """Add several tasks at once, re-heapifying in O(n); nothing is added if any id is a duplicate"""
+        tasks = list(tasks)
+        seen = set()
+        for task in tasks:
+            if task.id in self._entries or task.id in seen:
+                raise ValueError(f"Task {task.id} is already queued")
+            seen.add(task.id)
+        for task in tasks:
+            entry = [-task.priority, next(self._counter), task]
+            self._entries[task.id] = entry
+            self._heap.append(entry)
+        heapq.heapify(self._heap)
+        self.version += 1
+
+    def pop(self) -> Task:
+        """Remove and return the highest priority task"""
+        while self._heap:
+            task = heapq.heappop(self._heap)[2]
+            if task is not None:
+                del self._entries[task.id]
+                self.version += 1
+                return task
+        raise IndexError("pop from an empty task queue")
+
+    def peek(self) -> Optional[Task]:
+        """Return the highest priority task without removing it"""
+        while self._heap and self._heap[0][2] is None:
+            heapq.heappop(self._heap)
+        return self._heap[0][2] if self._heap else None
+
+    def cancel(self, task_id: str) -> Optional[Task]:
+        """Remove a queued task by id, returning it if it was queued"""
+        entry = self._entries.pop(task_id, None)
+        if entry is None:
+            return None
+        task = entry[2]
+        entry[2] = None
+        self.version += 1
+        return task
+
+    def tasks(self) -> List[Task]:
+        """Queued tasks in the order they will be executed"""
+        return [entry[2] for entry in sorted(self._entries.values())]
+
+    def __contains__(self, task_id: str) -> bool:
+        return task_id in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __bool__(self) -> bool:
+        return bool(self._entries)
+
+    def __iter__(self) -> Iterator[Task]:
+        return iter(self.tasks())
@@ -0,0 +1,49 @@
+"""
+Tests for the MemoryStore ring buffer
+"""
+
+import json
+
+import pytest
+from agent_memory import MemoryStore
+
+def test_full_ring_wraps_around_and_keeps_newest_entries():
+    memory = MemoryStore(capacity=3)
+    for i in range(5):
+        memory.append(f"entry {i}", timestamp=float(i))
+
+    assert len(memory) == 3 and memory.total_added == 5
+    assert [entry["info"] for entry in memory] == ["entry 2", "entry 3", "entry 4"]
+    assert [entry["timestamp"] for entry in memory.recent(2)] == [3.0, 4.0]
+    assert memory[0]["info"] == "entry 2" and memory[-1]["info"] == "entry 4"
+    assert [entry["info"] for entry in memory[1:]] == ["entry 3", "entry 4"]
+    assert [entry["info"] for entry in memory[::-1]] == ["entry 4", "entry 3", "entry 2"]
+    with pytest.raises(IndexError):
+        memory[3]
+    with pytest.raises(IndexError):
+        memory[-4]
+
+def test_evicted_entries_are_spilled_oldest_first(tmp_path):
+    spill_path = tmp_path / "memory.jsonl"
+    memory = MemoryStore(capacity=2, spill_path=str(spill_path))
+    for i in range(5):
+        memory.append(f"entry {i}", timestamp=float(i))
+    memory.close()
+
+    spilled = [json.loads(line) for line in spill_path.read_text().splitlines()]
+    assert spilled == [{"timestamp": float(i), "info": f"entry {i}"} for i in range(3)]
+    assert [entry["info"] for entry in memory] == ["entry 3", "entry 4"]
+
+def test_clear_starts_the_ring_over():
+    memory = MemoryStore(capacity=2)
+    for i in range(3):
+        memory.append(f"entry {i}")
+    memory.clear()
+    assert not memory and memory.recent(5) == []
+
+    memory.append("fresh")
+    assert [entry["info"] for entry in memory] == ["fresh"]
+
+def test_capacity_must_be_positive():
+    with pytest.raises(ValueError):
+        MemoryStore(capacity=0)
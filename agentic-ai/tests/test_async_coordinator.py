@@ -0,0 +1,64 @@
+"""
+Tests for AsyncAgentCoordinator cycles
+"""
+
+import asyncio
+from agent import Agent, Task
+from async_coordinator import AsyncAgentCoordinator
+
+class NappingAgent(Agent):
+    def __init__(self):
+        super().__init__("NappingAgent", ["nap"])
+
+    def execute_task(self, task: Task):
+        return task.description
+
+    async def execute_task_async(self, task: Task):
+        await asyncio.sleep(0.01 if "short" in task.description else 0.1)
+        return task.description
+
+def test_closing_async_cycle_early_records_running_tasks():
+    agent = NappingAgent()
+    coordinator = AsyncAgentCoordinator(agents=[agent])
+    coordinator.add_tasks([("short nap", 3), ("nap", 2), ("nap", 1)])
+
+    async def first_result():
+        cycle = coordinator.iter_async_cycle()
+        result = await cycle.__anext__()
+        await cycle.aclose()
+        return result
+
+    assert asyncio.run(first_result())["result"] == "short nap"
+    assert agent.active_task_count == 0
+    assert agent.completed_task_count == 3
+    assert len(coordinator.result_store) == 3
+
+def test_cancelled_async_cycle_fails_running_tasks_and_requeues_waiting_ones():
+    agent = NappingAgent()
+    coordinator = AsyncAgentCoordinator(agents=[agent], agent_limits={"NappingAgent": 1})
+    coordinator.add_tasks([("nap", 3), ("nap", 2), ("nap", 1)])
+
+    async def cancel_midway():
+        cycle = asyncio.ensure_future(coordinator.run_async_cycle())
+        await asyncio.sleep(0.03)
+        cycle.cancel()
+        try:
+            await cycle
+        except asyncio.CancelledError:
+            pass
+
+    asyncio.run(cancel_midway())
+    assert agent.active_task_count == 0
+    assert agent.completed_task_count == 0
+    # One task was running and failed; the two waiting for the agent were requeued
+    assert len(coordinator.task_queue) == 2
+
+def test_agent_limits_work_across_event_loops():
+    agent = NappingAgent()
+    coordinator = AsyncAgentCoordinator(agents=[agent], agent_limits={"NappingAgent": 1})
+
+    for _ in range(2):
+        coordinator.add_tasks([("short nap", 1)] * 3)
+        results = asyncio.run(coordinator.run_async_cycle())
+        assert [result["status"] for result in results] == ["success"] * 3
+    assert agent.completed_task_count == 6
@@ -0,0 +1,59 @@
+"""
+Tests for token and latency budgets
+"""
+
+import pickle
+import time
+
+import pytest
+from budget import BudgetEnforcer, BudgetExceeded, DeadlineExceeded
+from openai_client import RateLimiter, _remaining
+
+MESSAGES = [{"role": "system", "content": "be brief"}, {"role": "user", "content": "hi"}]
+
+def test_deadline_follows_the_task_latency_budget():
+    assert BudgetEnforcer().deadline() is None
+
+    before = time.monotonic()
+    deadline = BudgetEnforcer(task_latency=2.0).deadline()
+    assert before + 2.0 <= deadline <= time.monotonic() + 2.0
+
+def test_passed_deadline_raises_a_budget_error():
+    assert issubclass(DeadlineExceeded, BudgetExceeded)
+    assert _remaining(None) is None
+    assert 0 < _remaining(time.monotonic() + 1.0) <= 1.0
+    with pytest.raises(DeadlineExceeded):
+        _remaining(time.monotonic() - 0.01)
+
+def test_rate_limit_wait_past_deadline_fails_fast_and_refunds():
+    limiter = RateLimiter(requests_per_minute=1, tokens_per_minute=1000)
+    limiter.acquire(10)
+
+    # The next request slot is a minute away
+    started = time.monotonic()
+    with pytest.raises(DeadlineExceeded):
+        limiter.acquire(10, deadline=time.monotonic() + 0.5)
+    assert time.monotonic() - started < 0.1
+    assert limiter.tokens.reserve(0) == 0.0 and limiter.tokens._tokens == pytest.approx(990, abs=1)
+
+def test_minute_budgets_reject_until_spend_ages_out():
+    enforcer = BudgetEnforcer(minute_tokens=100, minute_latency=1.0, window=0.2)
+    messages, reserved = enforcer.prepare(MESSAGES, max_tokens=20)
+    enforcer.record(90, 1.5, reserved=reserved)
+
+    with pytest.raises(BudgetExceeded):
+        enforcer.prepare(MESSAGES, max_tokens=20)
+    time.sleep(0.25)
+    enforcer.prepare(MESSAGES, max_tokens=20)
+    assert enforcer.stats()["rejected"] == 1
+
+def test_reject_policy_and_pickled_copy():
+    enforcer = BudgetEnforcer(task_tokens=10, task_latency=1.0, policy="reject")
+    with pytest.raises(BudgetExceeded):
+        enforcer.prepare(MESSAGES, max_tokens=50)
+
+    copy = pickle.loads(pickle.dumps(enforcer))
+    copy.record(5, 0.1)
+    assert copy.stats()["calls"] == 1 and copy.deadline() is not None
+    with pytest.raises(ValueError):
+        BudgetEnforcer(policy="ignore")
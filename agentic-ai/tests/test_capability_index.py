@@ -0,0 +1,33 @@
+"""
+Tests for capability keyword matching
+"""
+
+from capability_index import CapabilityIndex, KeywordAutomaton
+
+class Capable:
+    def __init__(self, name, capabilities):
+        self.name = name
+        self.capabilities = capabilities
+
+    def __repr__(self):
+        return self.name
+
+def test_overlapping_and_nested_keywords_all_match():
+    automaton = KeywordAutomaton([("data", "data"), ("database", "database"), ("base", "base"), ("sea", "sea")])
+
+    # "database" contains "data" and "base"; "research" contains "sea"
+    assert automaton.find("database research") == {"data", "database", "base", "sea"}
+    assert automaton.count("data in a database") == {"data": 2, "database": 1, "base": 1}
+    assert automaton.find("nothing relevant") == set()
+
+def test_index_counts_hits_per_agent_in_registration_order():
+    writer = Capable("writer", ["Writing", "summary"])
+    analyst = Capable("analyst", ["data", "analysis"])
+    dba = Capable("dba", ["database"])
+    index = CapabilityIndex([writer, analyst, dba])
+
+    description = "Write a summary of the DATABASE analysis and its data"
+    assert index.candidates(description) == [writer, analyst, dba]
+    assert index.match_counts(description) == {writer: 1, analyst: 3, dba: 1}
+    assert index.candidates("translate a poem") == []
+    assert len(index) == 3
@@ -0,0 +1,118 @@
+"""
+Tests for AgentCoordinator concurrent cycles
+"""
+
+import threading
+import time
+import pytest
+from agent import Agent, Task
+from coordinator import AgentCoordinator
+from result_store import MemoryResultStore
+
+class SleepyAgent(Agent):
+    def __init__(self):
+        super().__init__("SleepyAgent", ["sleep"])
+
+    def execute_task(self, task: Task):
+        time.sleep(0.05 if "slow" in task.description else 0)
+        if "fail" in task.description:
+            raise RuntimeError("failed on purpose")
+        return task.description
+
+def test_closing_concurrent_cycle_early_records_running_tasks():
+    agent = SleepyAgent()
+    coordinator = AgentCoordinator(agents=[agent])
+    coordinator.add_tasks([("fast sleep", 3), ("slow sleep", 2), ("slow fail sleep", 2), ("slow sleep", 1)])
+
+    cycle = coordinator.iter_concurrent_cycle(max_workers=3)
+    first = next(cycle)
+    cycle.close()
+
+    assert first["status"] == "success"
+    assert agent.active_task_count == 0
+    # After the first result the fourth task was dispatched too; all three
+    # still running at close are recorded, the failing one as failed
+    assert agent.completed_task_count == 3
+    assert len(coordinator.result_store) == 3
+    assert coordinator.get_system_status()["completed_tasks"] == 3
+    assert len(coordinator.task_queue) == 0
+
+def test_threads_draining_and_cancelling_dispatch_each_task_once():
+    agent = SleepyAgent()
+    coordinator = AgentCoordinator(agents=[agent])
+    task_ids = coordinator.add_tasks([(f"sleep {i}", i % 5) for i in range(2000)])
+    executed = []
+
+    def drain():
+        while True:
+            result = coordinator.execute_next_task()
+            if result["status"] == "no_tasks":
+                return
+            executed.append(result["task_id"])
+
+    def cancel():
+        for task_id in task_ids[::7]:
+            coordinator.cancel_task(task_id)
+
+    threads = [threading.Thread(target=drain) for _ in range(8)] + [threading.Thread(target=cancel)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    cancelled = len(task_ids) - len(executed)
+    assert len(executed) == len(set(executed))
+    assert not set(executed) & {task.id for task in coordinator.pending_tasks()}
+    assert len(coordinator.task_queue) == 0
+    assert agent.active_task_count == 0
+    assert agent.completed_task_count == len(executed)
+    assert coordinator.get_system_status()["completed_tasks"] == len(executed)
+    assert 0 <= cancelled <= len(task_ids[::7])
+
+class BatchAgent(Agent):
+    def __init__(self, name, capability, others):
+        super().__init__(name, [capability])
+        self.others = others
+        self.seen = []
+
+    def execute_task(self, task):
+        return self.execute_batch([task])[0]
+
+    def execute_batch(self, tasks):
+        waited = max(time.perf_counter() - task.started_at for task in tasks)
+        self.seen.append((self.active_task_count, [other.active_task_count for other in self.others], waited))
+        time.sleep(0.1)
+        return [task.description for task in tasks]
+
+def test_batch_groups_start_only_when_their_agent_runs():
+    agents = []
+    first, second = BatchAgent("First", "alpha", agents), BatchAgent("Second", "beta", agents)
+    agents.extend([first, second])
+    coordinator = AgentCoordinator(agents=agents)
+    coordinator.add_tasks([("alpha one", 2), ("alpha two", 2), ("beta one", 1), ("beta two", 1)])
+
+    results = coordinator.execute_batch()
+
+    assert [result["status"] for result in results] == ["success"] * 4
+    for agent in agents:
+        (own, counts, waited), = agent.seen
+        # Only this agent's own group is running, and none of its time was spent waiting
+        assert own == 2 and sorted(counts) == [0, 2]
+        assert waited < 0.05
+
+class FailingStore(MemoryResultStore):
+    def add_record(self, record):
+        raise OSError("disk full")
+
+def test_result_store_error_is_not_recorded_as_a_task_failure():
+    agent = SleepyAgent()
+    coordinator = AgentCoordinator(agents=[agent], result_store=FailingStore())
+    coordinator.add_tasks([("fast sleep", 2), ("slow sleep", 1)])
+
+    cycle = coordinator.iter_concurrent_cycle(max_workers=2)
+    with pytest.raises(OSError):
+        next(cycle)
+
+    # Counted once as completed, never decremented a second time as failed
+    assert agent.active_task_count == 0
+    assert agent.completed_task_count == 2
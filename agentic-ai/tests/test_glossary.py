@@ -0,0 +1,28 @@
+"""
+Tests for glossary term replacement
+"""
+
+from glossary import Glossary
+
+def test_longest_term_wins_over_its_prefix():
+    glossary = Glossary({"machine": "Maschine", "machine learning": "maschinelles Lernen",
+                         "machine learning model": "ML-Modell"})
+
+    assert glossary.translate("A machine learning model.") == "A ML-Modell."
+    assert glossary.translate("machine learning helps") == "maschinelles Lernen helps"
+    # A partial longer term falls back to the longest complete one
+    assert glossary.translate("machine learning modes") == "maschinelles Lernen modes"
+    assert glossary.translate("the machine") == "the Maschine"
+
+def test_matches_whole_words_case_insensitively():
+    glossary = Glossary({"cat": "Katze", "data set": "Datensatz"})
+
+    assert glossary.translate("CAT and Cat, not category") == "Katze and Katze, not category"
+    assert glossary.translate("a Data  Set here") == "a Datensatz here"
+
+def test_multi_word_terms_do_not_span_punctuation():
+    glossary = Glossary({"data set": "Datensatz", "set": "Menge"})
+
+    assert glossary.translate("data, set") == "data, Menge"
+    assert glossary.translate("data set") == "Datensatz"
+    assert "DATA SET" in glossary and "data" not in glossary and len(glossary) == 2
@@ -0,0 +1,72 @@
+"""
+Tests for LLMAgent text processing
+"""
+
+import pickle
+import pytest
+from coordinator import AgentCoordinator
+from lexicon import WORD, Lexicon, tokenize, write_lexicon
+from llm_agent import ENTITY_OVERLAP, ENTITY_PATTERN, LLMAgent, _iter_entity_matches
+from sentiment_engine import SentimentEngine
+
+def _entities(matches):
+    return [(match.lastgroup, match.group()) for match in matches]
+
+def test_entity_straddling_chunk_boundary_matches_unchunked_scan():
+    chunk_size = 1024
+    text = "y" * (chunk_size - 9) + " Tel(555) 123-4567 end " + "z" * 1000
+
+    assert _entities(ENTITY_PATTERN.finditer(text)) == [("phone", "(555) 123-4567")]
+    assert _entities(_iter_entity_matches(text, chunk_size)) == [("phone", "(555) 123-4567")]
+
+def test_entities_at_every_boundary_offset_match_unchunked_scan():
+    chunk_size = ENTITY_OVERLAP + 64
+    entity = "Tel(555) 123-4567, mail a.b@example.com on 12/31/2024"
+    for offset in range(len(entity) + 2):
+        text = "y" * (chunk_size - offset) + " " + entity + " " + "z" * chunk_size
+        expected = _entities(ENTITY_PATTERN.finditer(text))
+        assert _entities(_iter_entity_matches(text, chunk_size)) == expected
+        assert _entities(_iter_entity_matches(iter(text.splitlines(True)), chunk_size)) == expected
+
+def test_batch_sentiment_matches_per_text_lexicon_polarity():
+    agent = LLMAgent()
+    texts = [
+        "This is really good, but not good at all",
+        "Not very bad. Extremely helpful, never wrong!",
+        "",
+        "no",
+        "I don't hate it; it is somewhat great and so bad",
+        "nothing in the lexicon here",
+    ]
+    polarities = agent.sentiment_engine.polarities(texts)
+    for text, (positive, negative) in zip(texts, polarities):
+        expected = agent.lexicon.polarity(tokenize(text))
+        assert (positive, negative) == pytest.approx(expected, abs=1e-6)
+
+    results = agent._analyze_sentiment_batch(texts)
+    assert [result["sentiment"] for result in results] == [
+        agent._analyze_sentiment(text)["sentiment"] for text in texts
+    ]
+    assert (results[0]["positive_indicators"], results[0]["negative_indicators"]) == (1.3, 1.0)
+
+def test_agent_and_lexicons_pickle_round_trip(tmp_path):
+    agent = LLMAgent()
+    restored = pickle.loads(pickle.dumps(agent))
+    # The shared lexicon is reopened, not copied
+    assert restored.lexicon is agent.lexicon
+    assert restored._analyze_sentiment_batch(["not very bad"]) == agent._analyze_sentiment_batch(["not very bad"])
+
+    path = str(tmp_path / "custom.lex")
+    write_lexicon(path, [("splendid", 2.0, WORD)])
+    for lexicon in (Lexicon.open(path), Lexicon.from_terms([("splendid", 2.0, WORD)])):
+        engine = pickle.loads(pickle.dumps(SentimentEngine(lexicon)))
+        assert list(engine.scores(["a splendid day"])) == [2.0]
+
+def test_llm_agent_runs_in_process_pool_cycle():
+    coordinator = AgentCoordinator(agents=[LLMAgent()])
+    coordinator.add_tasks([("sentiment: really great work", 2), ("sentiment: awful", 1)])
+
+    results = list(coordinator.iter_concurrent_cycle(max_workers=2, executor="process"))
+
+    assert [result["status"] for result in results] == ["success", "success"]
+    assert sorted(result["result"]["sentiment"] for result in results) == ["negative", "positive"]
@@ -0,0 +1,162 @@
+"""
+Tests for OpenAIClient against a local mock Chat Completions server
+"""
+
+import asyncio
+import json
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from agent import Task
+from config import llm_config
+from openai_client import AsyncOpenAIClient, OpenAIClient, TokenBucket
+from openai_integration import OpenAIAgent
+
+MESSAGES = [{"role": "user", "content": "hi"}]
+
+def completion(content="hello", total_tokens=5):
+    return 200, {}, {"choices": [{"message": {"content": content}}], "usage": {"total_tokens": total_tokens}}
+
+def sse(*contents):
+    events = [{"choices": [{"delta": {"content": content}}]} for content in contents]
+    return 200, {"Content-Type": "text/event-stream"}, [f"data: {json.dumps(e)}" for e in events] + ["data: [DONE]"]
+
+class MockHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.received.append((time.monotonic(), body))
+        time.sleep(self.server.delay)
+        status, headers, reply = self.server.replies.popleft() if self.server.replies else completion()
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        if isinstance(reply, list):  # Server-sent events, one per line
+            for line in reply:
+                self.wfile.write(f"{line}\n\n".encode())
+                self.wfile.flush()
+        else:
+            self.wfile.write(json.dumps(reply).encode())
+
+    def log_message(self, *args):
+        pass
+
+class MockServer(ThreadingHTTPServer):
+    # The default listen backlog of 5 drops bursts of connections, which then retry a second later
+    request_queue_size = 64
+
+@pytest.fixture
+def server():
+    httpd = MockServer(("127.0.0.1", 0), MockHandler)
+    httpd.replies, httpd.received, httpd.delay = deque(), [], 0.0
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    httpd.base_url = f"http://127.0.0.1:{httpd.server_address[1]}/v1"
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+def test_429_is_retried_after_retry_after(server):
+    server.replies.extend([(429, {"Retry-After": "0.3"}, {"error": {"message": "slow down"}}), completion("done")])
+    client = OpenAIClient("key", base_url=server.base_url)
+
+    started = time.monotonic()
+    response = client.chat_completion(MESSAGES)
+
+    assert response["choices"][0]["message"]["content"] == "done"
+    assert len(server.received) == 2
+    assert server.received[1][0] - server.received[0][0] >= 0.3
+    assert time.monotonic() - started >= 0.3
+
+def test_streamed_429_is_closed_before_retrying(server):
+    server.replies.extend([(429, {"Retry-After": "0"}, {"error": {"message": "slow down"}}), sse("a", "b")])
+    client = OpenAIClient("key", base_url=server.base_url)
+    responses = []
+    post = client.session.post
+    client.session.post = lambda *args, **kwargs: responses.append(post(*args, **kwargs)) or responses[-1]
+
+    assert list(client.stream_chat_completion(MESSAGES)) == ["a", "b"]
+    assert responses[0].status_code == 429 and responses[0].raw.closed
+
+def test_request_and_token_budgets_pace_calls(server):
+    client = OpenAIClient("key", base_url=server.base_url)
+    # Two requests per 0.4s: the third and fourth calls wait for refills
+    client.limiter.requests = TokenBucket(2, period=0.4)
+    for _ in range(4):
+        client.chat_completion(MESSAGES, max_tokens=1)
+    times = [at for at, _ in server.received]
+    assert times[3] - times[0] >= 0.35
+
+    # 100 tokens per 0.5s and about 60 reserved per call: every call after the first waits
+    server.received.clear()
+    client.limiter.requests = TokenBucket(100)
+    client.limiter.tokens = TokenBucket(100, period=0.5)
+    server.replies.extend([completion(total_tokens=60)] * 3)  # No unused reservation to refund
+    for _ in range(3):
+        client.chat_completion(MESSAGES, max_tokens=55)
+    times = [at for at, _ in server.received]
+    assert times[2] - times[0] >= 0.3
+
+def test_stream_yields_sse_deltas_in_order(server):
+    server.replies.append(sse("Hel", "lo", " world"))
+    client = OpenAIClient("key", base_url=server.base_url)
+
+    assert list(client.stream_chat_completion(MESSAGES)) == ["Hel", "lo", " world"]
+    assert server.received[0][1]["stream"] is True
+
+def test_async_client_retries_429_without_blocking_the_loop(server):
+    pytest.importorskip("aiohttp")
+    server.replies.extend([(429, {"Retry-After": "0.3"}, {"error": {"message": "slow down"}}), completion("done")])
+    client = AsyncOpenAIClient("key", base_url=server.base_url)
+
+    async def run():
+        ticks = 0
+        call = asyncio.ensure_future(client.chat_completion(MESSAGES))
+        while not call.done():
+            ticks += 1
+            await asyncio.sleep(0.01)
+        await client.close()
+        return call.result(), ticks
+
+    response, ticks = asyncio.run(run())
+    assert response["choices"][0]["message"]["content"] == "done"
+    assert len(server.received) == 2 and ticks > 10
+
+def test_async_agent_calls_overlap_without_executor_threads(server, monkeypatch):
+    pytest.importorskip("aiohttp")
+    monkeypatch.setattr(llm_config, "openai_base_url", server.base_url)
+    server.delay = 0.3
+    agent = OpenAIAgent(api_key="key")
+    assert agent._get_async_client().limiter is agent._get_client().limiter
+
+    async def run():
+        # A one-thread executor would serialize calls that went through it
+        asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=1))
+        tasks = [Task(id=str(i), description=f"prompt {i}") for i in range(8)]
+        results = await asyncio.gather(*(agent.execute_task_async(task) for task in tasks))
+        await agent._get_async_client().close()
+        return results
+
+    results = asyncio.run(run())
+    assert [result["response"] for result in results] == ["hello"] * 8
+    # Every request reached the server before the first 0.3s reply came back
+    times = [at for at, _ in server.received]
+    assert len(times) == 8 and max(times) - min(times) < 0.3
+
+def test_batch_longer_than_latency_budget_gives_each_prompt_its_own_deadline(server, monkeypatch):
+    monkeypatch.setattr(llm_config, "openai_base_url", server.base_url)
+    monkeypatch.setattr(llm_config, "max_concurrent_requests", 2)
+    monkeypatch.setattr(llm_config, "task_latency_budget", 0.5)
+    server.delay = 0.2
+    agent = OpenAIAgent(api_key="key")
+
+    # Six 0.2s calls two at a time take about 0.6s, over one task's budget
+    started = time.monotonic()
+    results = agent.execute_batch([Task(id=str(i), description=f"prompt {i}") for i in range(6)])
+
+    assert time.monotonic() - started > 0.5
+    assert [result.get("response") for result in results] == ["hello"] * 6
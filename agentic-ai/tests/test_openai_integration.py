@@ -0,0 +1,19 @@
+"""
+Tests for OpenAIAgent
+"""
+
+import pickle
+from openai_integration import OpenAIAgent
+
+def test_agent_survives_pickle_round_trip():
+    agent = OpenAIAgent(api_key="test-key")
+    agent.budget.record(10, 0.5)
+
+    copy = pickle.loads(pickle.dumps(agent))
+
+    assert copy.api_key == "test-key"
+    assert copy.budget.stats()["tokens"] == 10
+    with copy.budget._lock, copy.response_cache._lock:
+        pass
+    copy.response_cache.set("key", {"response": "cached"})
+    assert copy.response_cache.get("key") == {"response": "cached"}
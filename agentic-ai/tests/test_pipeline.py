@@ -0,0 +1,80 @@
+"""
+Tests for pipeline validation and scheduling
+"""
+
+import threading
+import time
+
+import pytest
+from pipeline import Pipeline, PipelineError, PipelineScheduler, Stage
+
+def diamond():
+    """text -> (words, chars) -> report"""
+    return Pipeline([
+        Stage("report", "report", func=lambda words, chars: f"{words} words, {chars} chars",
+              inputs={"words": int, "chars": int}, output_type=str),
+        Stage("count_words", "words", func=lambda text: len(text.split()), inputs={"text": str}, output_type=int),
+        Stage("count_chars", "chars", func=lambda text: len(text), inputs={"text": str}, output_type=int),
+    ], external_inputs={"text": str})
+
+def test_validate_orders_stages_after_their_dependencies():
+    order = [stage.name for stage in diamond().validate()]
+    assert sorted(order) == ["count_chars", "count_words", "report"]
+    assert order.index("report") > order.index("count_words")
+    assert order.index("report") > order.index("count_chars")
+
+def test_cycle_is_rejected():
+    pipeline = Pipeline([
+        Stage("a", "x", func=lambda y: y, inputs={"y": int}, output_type=int),
+        Stage("b", "y", func=lambda x: x, inputs={"x": int}, output_type=int),
+    ])
+    with pytest.raises(PipelineError, match="cycle"):
+        pipeline.validate()
+
+def test_miswired_pipelines_are_rejected():
+    missing = Pipeline([Stage("a", "x", func=len, inputs={"text": str}, output_type=int)])
+    with pytest.raises(PipelineError, match="nothing produces"):
+        missing.validate()
+
+    mismatched = Pipeline([Stage("a", "x", func=len, inputs={"text": str}, output_type=int)],
+                          external_inputs={"text": bytes})
+    with pytest.raises(PipelineError, match="expects text as str"):
+        mismatched.validate()
+
+    with pytest.raises(PipelineError, match="more than once"):
+        Pipeline([Stage("a", "x", func=len), Stage("b", "x", func=len)])
+
+def test_scheduler_runs_branches_in_parallel_and_dependents_after_them():
+    both_running = threading.Barrier(2, timeout=2)
+
+    def overlapping(func):
+        def stage(text):
+            both_running.wait()  # Only passes if the two branches overlap
+            return func(text)
+        return stage
+
+    pipeline = diamond()
+    for name in ("count_words", "count_chars"):
+        pipeline.stages[name].func = overlapping(pipeline.stages[name].func)
+    finished = []
+    run = PipelineScheduler(max_workers=2).run(pipeline, {"text": "two words"},
+                                               on_stage_complete=lambda name, _: finished.append(name))
+
+    assert run.status == "success"
+    assert run.outputs == {"report": "2 words, 9 chars", "words": 2, "chars": 9}
+    assert finished[-1] == "report"
+    assert run.critical_path[-1] == "report" and len(run.critical_path) == 2
+
+def test_failed_stage_skips_its_dependents():
+    def fail(text):
+        time.sleep(0.01)
+        raise ValueError("boom")
+
+    pipeline = diamond()
+    pipeline.stages["count_words"].func = fail
+    run = PipelineScheduler().run(pipeline, {"text": "two words"})
+
+    assert run.status == "error"
+    assert run.errors["count_words"] == "boom"
+    assert run.errors["report"].startswith("Skipped")
+    assert run.outputs == {"chars": 9}
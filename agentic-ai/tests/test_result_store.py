@@ -0,0 +1,34 @@
+"""
+Tests for the persistent result stores
+"""
+
+import time
+from result_store import JSONLResultStore, SQLiteResultStore
+
+def _record(task_id, completed_at):
+    return {"task_id": task_id, "description": "d", "priority": 1, "status": "completed",
+            "agent": "a", "result": task_id, "completed_at": completed_at}
+
+def test_sqlite_reads_hide_expired_rows_before_prune(tmp_path):
+    store = SQLiteResultStore(str(tmp_path / "results.db"), max_age=60, prune_every=1000)
+    store.add_record(_record("old", time.time() - 120))
+    store.add_record(_record("new", time.time()))
+
+    assert store.get("old") is None
+    assert store.get("new")["result"] == "new"
+    assert [record["task_id"] for record in store.iter_window()] == ["new"]
+    assert [record["task_id"] for record in store.iter_window(start=0)] == ["new"]
+    assert len(store) == 1
+    store.close()
+
+def test_jsonl_index_is_bounded_by_default(tmp_path):
+    store = JSONLResultStore(str(tmp_path / "results.jsonl"))
+    assert store.max_results is not None
+
+    store.max_results = 10
+    for i in range(3000):
+        store.add_record(_record(f"task_{i}", time.time()))
+    assert len(store._index) == len(store) == 10
+    assert store.get("task_2999")["result"] == "task_2999"
+    assert store.get("task_0") is None
+    store.close()
@@ -0,0 +1,29 @@
+"""
+Tests for the heap-backed TaskQueue
+"""
+
+import pytest
+from agent import Task
+from task_queue import TaskQueue
+
+def _drain(queue):
+    order = []
+    while queue:
+        order.append(queue.pop().id)
+    return order
+
+@pytest.mark.parametrize("batch", [
+    [Task(id="z", description="", priority=9), Task(id="0", description="", priority=5)],
+    [Task(id="y", description="", priority=9), Task(id="y", description="", priority=9)],
+])
+def test_push_many_with_duplicate_id_leaves_queue_unchanged(batch):
+    queue = TaskQueue(Task(id=str(i), description="", priority=i % 3) for i in range(6))
+    queue.push(Task(id="x", description="", priority=1))
+    version = queue.version
+
+    with pytest.raises(ValueError):
+        queue.push_many(batch)
+
+    assert queue.version == version
+    assert len(queue) == 7 and "y" not in queue and "z" not in queue
+    assert _drain(queue) == ["2", "5", "1", "4", "x", "0", "3"]
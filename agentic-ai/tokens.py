@@ -0,0 +1,37 @@
+"""
+Local Token Estimation for LLM prompts (no network or tokenizer files needed)
+"""
+
+import re
+from typing import Dict, List
+
+# Words, digit runs and single punctuation marks, roughly as BPE tokenizers split them
+TOKEN_PATTERN = re.compile(r"[^\W\d_]+|\d+|[^\w\s]|_+")
+
+# Chat formatting adds a few tokens per message and per reply
+MESSAGE_OVERHEAD = 4
+REPLY_OVERHEAD = 2
+
+def _piece_tokens(piece: str) -> int:
+    if not piece.isascii():
+        return len(piece)  # Non-Latin scripts run about one token per character
+    if piece.isdigit():
+        return (len(piece) + 2) // 3
+    # Common words are one token; long or rare ones split into several
+    return (len(piece) + 5) // 6
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count of text for GPT-style tokenizers"""
+    return max(1, sum(_piece_tokens(piece) for piece in TOKEN_PATTERN.findall(text))) if text else 0
+
+def estimate_message_tokens(messages: List[Dict]) -> int:
+    return sum(estimate_tokens(m.get("content") or "") + MESSAGE_OVERHEAD for m in messages) + REPLY_OVERHEAD
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Longest prefix of text estimated to fit in max_tokens"""
+    used = 0
+    for match in TOKEN_PATTERN.finditer(text):
+        used += _piece_tokens(match.group())
+        if used > max_tokens:
+            return text[:match.start()].rstrip()
+    return text
@@ -2,23 +2,29 @@
 Web Interface for Real-time Agentic AI Monitoring
 """
 
-from flask import Flask, render_template, jsonify, request
+from flask import Flask, Response, render_template, jsonify, request
 from flask_socketio import SocketIO, emit
 import json
 import threading
 import time
-from coordinator import AgentCoordinator
+from agent import Task
+from async_coordinator import AsyncAgentCoordinator, BackgroundLoop
 from llm_agent import LLMAgent, create_intelligent_task
 from openai_integration import OpenAIAgent
+from metrics import PROMETHEUS_CONTENT_TYPE
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'agentic-ai-monitor'
 socketio = SocketIO(app, cors_allowed_origins="*")
 
 # Global coordinator instance with LLM agents
-coordinator = AgentCoordinator()
-coordinator.agents.extend([LLMAgent(), OpenAIAgent()])
-monitoring_active = False
+coordinator = AsyncAgentCoordinator()
+coordinator.register_agents([LLMAgent(), OpenAIAgent()])
+event_loop = BackgroundLoop()
+# Socket.IO sessions watching status; the shared monitor loop runs while any remain
+monitor_subscribers = set()
+monitor_lock = threading.Lock()
+monitor_thread = None
 
 @app.route('/')
 def dashboard():
@@ -28,6 +34,10 @@ def dashboard():
 def get_status():
     return jsonify(coordinator.get_system_status())
 
+@app.route('/api/metrics')
+def get_metrics():
+    return Response(coordinator.metrics.render_prometheus(), content_type=PROMETHEUS_CONTENT_TYPE)
+
 @app.route('/api/add_task', methods=['POST'])
 def add_task():
     data = request.json
@@ -35,7 +45,7 @@ def add_task():
     # Use LLM to create intelligent task
     if data.get('use_llm', False):
         task = create_intelligent_task(data['description'])
-        coordinator.task_queue.append(task)
+        coordinator.queue_task(task)
         task_id = task.id
     else:
         task_id = coordinator.add_task(data['description'], data.get('priority', 1))
@@ -49,6 +59,43 @@ def add_task():
     
     return jsonify({'task_id': task_id, 'status': 'added'})
 
+@app.route('/api/tasks')
+def list_tasks():
+    return jsonify({'pending': [
+        {'task_id': task.id, 'description': task.description, 'priority': task.priority}
+        for task in coordinator.pending_tasks()
+    ]})
+
+@app.route('/api/cancel_task', methods=['POST'])
+def cancel_task():
+    task_id = request.json.get('task_id')
+    task = coordinator.cancel_task(task_id)
+    if not task:
+        return jsonify({'task_id': task_id, 'status': 'not_found'}), 404
+    
+    socketio.emit('task_cancelled', {'task_id': task_id})
+    
+    return jsonify({'task_id': task_id, 'status': 'cancelled'})
+
+@app.route('/api/results')
+def list_results():
+    since = request.args.get('since', type=float)
+    until = request.args.get('until', type=float)
+    limit = request.args.get('limit', 100, type=int)
+    results = []
+    for record in coordinator.result_store.iter_window(since, until):
+        if len(results) >= limit:
+            break
+        results.append(record)
+    return jsonify({'results': results})
+
+@app.route('/api/results/<task_id>')
+def get_result(task_id):
+    record = coordinator.get_task_result(task_id)
+    if not record:
+        return jsonify({'task_id': task_id, 'status': 'not_found'}), 404
+    return jsonify(record)
+
 @app.route('/api/execute_task', methods=['POST'])
 def execute_task():
     result = coordinator.execute_next_task()
@@ -58,46 +105,119 @@ def execute_task():
     
     return jsonify(result)
 
+def monitor_loop():
+    """Push status changes to all clients; one loop however many are connected"""
+    global monitor_thread
+    last_status = None
+    while True:
+        with monitor_lock:
+            # Exit and clear the handle together, so a concurrent start
+            # either keeps this loop alive or starts a fresh one
+            if not monitor_subscribers:
+                monitor_thread = None
+                return
+        if last_status is None or coordinator.status_version != last_status["version"]:
+            delta = coordinator.get_status_delta(last_status)
+            last_status = coordinator.get_system_status() if last_status is None else merge_status(last_status, delta)
+            socketio.emit('status_update', delta)
+        time.sleep(2)
+
+def merge_status(status, delta):
+    merged = {**status, **{k: v for k, v in delta.items() if k != 'agents'}}
+    merged['agents'] = [delta['agents'].get(agent['name'], agent) for agent in status['agents']]
+    known = {agent['name'] for agent in status['agents']}
+    merged['agents'].extend(agent for name, agent in delta['agents'].items() if name not in known)
+    return merged
+
 @socketio.on('start_monitoring')
 def start_monitoring():
-    global monitoring_active
-    monitoring_active = True
+    global monitor_thread
     
-    def monitor_loop():
-        while monitoring_active:
-            status = coordinator.get_system_status()
-            socketio.emit('status_update', status)
-            time.sleep(2)
+    # New clients get a full snapshot; later pushes carry only changes
+    emit('status_update', coordinator.get_system_status())
     
-    thread = threading.Thread(target=monitor_loop)
-    thread.daemon = True
-    thread.start()
+    with monitor_lock:
+        monitor_subscribers.add(request.sid)
+        if monitor_thread is None or not monitor_thread.is_alive():
+            monitor_thread = threading.Thread(target=monitor_loop)
+            monitor_thread.daemon = True
+            monitor_thread.start()
     
     emit('monitoring_started', {'status': 'active'})
 
 @socketio.on('stop_monitoring')
 def stop_monitoring():
-    global monitoring_active
-    monitoring_active = False
+    """Unsubscribe this client; the loop stops once no client is left"""
+    with monitor_lock:
+        monitor_subscribers.discard(request.sid)
     emit('monitoring_stopped', {'status': 'inactive'})
 
+@socketio.on('disconnect')
+def client_disconnected():
+    with monitor_lock:
+        monitor_subscribers.discard(request.sid)
+
 @socketio.on('auto_execute')
 def auto_execute():
     def execute_loop():
         for _ in range(5):  # Execute up to 5 tasks
-            if coordinator.task_queue:
-                result = coordinator.execute_next_task()
-                socketio.emit('task_executed', result)
-                time.sleep(1)
+            result = coordinator.execute_next_task()
+            if result.get('status') == 'no_tasks':
+                break
+            socketio.emit('task_executed', result)
+            time.sleep(1)
     
     thread = threading.Thread(target=execute_loop)
     thread.daemon = True
     thread.start()
 
+@socketio.on('execute_all')
+def execute_all(data=None):
+    """Run queued tasks concurrently on the shared event loop"""
+    max_tasks = (data or {}).get('max_tasks')
+    
+    async def execute_concurrently():
+        async for result in coordinator.iter_async_cycle(max_tasks):
+            socketio.emit('task_executed', result)
+    
+    event_loop.submit(execute_concurrently())
+
+@socketio.on('stream_task')
+def stream_task(data):
+    """Run a prompt on the OpenAI agent, forwarding tokens as they arrive"""
+    agent = next((a for a in coordinator.agents if isinstance(a, OpenAIAgent)), None)
+    if agent is None:
+        emit('task_executed', {'status': 'error', 'error': 'No streaming agent registered'})
+        return
+    
+    sid = request.sid
+    task = Task(id=f"stream_{int(time.time() * 1000)}", description=data['description'],
+                priority=data.get('priority', 1))
+    
+    def forward_tokens():
+        coordinator._start_task(task, agent)
+        socketio.emit('task_stream_started', {'task_id': task.id, 'agent': agent.name}, to=sid)
+        stream = agent.stream_task(task)
+        try:
+            while True:
+                try:
+                    token = next(stream)
+                except StopIteration as finished:
+                    result = coordinator._complete_task(task, agent, finished.value)
+                    break
+                socketio.emit('task_token', {'task_id': task.id, 'token': token}, to=sid)
+        except Exception as e:
+            result = coordinator._fail_task(task, agent, e)
+        socketio.emit('task_executed', result)
+    
+    socketio.start_background_task(forward_tokens)
+
 if __name__ == '__main__':
     # Add sample tasks
-    coordinator.add_task("Analyze customer behavior data", 3)
-    coordinator.add_task("Train recommendation model", 2)
-    coordinator.add_task("Plan ML deployment strategy", 1)
+    coordinator.add_tasks([
+        ("Analyze customer behavior data", 3),
+        ("Train recommendation model", 2),
+        ("Plan ML deployment strategy", 1)
+    ])
     
     socketio.run(app, debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
@@ -0,0 +1,101 @@
+"""
+Compact Memory-mapped Naive Bayes Model for sentiment inference
+"""
+
+import json
+import os
+from typing import Dict, Optional
+import numpy as np
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.naive_bayes import MultinomialNB
+
+FORMAT_VERSION = 1
+
+def hashing_vectorizer(params: Dict) -> HashingVectorizer:
+    """Vectorizer for JSON-safe params; float32 output so inference never upcasts the weights"""
+    return HashingVectorizer(**params, dtype=np.float32)
+
+class CompactNaiveBayes:
+    """Read-only MultinomialNB exported as plain .npy arrays.
+
+    A model directory holds meta.json (hashing parameters, classes and
+    any extra metadata), the float32 inference arrays log_prob.npy
+    (features x classes) and log_prior.npy, and the float64 counts
+    needed to resume training. Arrays are opened with mmap_mode="r", so
+    loading is constant-time whatever the model size, pages are read on
+    first use, and every process loading the same files, including
+    pre-fork workers, shares one copy through the page cache.
+    """
+
+    def __init__(self, path: str, meta: Dict):
+        self.path = path
+        self.meta = meta
+        self.classes_ = np.array(meta["classes"])
+        self.vectorizer = hashing_vectorizer(meta["vectorizer"])
+        self.log_prob = np.load(os.path.join(path, "log_prob.npy"), mmap_mode="r")
+        self.log_prior = np.load(os.path.join(path, "log_prior.npy"), mmap_mode="r")
+
+    @classmethod
+    def load(cls, path: str) -> "CompactNaiveBayes":
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        if meta.get("format") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported model format in {path}")
+        return cls(path, meta)
+
+    @staticmethod
+    def export(path: str, classifier: MultinomialNB, vectorizer_params: Dict, extra: Optional[Dict] = None):
+        """Write a fitted classifier to path, replacing any model already there.
+
+        Each file is written beside its target and renamed over it, so
+        processes still mapping the old arrays keep reading them intact.
+        meta.json goes last.
+        """
+        os.makedirs(path, exist_ok=True)
+        arrays = {
+            "log_prob": np.ascontiguousarray(classifier.feature_log_prob_.T, dtype=np.float32),
+            "log_prior": classifier.class_log_prior_.astype(np.float32),
+            "feature_count": classifier.feature_count_,
+            "class_count": classifier.class_count_
+        }
+        for name, values in arrays.items():
+            target = os.path.join(path, f"{name}.npy")
+            with open(target + ".tmp", "wb") as f:
+                np.save(f, values)
+            os.replace(target + ".tmp", target)
+
+        meta = {
+            "format": FORMAT_VERSION,
+            "classes": classifier.classes_.tolist(),
+            "alpha": classifier.alpha,
+            "vectorizer": vectorizer_params,
+            **(extra or {})
+        }
+        target = os.path.join(path, "meta.json")
+        with open(target + ".tmp", "w") as f:
+            json.dump(meta, f)
+        os.replace(target + ".tmp", target)
+
+    def joint_log_likelihood(self, texts) -> np.ndarray:
+        return np.asarray(self.vectorizer.transform(texts) @ self.log_prob) + self.log_prior
+
+    def predict(self, texts) -> np.ndarray:
+        return self.classes_[np.argmax(self.joint_log_likelihood(texts), axis=1)]
+
+    def predict_proba(self, texts) -> np.ndarray:
+        scores = self.joint_log_likelihood(texts).astype(np.float64)
+        scores -= scores.max(axis=1, keepdims=True)
+        np.exp(scores, out=scores)
+        return scores / scores.sum(axis=1, keepdims=True)
+
+    def to_classifier(self) -> MultinomialNB:
+        """Trainable MultinomialNB rebuilt from the stored counts, for further partial_fit calls"""
+        classifier = MultinomialNB(alpha=self.meta["alpha"])
+        classifier.classes_ = self.classes_.copy()
+        classifier.feature_count_ = np.load(os.path.join(self.path, "feature_count.npy"))
+        classifier.class_count_ = np.load(os.path.join(self.path, "class_count.npy"))
+        classifier.n_features_in_ = classifier.feature_count_.shape[1]
+        # Fitted parameters, so it can be exported again before any partial_fit
+        classifier.feature_log_prob_ = np.array(self.log_prob.T, dtype=np.float64)
+        classifier.class_log_prior_ = np.array(self.log_prior, dtype=np.float64)
+        return classifier
@@ -7,6 +7,7 @@ import os
 sys.path.append('../agentic-ai')
 
 from agent import Agent, Task
+from sentiment_engine import SentimentEngine
 import json
 import re
 import random
@@ -74,12 +75,13 @@ class ContentCollectorAgent(Agent):
 class SentimentAnalysisAgent(Agent):
     def __init__(self):
         super().__init__("SentimentAnalyzer", ["sentiment", "emotion", "mood", "feeling"])
+        self.engine = SentimentEngine()
     
     def execute_task(self, task: Task) -> Any:
         self.add_memory(f"Analyzing sentiment: {task.description}")
         
         # Extract content from task or use sample data
-        content = getattr(task, 'content_data', None)
+        content = task.get_input('content_data')
         if not content:
             content = self._get_sample_content()
         
@@ -90,25 +92,29 @@ class SentimentAnalysisAgent(Agent):
         return self._analyze_sentiment_batch(content)
     
     def _analyze_sentiment_batch(self, content_data):
-        results = []
+        items, sources = [], []
         
         if isinstance(content_data, dict) and "content" in content_data:
-            items = content_data["content"]
-            if isinstance(items, dict):  # Mixed content
-                for source, source_items in items.items():
-                    for item in source_items:
-                        sentiment = self._analyze_single_item(item)
-                        results.append({**sentiment, "source": source, "item": item})
-            elif isinstance(items, list):  # Single source
-                for item in items:
-                    sentiment = self._analyze_single_item(item)
-                    results.append({**sentiment, "source": content_data.get("source", "unknown"), "item": item})
+            content = content_data["content"]
+            if isinstance(content, dict):  # Mixed content
+                for source, source_items in content.items():
+                    items.extend(source_items)
+                    sources.extend([source] * len(source_items))
+            elif isinstance(content, list):  # Single source
+                items.extend(content)
+                sources.extend([content_data.get("source", "unknown")] * len(content))
+        
+        # Score every item in one vectorized pass
+        sentiments = self.engine.analyze([self._item_text(item) for item in items])
+        results = [
+            {**sentiment, "source": source, "item": item}
+            for sentiment, source, item in zip(sentiments, sources, items)
+        ]
         
         # Calculate overall statistics
-        sentiments = [r["sentiment"] for r in results]
         sentiment_counts = {"positive": 0, "negative": 0, "neutral": 0}
-        for s in sentiments:
-            sentiment_counts[s] += 1
+        for r in results:
+            sentiment_counts[r["sentiment"]] += 1
         
         return {
             "individual_results": results,
@@ -118,36 +124,14 @@ class SentimentAnalysisAgent(Agent):
         }
     
     def _analyze_single_item(self, item):
+        return self.engine.analyze([self._item_text(item)])[0]
+    
+    @staticmethod
+    def _item_text(item) -> str:
         # Extract text from different item types
-        text = ""
         if isinstance(item, dict):
-            text = item.get("text", item.get("title", item.get("summary", "")))
-        else:
-            text = str(item)
-        
-        # Simple sentiment analysis
-        positive_words = ["amazing", "great", "excellent", "good", "helpful", "incredible", "love", "fantastic"]
-        negative_words = ["bad", "terrible", "awful", "confusing", "wrong", "bugs", "disappointed", "hate"]
-        
-        text_lower = text.lower()
-        pos_score = sum(1 for word in positive_words if word in text_lower)
-        neg_score = sum(1 for word in negative_words if word in text_lower)
-        
-        if pos_score > neg_score:
-            sentiment = "positive"
-            confidence = min(0.9, 0.6 + (pos_score - neg_score) * 0.1)
-        elif neg_score > pos_score:
-            sentiment = "negative"
-            confidence = min(0.9, 0.6 + (neg_score - pos_score) * 0.1)
-        else:
-            sentiment = "neutral"
-            confidence = 0.5
-        
-        return {
-            "sentiment": sentiment,
-            "confidence": confidence,
-            "text_preview": text[:100] + "..." if len(text) > 100 else text
-        }
+            return item.get("text", item.get("title", item.get("summary", "")))
+        return str(item)
     
     def _get_sample_content(self):
         return {
@@ -167,7 +151,7 @@ class TrendAnalysisAgent(Agent):
         self.add_memory(f"Analyzing trends: {task.description}")
         
         # Get sentiment data from previous analysis
-        sentiment_data = getattr(task, 'sentiment_data', None)
+        sentiment_data = task.get_input('sentiment_data')
         if not sentiment_data:
             sentiment_data = self._get_sample_sentiment_data()
         
@@ -247,9 +231,9 @@ class ReportGeneratorAgent(Agent):
         self.add_memory(f"Generating report: {task.description}")
         
         # Collect all analysis data
-        content_data = getattr(task, 'content_data', {})
-        sentiment_data = getattr(task, 'sentiment_data', {})
-        trend_data = getattr(task, 'trend_data', {})
+        content_data = task.get_input('content_data', {})
+        sentiment_data = task.get_input('sentiment_data', {})
+        trend_data = task.get_input('trend_data', {})
         
         return self._generate_comprehensive_report(content_data, sentiment_data, trend_data)
     
@@ -9,99 +9,96 @@ sys.path.append('../agentic-ai')
 
 from coordinator import AgentCoordinator
 from agent import Task
+from pipeline import Pipeline, PipelineScheduler, Stage
 from content_agents import ContentCollectorAgent, SentimentAnalysisAgent, TrendAnalysisAgent, ReportGeneratorAgent
 import json
 import time
 
 class ContentAnalysisCoordinator(AgentCoordinator):
     def __init__(self):
-        super().__init__()
         # Replace default agents with specialized content analysis agents
-        self.agents = [
+        super().__init__(agents=[
             ContentCollectorAgent(),
             SentimentAnalysisAgent(),
             TrendAnalysisAgent(),
             ReportGeneratorAgent()
-        ]
+        ])
         self.analysis_results = {}
     
+    def build_analysis_pipeline(self, sources):
+        """DAG of collection -> sentiment -> trends -> report.
+        
+        Each source gets its own collector stage; with several sources the
+        collectors run in parallel and a merge stage combines them.
+        """
+        collector, sentiment_agent, trend_agent, report_agent = self.agents
+        pipeline = Pipeline()
+        
+        if len(sources) == 1:
+            pipeline.add_stage(Stage(
+                name="collect", agent=collector, output="content_data", output_type=dict,
+                description=f"Collect content from {sources[0]} sources", priority=3
+            ))
+        else:
+            for source in sources:
+                pipeline.add_stage(Stage(
+                    name=f"collect_{source}", agent=collector, output=f"content_{source}", output_type=dict,
+                    description=f"Collect content from {source} sources", priority=3
+                ))
+            pipeline.add_stage(Stage(
+                name="merge", func=merge_collections, output="content_data", output_type=dict,
+                inputs={f"content_{source}": dict for source in sources}
+            ))
+        
+        pipeline.add_stage(Stage(
+            name="sentiment", agent=sentiment_agent, output="sentiment_data", output_type=dict,
+            inputs={"content_data": dict}, description="Analyze sentiment of collected content", priority=2
+        ))
+        pipeline.add_stage(Stage(
+            name="trends", agent=trend_agent, output="trend_data", output_type=dict,
+            inputs={"sentiment_data": dict}, description="Identify trends and patterns in sentiment data", priority=2
+        ))
+        pipeline.add_stage(Stage(
+            name="report", agent=report_agent, output="report", output_type=dict,
+            inputs={"content_data": dict, "sentiment_data": dict, "trend_data": dict},
+            description="Generate comprehensive analysis report", priority=1
+        ))
+        return pipeline
+    
     def run_complete_analysis(self, content_source="mixed"):
-        """Run the complete content analysis pipeline"""
-        print(f"🚀 Starting Smart Content Analysis for: {content_source}")
-        
-        # Step 1: Content Collection
-        print("\n📊 Step 1: Collecting Content...")
-        collection_task = Task(
-            id="collect_content",
-            description=f"Collect content from {content_source} sources",
-            priority=3
-        )
-        self.task_queue.append(collection_task)
-        collection_result = self.execute_next_task()
-        
-        if collection_result["status"] != "success":
-            return {"error": "Content collection failed", "details": collection_result}
-        
-        content_data = collection_result["result"]
+        """Run the complete content analysis pipeline.
+        
+        content_source may be one source name or a list of sources to
+        collect in parallel.
+        """
+        sources = [content_source] if isinstance(content_source, str) else list(content_source)
+        print(f"🚀 Starting Smart Content Analysis for: {', '.join(sources)}")
+        
+        def report_progress(stage_name, output):
+            if stage_name.startswith("collect") or stage_name == "merge":
+                print(f"✅ Collected {output.get('count', 0)} items from {output.get('source', 'unknown')}")
+            elif stage_name == "sentiment":
+                print(f"✅ Analyzed {output.get('total_analyzed', 0)} items")
+                print(f"   Overall sentiment: {output.get('overall_sentiment', 'unknown')}")
+            elif stage_name == "trends":
+                print(f"✅ Identified {len(output.get('key_insights', []))} key insights")
+            elif stage_name == "report":
+                print("✅ Report generated successfully")
+        
+        scheduler = PipelineScheduler(max_workers=max(4, len(sources)), coordinator=self)
+        run = scheduler.run(self.build_analysis_pipeline(sources), on_stage_complete=report_progress)
+        
+        if run.status != "success":
+            failed = next(iter(run.errors))
+            return {"error": f"Stage {failed} failed", "details": run.errors, "timing": run.timing_report()}
+        
+        content_data = run.outputs["content_data"]
+        sentiment_data = run.outputs["sentiment_data"]
+        trend_data = run.outputs["trend_data"]
         self.analysis_results["content"] = content_data
-        print(f"✅ Collected {content_data.get('count', 0)} items from {content_data.get('source', 'unknown')}")
-        
-        # Step 2: Sentiment Analysis
-        print("\n💭 Step 2: Analyzing Sentiment...")
-        sentiment_task = Task(
-            id="analyze_sentiment",
-            description="Analyze sentiment of collected content",
-            priority=2
-        )
-        sentiment_task.content_data = content_data
-        self.task_queue.append(sentiment_task)
-        sentiment_result = self.execute_next_task()
-        
-        if sentiment_result["status"] != "success":
-            return {"error": "Sentiment analysis failed", "details": sentiment_result}
-        
-        sentiment_data = sentiment_result["result"]
         self.analysis_results["sentiment"] = sentiment_data
-        print(f"✅ Analyzed {sentiment_data.get('total_analyzed', 0)} items")
-        print(f"   Overall sentiment: {sentiment_data.get('overall_sentiment', 'unknown')}")
-        
-        # Step 3: Trend Analysis
-        print("\n📈 Step 3: Analyzing Trends...")
-        trend_task = Task(
-            id="analyze_trends",
-            description="Identify trends and patterns in sentiment data",
-            priority=2
-        )
-        trend_task.sentiment_data = sentiment_data
-        self.task_queue.append(trend_task)
-        trend_result = self.execute_next_task()
-        
-        if trend_result["status"] != "success":
-            return {"error": "Trend analysis failed", "details": trend_result}
-        
-        trend_data = trend_result["result"]
         self.analysis_results["trends"] = trend_data
-        print(f"✅ Identified {len(trend_data.get('key_insights', []))} key insights")
-        
-        # Step 4: Report Generation
-        print("\n📋 Step 4: Generating Report...")
-        report_task = Task(
-            id="generate_report",
-            description="Generate comprehensive analysis report",
-            priority=1
-        )
-        report_task.content_data = content_data
-        report_task.sentiment_data = sentiment_data
-        report_task.trend_data = trend_data
-        self.task_queue.append(report_task)
-        report_result = self.execute_next_task()
-        
-        if report_result["status"] != "success":
-            return {"error": "Report generation failed", "details": report_result}
-        
-        report_data = report_result["result"]
-        self.analysis_results["report"] = report_data
-        print("✅ Report generated successfully")
+        self.analysis_results["report"] = run.outputs["report"]
         
         return {
             "status": "success",
@@ -113,7 +110,8 @@ class ContentAnalysisCoordinator(AgentCoordinator):
                 "overall_sentiment": sentiment_data.get("overall_sentiment", "unknown"),
                 "key_insights": len(trend_data.get("key_insights", [])),
                 "report_generated": True
-            }
+            },
+            "timing": run.timing_report()
         }
     
     def analyze_custom_content(self, content_text, source="custom"):
@@ -134,7 +132,7 @@ class ContentAnalysisCoordinator(AgentCoordinator):
             priority=2
         )
         sentiment_task.content_data = custom_content
-        self.task_queue.append(sentiment_task)
+        self.queue_task(sentiment_task)
         sentiment_result = self.execute_next_task()
         
         if sentiment_result["status"] == "success":
@@ -190,6 +188,19 @@ class ContentAnalysisCoordinator(AgentCoordinator):
         except Exception as e:
             return {"error": f"Failed to save results: {str(e)}"}
 
+def merge_collections(**collections):
+    """Combine several single-source collections into one mixed collection"""
+    merged = {"source": "mixed", "content": {}, "count": 0}
+    for collection in collections.values():
+        content = collection.get("content", [])
+        if isinstance(content, dict):
+            for source, items in content.items():
+                merged["content"].setdefault(source, []).extend(items)
+        else:
+            merged["content"].setdefault(collection.get("source", "unknown"), []).extend(content)
+        merged["count"] += collection.get("count", 0)
+    return merged
+
 def run_demo_analysis():
     """Run a demonstration of the content analysis system"""
     coordinator = ContentAnalysisCoordinator()
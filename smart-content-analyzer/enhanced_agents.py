@@ -7,16 +7,20 @@ import os
 sys.path.append('../agentic-ai')
 
 from agent import Agent, Task
+from compact_model import CompactNaiveBayes, hashing_vectorizer
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+import collections
+import itertools
 import json
+import multiprocessing
 import requests
 import sqlite3
 from datetime import datetime, timedelta
 import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.naive_bayes import MultinomialNB
-from sklearn.pipeline import Pipeline
-import pickle
 import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
 
 class RealDataCollectorAgent(Agent):
     def __init__(self):
@@ -173,19 +177,52 @@ class RealDataCollectorAgent(Agent):
         conn.close()
 
 class MLSentimentAgent(Agent):
+    LABELS = {"negative": 0, "positive": 1, "neutral": 2}
+    # Hashing needs no fitted vocabulary, so the model can learn chunk by chunk
+    HASHING = {"n_features": 2 ** 18, "alternate_sign": False, "stop_words": "english"}
+    
     def __init__(self):
         super().__init__("MLSentimentAgent", ["ml", "sentiment", "classification", "model"])
-        self.model_path = "sentiment_model.pkl"
-        self.model = None
-        self._load_or_train_model()
+        self.model_dir = "sentiment_model"
+        self.db_path = "content_analysis.db"
+        # Training progress, read from the model once it is loaded
+        self.trained_through_id = 0  # Last content row the model has learned from
+        self.training_examples = 0
+        self.vectorizer = hashing_vectorizer(self.HASHING)
+        self._model: Optional[CompactNaiveBayes] = None  # Loaded on first prediction
+        self._trainer: Optional[MultinomialNB] = None  # Rebuilt from counts on first update
+        self._model_lock = threading.RLock()
+        self._pool: Optional[ProcessPoolExecutor] = None  # Long-lived corpus inference workers
+        self._pool_workers = 0
+    
+    @property
+    def model(self) -> CompactNaiveBayes:
+        return self._model if self._model is not None else self.load_model()
+    
+    def load_model(self) -> CompactNaiveBayes:
+        """Map the exported model, training one first if there is none"""
+        with self._model_lock:
+            if self._model is None:
+                self._load_or_train_model()
+            return self._model
+    
+    @property
+    def model_loaded(self) -> bool:
+        return self._model is not None
+    
+    @property
+    def model_available(self) -> bool:
+        """A loaded or exported model exists, so no training is needed before predicting"""
+        return self.model_loaded or os.path.exists(os.path.join(self.model_dir, "meta.json"))
     
     def _load_or_train_model(self):
         """Load existing model or train a new one"""
         try:
-            with open(self.model_path, 'rb') as f:
-                self.model = pickle.load(f)
+            self._model = CompactNaiveBayes.load(self.model_dir)
+            self.trained_through_id = self._model.meta.get("trained_through_id", 0)
+            self.training_examples = self._model.meta.get("training_examples", 0)
             self.add_memory("Loaded pre-trained sentiment model")
-        except FileNotFoundError:
+        except (FileNotFoundError, ValueError):
             self._train_model()
     
     def _train_model(self):
@@ -208,71 +245,291 @@ class MLSentimentAgent(Agent):
         
         training_labels = [1, 1, 1, 1, 0, 0, 0, 0, 2, 2, 2, 2]  # 1=positive, 0=negative, 2=neutral
         
-        # Create and train pipeline
-        self.model = Pipeline([
-            ('tfidf', TfidfVectorizer(max_features=1000, stop_words='english')),
-            ('classifier', MultinomialNB())
-        ])
-        
-        self.model.fit(training_texts, training_labels)
-        
-        # Save model
-        with open(self.model_path, 'wb') as f:
-            pickle.dump(self.model, f)
+        with self._model_lock:
+            self._trainer = MultinomialNB()
+            self.trained_through_id = 0
+            self.training_examples = 0
+            self.update_model(training_texts, training_labels)
         
         self.add_memory("Trained new sentiment classification model")
     
+    def update_model(self, texts: List[str], labels: List[Any], save: bool = True) -> int:
+        """Learn from newly labeled texts without retraining; returns how many were used"""
+        examples = [
+            (text, label) for text, label in zip(texts, map(self._label_id, labels))
+            if text and label is not None
+        ]
+        if not examples:
+            return 0
+        
+        features = self.vectorizer.transform([text for text, _ in examples])
+        with self._model_lock:
+            if self._trainer is None:
+                self._trainer = self.model.to_classifier()
+            self._trainer.partial_fit(
+                features, [label for _, label in examples], classes=sorted(self.LABELS.values())
+            )
+            self.training_examples += len(examples)
+            if save:
+                self._save_model()
+        return len(examples)
+    
+    def train_streaming(self, db_path: Optional[str] = None, jsonl_paths: Iterable[str] = (),
+                        chunk_size: int = 1000) -> Dict:
+        """Train chunk by chunk from the content table and/or JSONL files.
+        
+        Only labeled examples are used: items with a "label" or "sentiment"
+        field (a label name or 0/1/2). Content rows already trained on are
+        skipped, so repeated calls pick up just the newly collected rows.
+        """
+        trained = {"database": 0, "jsonl": 0}
+        self.load_model()  # Resume from the saved model's progress
+        sources = [("jsonl", self._iter_jsonl_examples(path)) for path in jsonl_paths]
+        if db_path is not None or not sources:
+            sources.insert(0, ("database", self._iter_database_examples(db_path or self.db_path)))
+        
+        for name, examples in sources:
+            while True:
+                chunk = list(itertools.islice(examples, chunk_size))
+                if not chunk:
+                    break
+                texts, labels = zip(*chunk)
+                trained[name] += self.update_model(list(texts), list(labels), save=False)
+        
+        self._save_model()
+        self.add_memory(f"Streamed {sum(trained.values())} training examples")
+        return {**trained, "training_examples": self.training_examples, "trained_through_id": self.trained_through_id}
+    
+    def _iter_database_examples(self, db_path: str, fetch_size: int = 1000) -> Iterator[Tuple[str, Any]]:
+        """Labeled (text, label) pairs from content rows newer than trained_through_id"""
+        conn = sqlite3.connect(db_path)
+        try:
+            cursor = conn.execute(
+                "SELECT id, content, metadata FROM content WHERE id > ? ORDER BY id",
+                (self.trained_through_id,)
+            )
+            while True:
+                rows = cursor.fetchmany(fetch_size)
+                if not rows:
+                    break
+                for row_id, content, metadata in rows:
+                    example = self._example_from_json(content, metadata)
+                    # Advanced per row, so an interrupted stream resumes where it stopped
+                    self.trained_through_id = row_id
+                    if example:
+                        yield example
+        except sqlite3.OperationalError:  # No content table yet
+            return
+        finally:
+            conn.close()
+    
+    def _iter_jsonl_examples(self, path: str) -> Iterator[Tuple[str, Any]]:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    example = self._example_from_json(line)
+                    if example:
+                        yield example
+    
+    def _example_from_json(self, content: str, metadata: Optional[str] = None) -> Optional[Tuple[str, Any]]:
+        try:
+            item = json.loads(content)
+            extra = json.loads(metadata) if metadata else {}
+        except json.JSONDecodeError:
+            return None
+        if not isinstance(item, dict):
+            return None
+        if not isinstance(extra, dict):
+            extra = {}
+        label = item.get("label", item.get("sentiment", extra.get("label")))
+        text = self._extract_text(item)
+        return (text, label) if text and label is not None else None
+    
+    def _label_id(self, label) -> Optional[int]:
+        if isinstance(label, str):
+            return self.LABELS.get(label.strip().lower())
+        return label if label in self.LABELS.values() else None
+    
+    def _save_model(self):
+        """Export the trainer and switch predictions over to the new arrays"""
+        with self._model_lock:
+            if self._trainer is None:  # Nothing new was learned, but progress may have moved
+                self._trainer = self.model.to_classifier()
+            CompactNaiveBayes.export(self.model_dir, self._trainer, self.HASHING, {
+                "trained_through_id": self.trained_through_id,
+                "training_examples": self.training_examples
+            })
+            self._model = CompactNaiveBayes.load(self.model_dir)
+    
     def execute_task(self, task: Task) -> Any:
         self.add_memory(f"ML sentiment analysis: {task.description}")
         
-        content_data = getattr(task, 'content_data', None)
+        # Training is requested explicitly; descriptions like "constraint" or "train delays" are content
+        if task.get_input('train'):
+            return self.train_streaming(task.get_input('db_path'), task.get_input('jsonl_paths') or ())
+        
+        content_data = task.get_input('content_data')
         if not content_data:
             return {"error": "No content data provided for ML analysis"}
         
         return self._analyze_with_ml(content_data)
     
-    def _analyze_with_ml(self, content_data):
-        """Perform ML-based sentiment analysis"""
+    def execute_batch(self, tasks: List[Task]) -> List[Any]:
+        """Classify the content of every task with a single model call"""
+        self.add_memory(f"ML sentiment batch of {len(tasks)} tasks")
+        
+        results: List[Any] = [None] * len(tasks)
+        all_texts, spans = [], []
+        for position, task in enumerate(tasks):
+            if task.get_input('train'):
+                results[position] = self.execute_task(task)
+                continue
+            content_data = task.get_input('content_data')
+            if not content_data:
+                results[position] = {"error": "No content data provided for ML analysis"}
+                continue
+            texts, sources = self._collect_items(content_data)
+            if not texts:
+                results[position] = {"error": "No text content found for analysis"}
+                continue
+            spans.append((position, len(all_texts), len(all_texts) + len(texts), sources))
+            all_texts.extend(texts)
+        
+        if all_texts:
+            predictions, confidences = self._predict(all_texts)
+            for position, start, end, sources in spans:
+                results[position] = self._summarize_predictions(
+                    predictions[start:end], confidences[start:end], all_texts[start:end], sources
+                )
+        
+        return results
+    
+    def _collect_items(self, content_data):
+        """Extract (texts, sources) pairs from single-source or mixed content"""
         texts = []
-        items = []
+        sources = []
         
-        # Extract texts from content
         if isinstance(content_data.get("content"), dict):  # Mixed content
             for source, source_items in content_data["content"].items():
                 for item in source_items:
                     text = self._extract_text(item)
                     if text:
                         texts.append(text)
-                        items.append({**item, "source": source})
+                        sources.append(source)
         elif isinstance(content_data.get("content"), list):  # Single source
+            source = content_data.get("source", "unknown")
             for item in content_data["content"]:
                 text = self._extract_text(item)
                 if text:
                     texts.append(text)
-                    items.append({**item, "source": content_data.get("source", "unknown")})
+                    sources.append(source)
+        
+        return texts, sources
+    
+    def _predict(self, texts):
+        """Labels and their probabilities from a single vectorize-and-score pass"""
+        return _classify(self.model, texts)
+    
+    def _analyze_with_ml(self, content_data):
+        """Perform ML-based sentiment analysis"""
+        texts, sources = self._collect_items(content_data)
         
         if not texts:
             return {"error": "No text content found for analysis"}
         
         # Predict sentiments
-        predictions = self.model.predict(texts)
-        probabilities = self.model.predict_proba(texts)
-        
-        # Map predictions to labels
-        label_map = {0: "negative", 1: "positive", 2: "neutral"}
-        
-        results = []
-        for i, (pred, prob, item) in enumerate(zip(predictions, probabilities, items)):
-            sentiment = label_map[pred]
-            confidence = max(prob)
-            
-            results.append({
-                "sentiment": sentiment,
-                "confidence": float(confidence),
-                "text_preview": self._extract_text(item)[:100] + "...",
-                "source": item.get("source", "unknown"),
-                "ml_prediction": True
-            })
+        predictions, confidences = self._predict(texts)
+        return self._summarize_predictions(predictions, confidences, texts, sources)
+    
+    def start_inference_pool(self, workers: Optional[int] = None) -> ProcessPoolExecutor:
+        """The corpus worker pool, started on first call; start it once at server startup.
+        
+        Workers come from a clean forkserver (or spawn) process rather than
+        a fork of this one, since forking while request and event-loop
+        threads hold locks can deadlock the child. The forkserver preloads
+        only the inference modules, never the server's __main__, so it
+        stays single-threaded.
+        """
+        with self._model_lock:
+            if self._pool is None:
+                context = multiprocessing.get_context(INFERENCE_START_METHOD)
+                if INFERENCE_START_METHOD == "forkserver":
+                    context.set_forkserver_preload(INFERENCE_PRELOAD)
+                self._pool_workers = workers or os.cpu_count() or 1
+                self._pool = ProcessPoolExecutor(self._pool_workers, mp_context=context)
+            return self._pool
+    
+    def shutdown_inference_pool(self):
+        with self._model_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
+    
+    def analyze_corpus(self, texts: Iterable[str], source: str = "corpus", chunk_size: int = 10000,
+                       max_results: int = 100, progress: Optional[Callable[[Dict], None]] = None) -> Dict:
+        """Classify a stream of texts of any length in chunks across the inference pool.
+        
+        Texts are read from the iterable one chunk at a time with at most
+        two chunks per worker in flight, and each chunk reports only its
+        counts, confidence total and first max_results results, so memory
+        stays bounded however many lines the corpus has. Workers map the
+        exported model files, sharing their pages, and reload them when
+        the model is saved again. progress, if given, is called with the
+        chunks and texts done so far after each chunk.
+        """
+        self.load_model()
+        model_dir = os.path.abspath(self.model_dir)
+        model_stamp = os.stat(os.path.join(model_dir, "meta.json")).st_mtime_ns
+        chunks = _text_chunks(texts, chunk_size)
+        totals = {"counts": np.zeros(len(SENTIMENT_NAMES), dtype=np.int64), "confidence": 0.0, "chunks": 0}
+        results: List[Dict] = []
+        
+        def merge(chunk_totals):
+            counts, confidence, chunk_results = chunk_totals
+            totals["counts"] += counts
+            totals["confidence"] += confidence
+            totals["chunks"] += 1
+            results.extend(chunk_results[:max_results - len(results)])
+            if progress is not None:
+                progress({"chunks": totals["chunks"], "analyzed": int(totals["counts"].sum())})
+        
+        first, second = next(chunks, None), next(chunks, None)
+        if second is None:  # Too small to be worth starting processes
+            if first:
+                merge(_summarize_chunk(self.model, first, source, max_results))
+        else:
+            pool = self.start_inference_pool()
+            pending = collections.deque()
+            try:
+                for chunk in itertools.chain((first, second), chunks):
+                    if len(pending) >= 2 * self._pool_workers:
+                        merge(pending.popleft().result())
+                    pending.append(pool.submit(_infer_chunk, model_dir, model_stamp, chunk, source, max_results))
+                while pending:
+                    merge(pending.popleft().result())
+            finally:
+                for future in pending:
+                    future.cancel()
+        
+        total = int(totals["counts"].sum())
+        summary = {name: int(totals["counts"][self.LABELS[name]]) for name in ("positive", "negative", "neutral")}
+        self.add_memory(f"Analyzed corpus of {total} texts in {totals['chunks']} chunks")
+        return {
+            "individual_results": results,
+            "summary": summary,
+            "total_analyzed": total,
+            "overall_sentiment": max(summary, key=summary.get),
+            "model_used": "ML_NaiveBayes",
+            "average_confidence": totals["confidence"] / total if total else 0.0,
+            "chunks": totals["chunks"],
+            "results_truncated": total > len(results)
+        }
+    
+    def _summarize_predictions(self, predictions, confidences, texts, sources):
+        results = [
+            _prediction_result(text, label, confidence, source)
+            for text, label, confidence, source in zip(texts, predictions, confidences, sources)
+        ]
         
         # Calculate summary statistics
         sentiment_counts = {"positive": 0, "negative": 0, "neutral": 0}
@@ -285,7 +542,7 @@ class MLSentimentAgent(Agent):
             "total_analyzed": len(results),
             "overall_sentiment": max(sentiment_counts, key=sentiment_counts.get),
             "model_used": "ML_NaiveBayes",
-            "average_confidence": float(np.mean([r["confidence"] for r in results]))
+            "average_confidence": float(np.mean(confidences))
         }
     
     def _extract_text(self, item):
@@ -294,6 +551,62 @@ class MLSentimentAgent(Agent):
             return item.get("text", item.get("content", item.get("title", item.get("description", ""))))
         return str(item)
 
+SENTIMENT_NAMES = {0: "negative", 1: "positive", 2: "neutral"}
+
+def _classify(model, texts):
+    """(labels, confidences) from one predict_proba pass; the label is the most probable class"""
+    probabilities = model.predict_proba(texts)
+    best = probabilities.argmax(axis=1)
+    return model.classes_[best], probabilities[np.arange(len(best)), best]
+
+def _prediction_result(text, label, confidence, source):
+    return {
+        "sentiment": SENTIMENT_NAMES[label],
+        "confidence": float(confidence),
+        "text_preview": text[:100] + "...",
+        "source": source,
+        "ml_prediction": True
+    }
+
+def _summarize_chunk(model, texts, source, keep):
+    """Counts per label, confidence total and the first `keep` results of one chunk"""
+    predictions, confidences = _classify(model, texts)
+    counts = np.bincount(predictions, minlength=len(SENTIMENT_NAMES))
+    kept = [
+        _prediction_result(text, label, confidence, source)
+        for text, label, confidence in zip(texts[:keep], predictions[:keep], confidences[:keep])
+    ]
+    return counts, float(confidences.sum()), kept
+
+def _text_chunks(texts, size):
+    """Lists of up to size non-empty texts, read lazily from any iterable"""
+    texts = iter(texts)
+    while True:
+        chunk = list(itertools.islice(texts, size))
+        if not chunk:
+            return
+        chunk = [text for text in chunk if text]
+        if chunk:
+            yield chunk
+
+# Forkserver and spawn workers start from a fresh interpreter instead of
+# a copy of the (threaded) server process
+INFERENCE_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+# Imported once by the forkserver; the default would import __main__
+INFERENCE_PRELOAD = ["compact_model", "enhanced_agents"]
+
+# Per worker: model directory -> (meta.json mtime, mapped model)
+_worker_models: Dict[str, Tuple[int, CompactNaiveBayes]] = {}
+
+def _worker_model(model_dir, stamp):
+    cached = _worker_models.get(model_dir)
+    if cached is None or cached[0] != stamp:
+        cached = _worker_models[model_dir] = (stamp, CompactNaiveBayes.load(model_dir))
+    return cached[1]
+
+def _infer_chunk(model_dir, stamp, texts, source, keep):
+    return _summarize_chunk(_worker_model(model_dir, stamp), texts, source, keep)
+
 class AdvancedTrendAgent(Agent):
     def __init__(self):
         super().__init__("AdvancedTrendAgent", ["trend", "analytics", "insights", "patterns"])
@@ -302,7 +615,7 @@ class AdvancedTrendAgent(Agent):
     def execute_task(self, task: Task) -> Any:
         self.add_memory(f"Advanced trend analysis: {task.description}")
         
-        sentiment_data = getattr(task, 'sentiment_data', None)
+        sentiment_data = task.get_input('sentiment_data')
         if not sentiment_data:
             return {"error": "No sentiment data for trend analysis"}
         
@@ -6,11 +6,13 @@ import sys
 import os
 sys.path.append('../agentic-ai')
 
-from flask import Flask, render_template, request, jsonify, send_file
+from flask import Flask, Response, render_template, request, jsonify, send_file
 from flask_socketio import SocketIO, emit
+import asyncio
 import json
-import threading
 import sqlite3
+import tempfile
+import time
 from datetime import datetime, timedelta
 import pandas as pd
 import matplotlib
@@ -20,6 +22,9 @@ import seaborn as sns
 from io import BytesIO
 import base64
 
+from agent import Task
+from async_coordinator import BackgroundLoop
+from metrics import metrics, PROMETHEUS_CONTENT_TYPE
 from enhanced_agents import RealDataCollectorAgent, MLSentimentAgent, AdvancedTrendAgent
 from api_integrations import APIManager
 
@@ -28,11 +33,24 @@ app.config['SECRET_KEY'] = 'enhanced-content-analysis'
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
 socketio = SocketIO(app, cors_allowed_origins="*")
 
-# Global instances
-data_collector = RealDataCollectorAgent()
-ml_sentiment = MLSentimentAgent()
-trend_analyzer = AdvancedTrendAgent()
-api_manager = APIManager()
+# Global instances, created by init_services() so that importing this
+# module (as inference workers do, via __mp_main__) starts no threads
+data_collector = None
+ml_sentiment = None
+trend_analyzer = None
+api_manager = None
+event_loop = None
+
+def init_services():
+    """Create the agents, the event loop thread and the inference pool; call once before serving"""
+    global data_collector, ml_sentiment, trend_analyzer, api_manager, event_loop
+    data_collector = RealDataCollectorAgent()
+    ml_sentiment = MLSentimentAgent()
+    trend_analyzer = AdvancedTrendAgent()
+    api_manager = APIManager()
+    event_loop = BackgroundLoop()
+    # One pool for the server's lifetime, started before any request threads
+    ml_sentiment.start_inference_pool()
 
 @app.route('/')
 def enhanced_dashboard():
@@ -45,7 +63,8 @@ def enhanced_analysis():
     query = data.get('query', 'AI')
     use_ml = data.get('use_ml', True)
     
-    def run_enhanced_analysis():
+    async def run_enhanced_analysis():
+        loop = asyncio.get_running_loop()
         try:
             socketio.emit('analysis_started', {'source': source, 'query': query})
             
@@ -53,7 +72,7 @@ def enhanced_analysis():
             socketio.emit('analysis_step', {'step': 1, 'message': 'Collecting data from real sources...'})
             
             if source == 'api_all':
-                collection_result = api_manager.collect_from_all_sources(query)
+                collection_result = await loop.run_in_executor(None, api_manager.collect_from_all_sources, query)
                 content_data = {
                     "source": "api_all",
                     "content": collection_result["sources"],
@@ -61,9 +80,9 @@ def enhanced_analysis():
                 }
             else:
                 # Use enhanced data collector
-                from agent import Task
                 task = Task(id="collect", description=f"Collect {source} content about {query}")
-                content_data = data_collector.execute_task(task)
+                with metrics.time_task(data_collector.name, "collect"):
+                    content_data = await data_collector.execute_task_async(task)
             
             socketio.emit('analysis_step', {'step': 2, 'message': 'Analyzing sentiment with ML...'})
             
@@ -72,23 +91,26 @@ def enhanced_analysis():
             sentiment_task.content_data = content_data
             
             if use_ml:
-                sentiment_data = ml_sentiment.execute_task(sentiment_task)
+                with metrics.time_task(ml_sentiment.name, "sentiment"):
+                    sentiment_data = await ml_sentiment.execute_task_async(sentiment_task)
             else:
                 # Fallback to basic sentiment
                 from content_agents import SentimentAnalysisAgent
                 basic_sentiment = SentimentAnalysisAgent()
-                sentiment_data = basic_sentiment.execute_task(sentiment_task)
+                with metrics.time_task(basic_sentiment.name, "sentiment"):
+                    sentiment_data = await basic_sentiment.execute_task_async(sentiment_task)
             
             socketio.emit('analysis_step', {'step': 3, 'message': 'Performing advanced trend analysis...'})
             
             # Step 3: Advanced Trend Analysis
             trend_task = Task(id="trends", description="Advanced trend analysis")
             trend_task.sentiment_data = sentiment_data
-            trend_data = trend_analyzer.execute_task(trend_task)
+            with metrics.time_task(trend_analyzer.name, "trends"):
+                trend_data = await trend_analyzer.execute_task_async(trend_task)
             
             # Step 4: Generate visualizations
             socketio.emit('analysis_step', {'step': 4, 'message': 'Generating visualizations...'})
-            charts = generate_charts(sentiment_data, trend_data)
+            charts = await loop.run_in_executor(None, generate_charts, sentiment_data, trend_data)
             
             result = {
                 "status": "success",
@@ -104,12 +126,14 @@ def enhanced_analysis():
         except Exception as e:
             socketio.emit('analysis_error', {'error': str(e)})
     
-    thread = threading.Thread(target=run_enhanced_analysis)
-    thread.daemon = True
-    thread.start()
+    event_loop.submit(run_enhanced_analysis())
     
     return jsonify({'status': 'started', 'source': source, 'query': query})
 
+@app.route('/api/metrics')
+def get_metrics():
+    return Response(metrics.render_prometheus(), content_type=PROMETHEUS_CONTENT_TYPE)
+
 @app.route('/api/upload_file', methods=['POST'])
 def upload_file():
     """Handle file upload for content analysis"""
@@ -148,6 +172,49 @@ def upload_file():
     except Exception as e:
         return jsonify({'error': f'File processing failed: {str(e)}'})
 
+@app.route('/api/analyze_upload', methods=['POST'])
+def analyze_upload():
+    """Queue every line of an uploaded file for chunked, multi-process ML inference.
+    
+    Returns a job id at once; 'corpus_progress' and 'corpus_analyzed'
+    Socket.IO events report the job as it runs.
+    """
+    if 'file' not in request.files:
+        return jsonify({'error': 'No file uploaded'})
+    
+    file = request.files['file']
+    if file.filename == '':
+        return jsonify({'error': 'No file selected'})
+    
+    try:
+        # The upload stream closes with the request, so spool it to disk for the job
+        with tempfile.NamedTemporaryFile(suffix='.txt', delete=False) as spool:
+            file.save(spool)
+        
+        job_id = f"corpus_{int(time.time() * 1000)}"
+        socketio.start_background_task(analyze_corpus_job, job_id, spool.name, file.filename)
+        return jsonify({'success': True, 'job_id': job_id, 'filename': file.filename, 'status': 'queued'}), 202
+        
+    except Exception as e:
+        return jsonify({'error': f'File analysis failed: {str(e)}'})
+
+def analyze_corpus_job(job_id, path, filename):
+    """Classify a spooled upload off-request, emitting progress after each chunk"""
+    def report(progress):
+        socketio.emit('corpus_progress', {'job_id': job_id, **progress})
+    
+    try:
+        # Lines are streamed from the file, never held in memory all at once
+        with open(path, encoding='utf-8', errors='replace') as f:
+            lines = (line.strip() for line in f)
+            with metrics.time_task(ml_sentiment.name, "corpus"):
+                result = ml_sentiment.analyze_corpus(lines, source="uploaded_file", progress=report)
+        socketio.emit('corpus_analyzed', {'job_id': job_id, 'success': True, 'filename': filename, **result})
+    except Exception as e:
+        socketio.emit('corpus_analyzed', {'job_id': job_id, 'error': f'File analysis failed: {str(e)}'})
+    finally:
+        os.remove(path)
+
 @app.route('/api/historical_data')
 def get_historical_data():
     """Get historical analysis data"""
@@ -289,7 +356,8 @@ def handle_enhanced_status():
             'total_content_items': total_content,
             'source_breakdown': source_counts,
             'api_status': api_status,
-            'ml_model_loaded': ml_sentiment.model is not None,
+            'ml_model_loaded': ml_sentiment.model_loaded,
+            'ml_model_available': ml_sentiment.model_available,
             'database_connected': True
         }
         
@@ -299,4 +367,5 @@ def handle_enhanced_status():
         emit('enhanced_status_update', {'error': str(e)})
 
 if __name__ == '__main__':
+    init_services()
     socketio.run(app, debug=True, host='0.0.0.0', port=8082)
\ No newline at end of file